@@ -0,0 +1,65 @@
+'''
+    This module is a reusable byte buffer for stream data that comes in in chunks. Chunks are copied in once, and anything that is
+    read back out is handed out as a memoryview into the buffer, so no new byte objects are made per batch.
+'''
+
+class byte_ring_buffer():
+    '''
+        Byte buffer with a read and a write cursor. When the write cursor reaches the end of the buffer the unread bytes
+        (normally just a partial packet) are moved back to the front, that way everything between the cursors is always
+        one contiguous piece of memory that can be searched and sliced.
+
+        NOTE: views handed out by this class point into the buffer, they are only good until the buffer wraps around. If
+        you need to hold onto the data longer than that (for example hand it to another thread), copy it out with bytes().
+
+        ARGS:
+            capacity : starting size of the buffer in bytes, the buffer will grow if a batch is bigger than this.
+    '''
+    def __init__(self, capacity:int = 1 << 20) -> None:
+        self.__buffer = bytearray(capacity)
+        self.__read_cursor = 0
+        self.__write_cursor = 0
+    def write(self, chunk):
+        '''
+            Appends a chunk of bytes to the end of the buffer.
+        '''
+        chunk_len = len(chunk)
+        if self.__write_cursor + chunk_len > len(self.__buffer):
+            self.__make_room(chunk_len)
+        self.__buffer[self.__write_cursor:self.__write_cursor + chunk_len] = chunk
+        self.__write_cursor += chunk_len
+    def __make_room(self, chunk_len):
+        '''
+            Moves the unread bytes to the front of the buffer, and if that is still not enough room it allocates a bigger buffer.
+        '''
+        unread_len = self.__write_cursor - self.__read_cursor
+        if unread_len + chunk_len > len(self.__buffer):
+            # we never resize the old buffer in place, any views handed out still have a hold on it.
+            new_capacity = max(len(self.__buffer), 1)
+            while unread_len + chunk_len > new_capacity:
+                new_capacity *= 2
+            new_buffer = bytearray(new_capacity)
+            new_buffer[:unread_len] = self.__buffer[self.__read_cursor:self.__write_cursor]
+            self.__buffer = new_buffer
+        else :
+            self.__buffer[:unread_len] = self.__buffer[self.__read_cursor:self.__write_cursor]
+        self.__read_cursor = 0
+        self.__write_cursor = unread_len
+    def get_buffer(self):
+        '''
+            Returns the underlying buffer along with the read and write cursors, the unread data is buffer[read:write].
+        '''
+        return self.__buffer, self.__read_cursor, self.__write_cursor
+    def views(self, spans):
+        '''
+            Returns a read only memoryview for each (start, stop) span in the list. The spans are absolute offsets in the buffer.
+        '''
+        buffer_view = memoryview(self.__buffer).toreadonly()
+        return [buffer_view[start:stop] for start, stop in spans]
+    def consume(self, offset:int):
+        '''
+            Marks everything before offset (an absolute offset in the buffer) as read.
+        '''
+        self.__read_cursor = offset
+    def __len__(self):
+        return self.__write_cursor - self.__read_cursor
@@ -0,0 +1,83 @@
+'''
+    This module is a table driven version of the ccsds crc16 (CRC-16-CCITT, poly 0x1021, start value 0xFFFF), with a way to check
+    a whole batch of packets at once.
+'''
+import numpy as np
+
+crc16_poly = 0x1021
+crc16_init = 0xFFFF
+
+def make_crc16_table(poly:int = crc16_poly):
+    '''
+        Returns the 256 entry lookup table for a msb first crc16 with the given polynomial.
+    '''
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+crc16_table = make_crc16_table()
+crc16_table_array = np.array(crc16_table, dtype=np.uint32)
+min_vectorized_packets = 48 # under this many packets of the same length the plain python loop is faster than numpy
+
+def crc16(data, crc:int = crc16_init):
+    '''
+        Pure python crc16 of data (bytes, bytearray or memoryview), one table lookup per byte.
+        Running it over a packet that ends with its own crc gives 0 when the packet is good.
+    '''
+    table = crc16_table
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+def crc16_spans(buffer, spans):
+    '''
+        Works out the crc16 of every (start, stop) span of a contiguous buffer. Packets with the same length are run through the
+        table together with numpy, one byte position at a time for all of them.
+
+        RETURNS:
+            list of crc values, in the same order as spans.
+    '''
+    crcs = [crc16_init] * len(spans)
+    groups = {}
+    for index, (start, stop) in enumerate(spans):
+        groups.setdefault(stop - start, []).append(index)
+
+    raw = None
+    for length, indexes in groups.items():
+        if len(indexes) < min_vectorized_packets or length == 0:
+            for index in indexes:
+                start, stop = spans[index]
+                crcs[index] = crc16(buffer[start:stop])
+            continue
+        if raw is None:
+            raw = np.frombuffer(buffer, dtype=np.uint8)
+        starts = np.array([spans[index][0] for index in indexes], dtype=np.int64)
+        columns = np.ascontiguousarray(raw[starts[:, None] + np.arange(length)].T) # one row per byte position
+        crc = np.full(len(indexes), crc16_init, dtype=np.uint32)
+        for column in columns:
+            crc = ((crc << 8) & 0xFFFF) ^ crc16_table_array[(crc >> 8) ^ column]
+        for index, value in zip(indexes, crc.tolist()):
+            crcs[index] = value
+    return crcs
+
+def crc16_batch(packets:list):
+    '''
+        Works out the crc16 of every packet in a list, by laying them out in one buffer and calling crc16_spans.
+    '''
+    spans = []
+    position = 0
+    for packet in packets:
+        spans.append((position, position + len(packet)))
+        position += len(packet)
+    return crc16_spans(bytes().join(packets), spans)
+
+def crc16_matches(reference_crc) -> bool:
+    '''
+        Checks that our crc16 gives the same answers as another crc function (ccsds_crc16), so we know it is safe to use instead.
+    '''
+    samples = [b'', b'\x00', b'123456789', bytes(range(256)), b'\x08\x40\xc0\x00\x00\x03\x12\x34\xab\xcd']
+    return all(crc16(sample) == reference_crc(sample) for sample in samples)
@@ -0,0 +1,47 @@
+'''
+    This module finds ccsds telemetry packets in a raw byte stream. Rather than checking every byte for the sync word in python,
+    it lets bytes.find jump straight to the next sync word candidate, so the python code only runs once per packet.
+'''
+import system_constants as sys_c # pylint: disable=e0401
+
+def scan_ccsds_packets(data, start:int = 0, end:int = None):
+    '''
+        Scans data[start:end] for sync word framed ccsds packets.
+
+        ARGS:
+            data : bytes or bytearray to scan (anything with a find function and int indexing).
+            start : offset to start scanning at.
+            end : offset to stop scanning at, defaults to the end of data.
+
+        RETURNS:
+            packet_spans : list of (start, stop) offsets for every packet found, the offsets do not include the sync word.
+            bad_packet_detected : True if there was junk between packets (a packet with a bad header).
+            carry_offset : offset of the first byte that was not consumed, everything from here to end should be kept for the next batch.
+    '''
+    if end is None:
+        end = len(data)
+    sync_bytes = sys_c.sync_word.to_bytes(sys_c.sync_word_len, 'big')
+    header_end = sys_c.sync_word_len + sys_c.ccsds_header_len # offset from the sync word to the last byte of the header
+    last_header_start = end - header_end - 1 # the last offset that still has room for a full header after it
+
+    packet_spans = []
+    bad_packet_detected = False
+
+    position = start
+    while position < end:
+        if position > last_header_start: # Not enough data for a header
+            return packet_spans, bad_packet_detected, position
+        sync_position = data.find(sync_bytes, position, last_header_start + sys_c.sync_word_len)
+        if sync_position == -1: # no more sync words, everything up to where a header could still start is junk
+            if len(packet_spans) > 0:
+                bad_packet_detected = True
+            return packet_spans, bad_packet_detected, last_header_start + 1
+        if sync_position != position and len(packet_spans) > 0: # skipped over bytes after a good packet, so there was a bad packet
+            bad_packet_detected = True
+
+        packet_length = ((data[sync_position + sys_c.packet_len_addr1] << 8) | data[sync_position + sys_c.packet_len_addr2]) + 1 # the packet length value is the total bytes including crc minus one, ccsds standards ¯\_(ツ)_/¯
+        if sync_position + header_end + packet_length > end: # the entire packet is not in the current section
+            return packet_spans, bad_packet_detected, sync_position
+        packet_spans.append((sync_position + sys_c.sync_word_len, min(sync_position + header_end + packet_length + 1, end)))
+        position = sync_position + header_end + packet_length + 1
+    return packet_spans, bad_packet_detected, end
@@ -3,16 +3,20 @@
 '''
 import os
 import importlib
+from types import MappingProxyType
 import yaml
 
 import system_constants # pylint: disable=e0401
+from sensor_interface_api.l1_converter import l1_converter, load_converter_specs # pylint: disable=e0401
 
 class sensor_importer():
     '''
         Any file that is found in the sensor_interface_api/, starts with "sobj_", and ends with ".py" 
+        Any converter spec in sensor_interface_api/l1_converters/ that ends with ".yaml" is made into an l1_converter.
     '''
     def __init__(self, packets_file_list:list, detector_list:list, processor_list:list, packet_processor_name:str = 'sobj_packet_processor') -> None:
         self.__sensors_class = []
+        self.__converter_specs = []
         self.__sensors = []
         self.__packets_file_paths_list = packets_file_list
         self.__packet_processor_name = packet_processor_name
@@ -46,6 +50,27 @@ class sensor_importer():
             system_constants.telemetry_packet_types[file_path] = telemetry_packet_types
             system_constants.telemetry_packet_num[file_path] = count
 
+            # apid (as an int) -> (Mnemonic, possition in a list). It is built once here and never changes, so the packet detectors
+            # can look up every packet with one dict lookup and no lock.
+            apid_dispatch_tables = getattr(system_constants, 'apid_dispatch_tables', {})
+            apid_dispatch_tables[file_path] = self.build_apid_dispatch_table(telemetry_packet_types)
+            system_constants.apid_dispatch_tables = apid_dispatch_tables
+
+    def build_apid_dispatch_table(self, telemetry_packet_types:list):
+        '''
+            Makes a read only dict that maps the apid (as an int) to the (Mnemonic, possition in a list) for that packet.
+
+            ARGS:
+                telemetry_packet_types : list of (Mnemonic, APID, possition in a list), the APID is a hex string.
+        '''
+        dispatch_table = {}
+        for mnemonic, apid, position in telemetry_packet_types:
+            try :
+                dispatch_table[int(str(apid), 16)] = (mnemonic, position)
+            except ValueError:
+                print(f"Warning apid {apid} for {mnemonic} is not a hex value, packets for it will be counted as unknown.")
+        return MappingProxyType(dispatch_table)
+
     def import_modules(self):
         '''
             this function import modules
@@ -56,6 +81,7 @@ class sensor_importer():
                 module_name = os.path.splitext(file_name)[0]
                 module = importlib.import_module(f'sensor_interface_api.{module_name}', package=__name__)
                 self.__sensors_class.append(module)
+        self.__converter_specs = load_converter_specs()
     def instantiate_sensor_objects(self, coms):
         '''
             This function instantiates all the sensor objects it found. 
@@ -74,10 +100,17 @@ class sensor_importer():
                         sensor_class = getattr(module, class_name)
                         sensor_object = sensor_class(coms, process[0], self.__packets_structure[apid], apid)
                         self.__sensors.append(sensor_object)
+            elif hasattr(module, 'sensor_names'): # one module can make more than one sensor that only differ by name
+                for name in module.sensor_names:
+                    sensor_class = getattr(module, class_name)
+                    sensor_object = sensor_class(coms, name=name)
+                    self.__sensors.append(sensor_object)
             else : 
                 sensor_class = getattr(module, class_name)
                 sensor_object = sensor_class(coms)
                 self.__sensors.append(sensor_object)
+        for spec in self.__converter_specs:
+            self.__sensors.append(l1_converter(coms, spec))
     def get_sensors(self):
         '''
             returns all the sensor objects. 
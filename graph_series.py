@@ -0,0 +1,215 @@
+'''
+    This module holds the points of one graph on a sensor's web page. The series only keeps the newest max_data_points points,
+    and adding points never moves the ones already in it around, so it costs the same no matter how many points the graph keeps.
+    Every point gets an index (0 for the first point ever added, then 1, 2 ...) so a client can ask for only the points it has not
+    seen yet. For longer histories than that, each series also keeps summary levels, every bucket in a level is the min, max and
+    mean of summary_factor buckets (or points) of the level below it, so the page can show a long window with only a few points.
+'''
+import math
+import numbers
+from collections import deque
+from itertools import islice
+
+def merge_buckets(first, second):
+    '''
+        Merges two summary buckets, first has to be the older one. Either one can be None.
+    '''
+    if first is None or second is None:
+        return first if second is None else second
+    return (first[0], second[1], first[2] + second[2], first[3] + second[3], min(first[4], second[4]), max(first[5], second[5]))
+
+def summarizable(value):
+    '''
+        Returns True if a y value can go in a summary bucket (a real number that is not nan). Anything else (None, strings ...) 
+        is still kept in the raw points, it is just left out of the summaries.
+    '''
+    return isinstance(value, numbers.Real) and not (isinstance(value, float) and math.isnan(value))
+
+def merge_groups(buckets:list, points:int):
+    '''
+        Merges neighbouring buckets (oldest first) so there are no more than points of them.
+    '''
+    group_size = math.ceil(len(buckets) / points)
+    if group_size <= 1:
+        return buckets
+    merged = []
+    for start in range(0, len(buckets), group_size):
+        bucket = None
+        for part in buckets[start:start + group_size]:
+            bucket = merge_buckets(bucket, part)
+        merged.append(bucket)
+    return merged
+
+class graph_summary_level():
+    '''
+        One summary level of a series. Buckets are (x of the first point, x of the last point, number of points, sum of y, min y, max y).
+
+        ARGS:
+            bucket_size : number of buckets (or points) from the level below that make one bucket here.
+            max_buckets : number of buckets to keep.
+    '''
+    def __init__(self, bucket_size:int, max_buckets:int) -> None:
+        self.__bucket_size = bucket_size
+        self.__buckets = deque(maxlen=max_buckets)
+        self.__partial = None # the bucket we are still filling
+        self.__partial_parts = 0
+        self.__dropped = False # True once the oldest bucket has been pushed out
+    def add(self, bucket):
+        '''
+            Merges a bucket from the level below into the one we are filling.
+
+            RETURNS:
+                the bucket we just finished (to be added to the level above), or None if it is not full yet.
+        '''
+        self.__partial = merge_buckets(self.__partial, bucket)
+        self.__partial_parts += 1
+        if self.__partial_parts < self.__bucket_size:
+            return None
+        finished = self.__partial
+        if len(self.__buckets) == self.__buckets.maxlen:
+            self.__dropped = True
+        self.__buckets.append(finished)
+        self.__partial = None
+        self.__partial_parts = 0
+        return finished
+    def get_partial(self):
+        '''
+            Returns the bucket we are still filling (None if we are not filling one).
+        '''
+        return self.__partial
+    def covers(self, x_min):
+        '''
+            Returns True if this level still has everything from x_min on (or everything ever added if x_min is None).
+        '''
+        if not self.__dropped:
+            return True
+        return x_min is not None and len(self.__buckets) > 0 and self.__buckets[0][0] <= x_min
+    def view(self, x_min, x_max, tail = None):
+        '''
+            Returns the buckets (the one we are still filling too) that overlap x_min to x_max, None means no limit on that side.
+            tail is the points the levels below have not passed up to us yet, they are added to the bucket we are filling.
+        '''
+        buckets = list(self.__buckets)
+        partial = merge_buckets(self.__partial, tail)
+        if partial is not None:
+            buckets.append(partial)
+        return [bucket for bucket in buckets if (x_min is None or bucket[1] >= x_min) and (x_max is None or bucket[0] <= x_max)]
+
+class graph_series():
+    '''
+        Fixed size x and y series for one graph. Once it is full, every point added pushes the oldest one out.
+
+        NOTE: this class does not lock anything on its own, sensor_parent guards it with its data report lock.
+
+        ARGS:
+            max_data_points : number of points to keep, and number of buckets to keep in each summary level.
+            summary_levels : number of summary levels, 0 to not keep any.
+            summary_factor : how many buckets of the level below make one bucket of the next level up, so level n buckets hold
+                summary_factor^n points.
+    '''
+    def __init__(self, max_data_points:int, summary_levels:int = 0, summary_factor:int = 10) -> None:
+        self.__x = deque(maxlen=max(max_data_points, 0))
+        self.__y = deque(maxlen=max(max_data_points, 0))
+        self.__next_index = 0 # index the next point added will get
+        if summary_levels > 0 and summary_factor < 2:
+            raise RuntimeError("summary_factor has to be at least 2.")
+        self.__summary_factor = summary_factor
+        self.__levels = [graph_summary_level(summary_factor, max(max_data_points, 1)) for _ in range(summary_levels)]
+    def add(self, x, y):
+        '''
+            Adds the x and y points (lists) to the end of the series. Points with a y that is not a number (None and such) are
+            kept like any other point, but they are left out of the summary levels.
+        '''
+        # work out what goes in the summaries first, so nothing has been changed if this fails
+        summary_points = [(x_point, y_point) for x_point, y_point in zip(x, y) if summarizable(y_point)] if self.__levels else []
+        self.__x.extend(x)
+        self.__y.extend(y)
+        self.__next_index += len(x)
+        for x_point, y_point in summary_points:
+            bucket = (x_point, x_point, 1, y_point, y_point, y_point)
+            # each level only hears about a bucket when the one below it finishes one, so this is O(1) per point on average
+            for level in self.__levels:
+                bucket = level.add(bucket)
+                if bucket is None:
+                    break
+    def __len__(self):
+        return len(self.__x)
+    def snapshot(self):
+        '''
+            Returns the points in the series as {'x' : list, 'y' : list}. The lists are new, so the caller can keep them while we
+            keep adding points. The points themselves are not copied (they are numbers, nobody can change them).
+        '''
+        return {
+            'x' : list(self.__x),
+            'y' : list(self.__y),
+        }
+    def snapshot_since(self, index:int):
+        '''
+            Returns the points with an index of index or more, only walking over the new points.
+
+            ARGS:
+                index : the next index the client has not seen (the 'next' we gave it last time, 0 if it has nothing).
+
+            RETURNS:
+                dict with
+                    x, y : the new points.
+                    start : index of the first point returned. If it is not the index asked for (the points in between already
+                        fell out of the series, or the sensor was restarted and its indexes started over) the client should throw
+                        away what it has instead of adding to it.
+                    next : index to ask for next time.
+        '''
+        if index > self.__next_index:
+            index = 0 # we were restarted since the client last asked, send it everything
+        start = max(index, self.__next_index - len(self.__x))
+        count = self.__next_index - start
+        return {
+            'x' : list(islice(reversed(self.__x), count))[::-1],
+            'y' : list(islice(reversed(self.__y), count))[::-1],
+            'start' : start,
+            'next' : self.__next_index,
+        }
+    def downsample(self, points:int = None, x_min = None, x_max = None):
+        '''
+            Returns the points between x_min and x_max (None means no limit on that side) at the finest resolution that has all
+            of them and fits in points (None means no limit). If no level has the whole window in points or less, the coarsest 
+            level that has the window (the coarsest level if none do) has its neighbouring buckets merged until it fits.
+
+            RETURNS:
+                dict with
+                    x : x of the first point in each bucket (the x of the point for raw points).
+                    y, y_min, y_max : mean, min and max y of each bucket (all the same y for raw points).
+                    count : number of raw points in each bucket, 1 for raw points. The newest bucket of a level is the one
+                        still being filled so it normally holds fewer points than the rest.
+        '''
+        if points is not None and points < 1:
+            raise RuntimeError(f"points has to be at least 1, not {points}.")
+        def in_window(bucket):
+            return (x_min is None or bucket[1] >= x_min) and (x_max is None or bucket[0] <= x_max)
+        candidates = [] # (covers the window, buckets), finest first
+        raw_covers = self.__next_index == len(self.__x) or (x_min is not None and len(self.__x) > 0 and self.__x[0] <= x_min)
+        raw = [(x, x, 1, y, y, y) for x, y in zip(self.__x, self.__y)]
+        candidates.append((raw_covers, [bucket for bucket in raw if in_window(bucket)]))
+        tail = None
+        for level in self.__levels:
+            candidates.append((level.covers(x_min), level.view(x_min, x_max, tail)))
+            tail = merge_buckets(level.get_partial(), tail)
+
+        buckets = None
+        for covers, level_buckets in candidates:
+            if covers and (points is None or len(level_buckets) <= points):
+                buckets = level_buckets
+                break
+        if buckets is None:
+            covering = [level_buckets for covers, level_buckets in candidates if covers]
+            buckets = covering[-1] if covering else candidates[-1][1]
+            if points is not None and len(buckets) > points:
+                if buckets is candidates[0][1]: # raw points can have y values that are not numbers, those can't be merged
+                    buckets = [bucket for bucket in buckets if summarizable(bucket[3])]
+                buckets = merge_groups(buckets, points)
+        return {
+            'x' : [bucket[0] for bucket in buckets],
+            'y' : [bucket[3] / bucket[2] if bucket[2] > 1 else bucket[3] for bucket in buckets],
+            'y_min' : [bucket[4] for bucket in buckets],
+            'y_max' : [bucket[5] for bucket in buckets],
+            'count' : [bucket[2] for bucket in buckets],
+        }
@@ -0,0 +1,172 @@
+'''
+    This module is the calibration the L0 to L1 converters share. Each converter says how every column it calibrates is converted
+    (sign extension, then divisor, then gain and offset) and the whole column is converted at once with numpy. Columns worked out
+    from the calibrated ones (like magnitude and phase from I and Q) are done the same way, see iq_derivation.
+'''
+import numpy as np
+
+class column_calibration():
+    '''
+        How to calibrate one column, converted = sign_extend(raw) / divisor * gain + offset.
+
+        ARGS:
+            bit_width : number of bits in the raw value, only used when signed is True.
+            signed : True if the raw value is twos complement and needs to be sign extended.
+            gain : the value is multiplied by this.
+            offset : this is added to the value after the gain.
+            divisor : the value is divided by this before the gain, 1 skips the division.
+
+        NOTE: if gain, offset and divisor are all ints (and divisor is 1) the column stays as ints, like the python loops did.
+    '''
+    def __init__(self, bit_width:int = 0, signed:bool = False, gain = 1, offset = 0, divisor = 1) -> None:
+        if signed and bit_width <= 0:
+            raise RuntimeError("A signed column needs a bit width to sign extend from.")
+        self.__sign_bit = 1 << (bit_width - 1) if signed else 0
+        self.__gain = gain
+        self.__offset = offset
+        self.__divisor = divisor
+    def apply(self, values):
+        '''
+            Calibrates a column (list, tuple or numpy array of raw ints) and returns it as a numpy array.
+        '''
+        converted = np.asarray(values, dtype=np.int64)
+        if self.__sign_bit:
+            converted = (converted & (self.__sign_bit - 1)) - (converted & self.__sign_bit)
+        if self.__divisor != 1:
+            converted = converted / self.__divisor
+        return converted * self.__gain + self.__offset
+
+# the steps a column_transform can do, each one takes the column (numpy array) and the steps argument
+transform_steps = {
+    'sign_extend' : lambda values, bits: (values & ((1 << (bits - 1)) - 1)) - (values & (1 << (bits - 1))),
+    'shift_right' : lambda values, bits: values >> bits,
+    'multiply' : lambda values, factor: values * factor,
+    'divide' : lambda values, divisor: values / divisor,
+    'add' : lambda values, offset: values + offset,
+}
+
+class column_transform():
+    '''
+        A list of steps to apply to a column in order, for conversions that do not fit column_calibration (like the STT ADCs,
+        (raw * LSB) / gain, where the order changes the last bit of the answer).
+
+        ARGS:
+            steps : list of [step, argument], step is one of transform_steps. For example [['multiply', 6.25e-05], ['divide', 4.99]].
+    '''
+    def __init__(self, steps:list) -> None:
+        self.__steps = []
+        for step in steps:
+            if len(step) != 2 or step[0] not in transform_steps:
+                raise RuntimeError(f"{step} is not a valid transform step, it should be [step, argument] with step one of {list(transform_steps)}.")
+            self.__steps.append((transform_steps[step[0]], step[1]))
+    def apply(self, values):
+        '''
+            Applies the steps to a column (list, tuple or numpy array of raw ints) and returns it as a numpy array.
+        '''
+        converted = np.asarray(values, dtype=np.int64)
+        for step, argument in self.__steps:
+            converted = step(converted, argument)
+        return converted
+
+class iq_derivation():
+    '''
+        Works out the magnitude and phase (and optionally the unwrapped phase and power in dB) from a calibrated I and Q column.
+
+        ARGS:
+            i_column : name of the I column.
+            q_column : name of the Q column.
+            magnitude : name of the magnitude column, sqrt(I^2 + Q^2).
+            phase : name of the phase column, atan2(Q, I) in radians.
+            unwrapped_phase : name of the unwrapped phase column, None to not make it. The phase is unwrapped across batches too.
+            power_db : name of the power column, 10*log10(I^2 + Q^2), None to not make it. When I and Q are both 0 there is no
+                power to take the log of, so the value is None (null in the database) instead of -inf.
+    '''
+    def __init__(self, i_column:str, q_column:str, magnitude:str = 'Mag', phase:str = 'Phase', unwrapped_phase:str = None, power_db:str = None) -> None:
+        self.__i_column = i_column
+        self.__q_column = q_column
+        self.__magnitude = magnitude
+        self.__phase = phase
+        self.__unwrapped_phase = unwrapped_phase
+        self.__power_db = power_db
+        self.__last_phase = None # (phase, unwrapped phase) of the last granule we saw, so the next batch carries on from it
+    def get_columns(self):
+        '''
+            Returns the names of the columns this makes.
+        '''
+        return [name for name in (self.__magnitude, self.__phase, self.__unwrapped_phase, self.__power_db) if name is not None]
+    def get_table_rows(self):
+        '''
+            Returns the table structure rows for the optional columns (unwrapped phase and power), every converter already has
+            the magnitude and phase in its table.
+        '''
+        rows = []
+        if self.__unwrapped_phase is not None:
+            rows.append([self.__unwrapped_phase, 0, 'float'])
+        if self.__power_db is not None:
+            rows.append([self.__power_db, 0, 'float', 'nullable'])
+        return rows
+    def derive(self, columns:dict):
+        '''
+            Works out the derived columns from the calibrated columns (dict of numpy arrays). If I or Q is missing the derived
+            columns are empty.
+
+            RETURNS:
+                dict of column name -> numpy array.
+        '''
+        i_values = columns.get(self.__i_column, np.empty(0))
+        q_values = columns.get(self.__q_column, np.empty(0))
+        count = min(len(i_values), len(q_values)) # zip stops at the shorter one, so do the same
+        i_values = i_values[:count]
+        q_values = q_values[:count]
+
+        phase = np.arctan2(q_values, i_values)
+        derived = {
+            self.__magnitude : np.hypot(i_values, q_values),
+            self.__phase : phase,
+        }
+        if self.__unwrapped_phase is not None:
+            if self.__last_phase is None or count == 0:
+                unwrapped = np.unwrap(phase)
+            else :
+                last_phase, last_unwrapped = self.__last_phase
+                unwrapped = np.unwrap(np.concatenate(([last_phase], phase)))[1:] - last_phase + last_unwrapped
+            if count > 0:
+                self.__last_phase = (phase[-1], unwrapped[-1])
+            derived[self.__unwrapped_phase] = unwrapped
+        if self.__power_db is not None:
+            power = np.square(i_values, dtype=np.float64) + np.square(q_values, dtype=np.float64)
+            has_power = power > 0
+            power_db = 10 * np.log10(np.where(has_power, power, 1.0))
+            derived[self.__power_db] = power_db if np.all(has_power) else np.where(has_power, power_db.astype(object), None)
+        return derived
+
+class l1_calibration():
+    '''
+        The calibration for every column of one converter.
+
+        ARGS:
+            columns : dict of column name -> column_calibration (or column_transform).
+            derivations : list of stages (like iq_derivation) that work out more columns from the calibrated ones.
+    '''
+    def __init__(self, columns:dict, derivations:list = None) -> None:
+        self.__columns = dict(columns)
+        self.__derivations = list(derivations) if derivations is not None else []
+    def calibrate(self, data, buffer:dict):
+        '''
+            Fills in buffer from the data we received, the calibrated columns are converted, the derived columns are worked out from
+            them, and every other column is passed through as is.
+
+            RETURNS:
+                buffer, with the calibrated and derived columns as lists.
+        '''
+        calibrated = {}
+        for key in data:
+            if key in self.__columns:
+                calibrated[key] = self.__columns[key].apply(data[key])
+                buffer[key] = calibrated[key].tolist()
+            else :
+                buffer[key] = data[key]
+        for derivation in self.__derivations:
+            for key, values in derivation.derive(calibrated).items():
+                buffer[key] = values.tolist()
+        return buffer
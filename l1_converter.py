@@ -0,0 +1,81 @@
+'''
+    This module is the generic L0 to L1 converter. Instead of a sobj_ module per converter, each converter is a yaml spec in
+    l1_converters/ (see stt_L0_to_L1_converter.yaml) that collect_sensor loads, and this class builds the table and the column
+    transforms from it once when it starts up.
+'''
+import os
+import yaml
+
+from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
+from sensor_interface_api.l1_calibration import l1_calibration, column_transform # pylint: disable=e0401
+import system_constants as sensor_config # pylint: disable=e0401
+from logging_system_display_python_api.logger import loggerCustom as logger
+
+converter_spec_folder = os.path.join(os.path.dirname(__file__), 'l1_converters')
+
+def load_converter_specs(folder:str = converter_spec_folder):
+    '''
+        Loads every converter spec (.yaml) in folder.
+
+        RETURNS:
+            list of spec dicts, sorted by file name.
+    '''
+    specs = []
+    if not os.path.isdir(folder):
+        return specs
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.endswith('.yaml'):
+            with open(os.path.join(folder, file_name), 'r') as file:
+                specs.append(yaml.safe_load(file))
+    return specs
+
+class l1_converter(sensor_parent):
+    '''
+        Converts the data from one packet processor up to L1 with the transforms in its spec, and saves it.
+
+        ARGS:
+            coms : message handler.
+            spec : the converter spec, with
+                name : name of the sensor (it has to be in sensor_config.sensors_config).
+                table : name of the table to save to.
+                samples : 'first' to only keep the first sample of each column, 'all' (default) to keep every sample.
+                data_overwrite_exception : (optional) passed to sensor_parent, True by default.
+                columns : list of {name, type, options (optional), steps (optional)}, the steps are column_transform steps.
+    '''
+    def __init__(self, coms, spec:dict):
+        self.__name = spec['name']
+        self.__config = sensor_config.sensors_config[self.__name]
+        self.__coms = coms
+        self.__logger = logger(f'logs/{self.__name}.txt')
+        self.__table = spec['table']
+        if spec.get('samples', 'all') not in ('first', 'all'):
+            raise RuntimeError(f"samples for {self.__name} has to be first or all.")
+        self.__first_sample_only = spec.get('samples', 'all') == 'first'
+
+        self.__table_structure = {
+            self.__table : [[column['name'], 0, column['type']] + list(column.get('options', [])) for column in spec['columns']]
+        }
+        self.__column_names = [column['name'] for column in spec['columns']]
+        # compile the steps for every column into one calibration, this is the only time the spec is looked at
+        self.__calibration = l1_calibration({column['name'] : column_transform(column['steps']) for column in spec['columns'] if 'steps' in column})
+
+        # NOTE: if you change the table_structure, you need to clear the database/dataTypes.dtobj and database/dataTypes_backup.dtobj DO NOT delete the file, just delete everything in side the file.
+        sensor_parent.__init__(self, coms=self.__coms, config= self.__config, name=self.__name, db_name = sensor_config.database_name, table_structure=self.__table_structure, data_overwrite_exception = spec.get('data_overwrite_exception', True))
+        sensor_parent.set_sensor_status(self, 'Running')
+
+    def process_data(self, _):
+        '''
+            This function gets called when one of the tap request gets any data.
+
+            NOTE: This function always gets called no matter with tap gets data.
+        '''
+        data = sensor_parent.get_data_received(self, self.__config['tap_request'][0])
+        if self.__first_sample_only:
+            data = {key : list(data[key][:1]) for key in data}
+        rows = max((len(data[key]) for key in data), default=0)
+        if any(len(data[key]) != rows for key in data):
+            self.__logger.send_log(f"Columns in the batch are not all {rows} rows long, they will not line up in {self.__table}.")
+        # columns we did not get are filled with None so every column has a value for every row
+        buffer = {name : [None] * rows for name in self.__column_names}
+        buffer = self.__calibration.calibrate(data, buffer)
+        sensor_parent.save_data(self, table=self.__table, data=buffer)
@@ -0,0 +1,101 @@
+'''
+    This module turns a batch of raw telemetry packets into the columns sobj_packet_processor saves and publishes. It is kept apart
+    from the processor (and only needs numpy) so the decoding can also be done in a worker process, see get_decode_pool.
+'''
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from sensor_interface_api.utc_conversion import utc_string_format, utcs_from_clks_batch, format_utc_column # pylint: disable=e0401
+
+decode_pool = None
+decode_pool_lock = threading.Lock()
+
+def get_decode_pool(max_workers:int = None, start_method:str = 'spawn'):
+    '''
+        Returns the process pool that packet processors in process mode share, starting it the first time this is called.
+
+        NOTE: with the spawn (or forkserver) start method the worker processes import the main module, so the main script has to
+        keep its start up code under if __name__ == '__main__'.
+
+        ARGS:
+            max_workers : number of worker processes, None uses one per cpu.
+            start_method : multiprocessing start method for the workers. The default is spawn, forking a process with
+                this many threads running is not safe.
+    '''
+    global decode_pool # pylint: disable=W0603
+    if decode_pool_lock.acquire(timeout=10): # pylint: disable=R1732
+        if decode_pool is None:
+            decode_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method))
+        pool = decode_pool
+        decode_pool_lock.release()
+    else :
+        raise RuntimeError("Could not acquire decode pool lock")
+    return pool
+
+def utc_columns_from_snapshot(system_clks_ms:list, real_time_clks_s:list, correlation_snapshot):
+    '''
+        Converts the clocks for a batch of granules to utc strings with a time correlation table snapshot (see
+        time_correlation_index.get_snapshot). If there is no entry for a clock the result is the same as utc from a timestamp of 0.
+
+        RETURNS:
+            system_clk_utcs, real_time_clk_utcs : list of lists of formatted utc strings, in the same shape as the clocks.
+    '''
+    system_clk_utc, real_time_clk_utc, found = utcs_from_clks_batch(system_clks_ms, real_time_clks_s, *correlation_snapshot)
+    fallback = datetime.fromtimestamp(0).strftime(utc_string_format)
+    return format_utc_column(system_clk_utc, found, fallback), format_utc_column(real_time_clk_utc, found, fallback[:-3], trim=3)
+
+def picklable_packets(packets:list):
+    '''
+        Returns the packets as bytes so they can be sent to a worker process. Packets out of a zero copy shared memory tap are
+        memoryviews, and those can't be pickled. Packets that are already bytes are passed through without a copy.
+    '''
+    return [packet if isinstance(packet, bytes) else bytes(packet) for packet in packets]
+
+def decode_packet_batch(unpacking_plan, packets:list, columns:list, channel_names:list, granule_deltas_ms:list, clock_offsets:tuple, correlation_snapshot = None):
+    '''
+        Decodes a batch of packets into one column per field with a row for every granule.
+
+        ARGS:
+            unpacking_plan : packet_unpacker.granule_unpacking_plan for the packet.
+            packets : list of the packets (bytes).
+            columns : names of every column to make.
+            channel_names : column name for each channel, in the order they are in the granule.
+            granule_deltas_ms : time from the start of the packet to each granule.
+            clock_offsets : (ccsds header length, system clock length) in bytes, the clocks come right after the header.
+            correlation_snapshot : time correlation table snapshot to convert the clocks to utc with. If this is None the
+                utc columns are not filled in, and the caller has to do it.
+
+        RETURNS:
+            batch : dict of columns.
+            granule_sys_clks_ms : list of lists (one per packet) of the system clock for each granule.
+            granule_real_time_clks_s : list of lists (one per packet) of the real time clock for each granule.
+    '''
+    header_len, system_clock_len = clock_offsets
+    granule_count = len(granule_deltas_ms)
+    batch = {key : [0xFFFFFFFF] * (len(packets) * granule_count) for key in columns}
+    batch['granule_index'] = list(range(granule_count)) * len(packets)
+
+    granule_values = unpacking_plan.unpack(packets).tolist() # unpack every channel of every granule for the whole batch at once
+    granule_sys_clks_ms = []
+    granule_real_time_clks_s = []
+    for row, packet in enumerate(packets):
+        sys_clk_ms = int.from_bytes(packet[header_len+1:header_len+5], 'big')
+        real_time_clk_s = int.from_bytes(packet[header_len+system_clock_len+1:header_len+system_clock_len+4], 'big')
+        granule_sys_clks_ms.append([sys_clk_ms + int(granule_delta_ms) for granule_delta_ms in granule_deltas_ms])
+        granule_real_time_clks_s.append([real_time_clk_s + int(granule_delta_ms / 1000) for granule_delta_ms in granule_deltas_ms])
+
+        cells = slice(row * granule_count, (row + 1) * granule_count)
+        batch['time_STM_CLK'][cells] = granule_sys_clks_ms[row]
+        batch['time_RTC'][cells] = granule_real_time_clks_s[row]
+        batch['received_at'][cells] = [datetime.now(timezone.utc).timestamp()] * granule_count
+        batch['packet_count'][cells] = [((packet[2] << 8) | (packet[3])) & 0x3FFF] * granule_count
+        for i, channel_name in enumerate(channel_names):
+            batch[channel_name][cells] = [values[i] for values in granule_values[row]]
+
+    if correlation_snapshot is not None:
+        system_clk_utcs, real_time_clk_utcs = utc_columns_from_snapshot(granule_sys_clks_ms, granule_real_time_clks_s, correlation_snapshot)
+        batch['time_STM_CLK_UTC'] = [value for packet_utcs in system_clk_utcs for value in packet_utcs]
+        batch['time_RTC_UTC'] = [value for packet_utcs in real_time_clk_utcs for value in packet_utcs]
+    return batch, granule_sys_clks_ms, granule_real_time_clks_s
@@ -0,0 +1,90 @@
+'''
+    This module unpacks the granules in a batch of telemetry packets all at once with numpy, rather than pulling the bits out
+    one channel (and one bit) at a time.
+'''
+import numpy as np
+
+class granule_unpacking_plan():
+    '''
+        Works out where every channel of every granule sits in a packet once, when the packet processor is set up, and then uses that
+        to pull every channel out of a whole batch of packets with a handful of numpy operations.
+
+        The values match what the old bitarray unpacking gave: fields bigger than 32 bits come out as 0 (the channels after them
+        are still found in the right spot, see get_too_wide_channels to warn about them), signed fields are sign extended, and a
+        field that runs off the end of a short packet is made from however many of its bits are there.
+
+        ARGS:
+            word_lengths : number of bits in each channel, in the order they are packed into a granule.
+            signed : True for each channel that is a signed (two's complement) value.
+            granule_count : number of granules in each packet.
+            start_bit : bit position in the packet where the first granule starts.
+    '''
+    max_word_length = 32
+    window_bytes = 5 # five bytes always covers a 32 bit word, no matter what bit it starts on
+    max_fields_per_chunk = 1 << 20 # keeps the temp arrays from getting too big when a batch has a lot of packets
+
+    def __init__(self, word_lengths:list, signed:list, granule_count:int, start_bit:int) -> None:
+        self.__too_wide_channels = [channel for channel, word_length in enumerate(word_lengths) if word_length > self.max_word_length]
+        widths = np.array(word_lengths, dtype=np.int64)
+        channel_offsets = np.cumsum(widths) - widths
+        granule_offsets = int(widths.sum()) * np.arange(granule_count, dtype=np.int64)
+        starts = (start_bit + granule_offsets[:, None] + channel_offsets[None, :]).ravel() # granule major, the same order they are in the packet
+
+        self.__granule_count = granule_count
+        self.__channel_count = len(word_lengths)
+        self.__starts = starts
+        self.__widths = np.tile(widths, granule_count)
+        self.__signed = np.tile(np.array(signed, dtype=bool), granule_count)
+        self.__too_wide = self.__widths > self.max_word_length
+        self.__byte_index = (starts // 8)[:, None] + np.arange(self.window_bytes)
+        self.__bit_offset = (starts % 8).astype(np.uint64)
+        self.__min_packet_width = int(self.__byte_index.max()) + 1 if len(starts) > 0 else 0
+    def get_too_wide_channels(self):
+        '''
+            Returns the index of every channel that is more than 32 bits wide, these always unpack as 0.
+        '''
+        return list(self.__too_wide_channels)
+    def unpack(self, packets:list):
+        '''
+            Unpacks every granule in a list of packets (bytes, bytearray or memoryview).
+
+            RETURNS:
+                numpy int64 array shaped (packets, granules, channels)
+        '''
+        values = np.zeros((len(packets), self.__granule_count * self.__channel_count), dtype=np.int64)
+        if len(packets) == 0 or values.shape[1] == 0:
+            return values.reshape(len(packets), self.__granule_count, self.__channel_count)
+
+        packet_lengths = np.fromiter((len(packet) for packet in packets), dtype=np.int64, count=len(packets))
+        raw = np.zeros((len(packets), max(int(packet_lengths.max()), self.__min_packet_width)), dtype=np.uint8)
+        if np.all(packet_lengths == packet_lengths[0]): # normally every packet for an apid is the same size, so we can do this in one go
+            raw[:, :packet_lengths[0]] = np.frombuffer(bytes().join(packets), dtype=np.uint8).reshape(len(packets), packet_lengths[0])
+        else :
+            for row, packet in enumerate(packets):
+                raw[row, :len(packet)] = np.frombuffer(packet, dtype=np.uint8)
+
+        chunk_size = max(1, self.max_fields_per_chunk // values.shape[1])
+        for chunk_start in range(0, len(packets), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            values[chunk] = self.__unpack_chunk(raw[chunk], packet_lengths[chunk])
+        return values.reshape(len(packets), self.__granule_count, self.__channel_count)
+    def __unpack_chunk(self, raw, packet_lengths):
+        '''
+            Unpacks the fields for a chunk of packets that have already been put into a zero padded uint8 array.
+        '''
+        # bits of each field that are actually in the packet (short packets can cut the last fields off)
+        bits = np.clip(packet_lengths[:, None] * 8 - self.__starts[None, :], 0, self.__widths[None, :])
+        bits = np.where(self.__too_wide[None, :], 0, bits).astype(np.uint64) # too wide for the window, these come out as 0
+
+        window = np.zeros(bits.shape, dtype=np.uint64)
+        gathered = raw[:, self.__byte_index]
+        for byte in range(self.window_bytes):
+            window = (window << np.uint64(8)) | gathered[:, :, byte]
+
+        shift = np.uint64(self.window_bytes * 8) - self.__bit_offset[None, :] - bits
+        values = ((window >> shift) & ((np.uint64(1) << bits) - np.uint64(1))).astype(np.int64)
+
+        # sign extension, if the top bit of a signed field is set it is negative
+        top_bit = (values >> np.maximum(bits.astype(np.int64) - 1, 0)) & 1
+        negative = self.__signed[None, :] & (bits > 0) & (top_bit == 1)
+        return np.where(negative, values - (np.int64(1) << bits.astype(np.int64)), values)
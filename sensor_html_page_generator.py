@@ -2,19 +2,62 @@
     This modules takes in information from the users config parameter in the main file and
     then generates a sensor html page. 
 '''
+import os
+import hashlib
+
 from bs4 import BeautifulSoup as bs
 class sensor_html_page_generator():
     '''
         This will generate an html page and then returns its file path when requested.
 
+        NOTE: the page is only built the first time it is asked for, and then cached until the config changes (or 
+        invalidate_html_page is called). The file is only written when what is in it would change.
+
         ARGS:
             sensor_name : the name of the sensor, it will play into the name of the html file generated.
             config : this is the users presets they made. 
     '''
-    def __init__(self, sensor_name, config, graphs: bool = False) -> None: # pylint: disable=r0915
+    def __init__(self, sensor_name, config, graphs: bool = False) -> None:
         self.__sensor_name = sensor_name
         self.__config = config
+        self.__graphs = graphs
+        self.__soup = None
+        self.__rendered_page = None
+        self.__rendered_key = None # what the config and graphs looked like when we rendered the page
+        self.__written_hashes = {} # file path -> sha256 of what we last wrote there
+    def __page_key(self):
+        '''
+            Returns something that changes whenever the page would change.
+        '''
+        return (repr(list(self.__config.items())), self.__graphs)
+    def invalidate_html_page(self, graphs: bool = None):
+        '''
+            Throws away the cached page so it is built again the next time it is asked for. 
 
+            ARGS:
+                graphs : (optional) change whether the page has graphs.
+        '''
+        if graphs is not None:
+            self.__graphs = graphs
+        self.__soup = None
+        self.__rendered_page = None
+        self.__rendered_key = None
+    def render_html_page(self):
+        '''
+            Returns the page as a string, it is only built (and prettified) again if the config or graphs changed.
+        '''
+        key = self.__page_key()
+        if self.__rendered_page is None or key != self.__rendered_key:
+            self.__build_page()
+            self.__rendered_page = self.__soup.prettify()
+            self.__rendered_key = key
+            self.__soup = None # we only need the string from here on
+        return self.__rendered_page
+    def __build_page(self): # pylint: disable=r0915
+        '''
+            Builds the BeautifulSoup tree for the page.
+        '''
+        graphs = self.__graphs
         ###################### Create page head ################################
         # Create a new BeautifulSoup object
         self.__soup = bs(features='html.parser')
@@ -195,13 +238,20 @@ class sensor_html_page_generator():
     
     def generate_html_file(self, file_path):
         '''
-        Generate the HTML file.
+        Generate the HTML file. The file is only written if it is not already what the page is.
 
         Args:
             file_path : str : the file path where the HTML file will be saved.
         '''
-        # Write HTML content to the file
-        with open(file_path, "w") as file:
-            file.write(self.__soup.prettify())
+        page = self.render_html_page()
+        page_hash = hashlib.sha256(page.encode()).hexdigest()
+        if file_path not in self.__written_hashes and os.path.exists(file_path): # we have not written it yet, but a past run might have
+            with open(file_path, "rb") as file:
+                self.__written_hashes[file_path] = hashlib.sha256(file.read()).hexdigest()
+        if self.__written_hashes.get(file_path) != page_hash or not os.path.exists(file_path):
+            # Write HTML content to the file
+            with open(file_path, "w") as file:
+                file.write(page)
+            self.__written_hashes[file_path] = page_hash
 
         return file_path
@@ -0,0 +1,173 @@
+'''
+    This module is the metrics every sensor_parent keeps about itself (counters, latency histograms and gauges), so we can see where
+    the time goes without logging on every call. Updating a metric is a lock and an add, so they are left on all the time. The
+    metrics can be exported as a dict (for json) or as text in the prometheus exposition format.
+'''
+import time
+import threading
+from bisect import bisect_left
+
+# bucket upper bounds (seconds) for latency histograms, 10 us to 10 s
+default_latency_bounds = tuple(scale * 10.0 ** power for power in range(-5, 1) for scale in (1, 2.5, 5)) + (10.0,)
+
+def label_text(labels:dict):
+    '''
+        Returns the labels as they go in the exposition format, {name="value",...}.
+    '''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+class metric_counter():
+    '''
+        A number that only goes up (packets received, bytes, drops ...).
+
+        ARGS:
+            lock : the registry's lock.
+    '''
+    def __init__(self, lock) -> None:
+        self.__lock = lock
+        self.__value = 0
+    def inc(self, amount = 1):
+        '''
+            Adds amount to the counter.
+        '''
+        with self.__lock:
+            self.__value += amount
+    def get(self):
+        '''
+            Returns the value of the counter.
+        '''
+        return self.__value
+
+class metric_histogram():
+    '''
+        Counts how many observations (normally seconds) fell in each bucket, and keeps their sum and the max.
+
+        ARGS:
+            lock : the registry's lock.
+            bounds : upper bound of each bucket, in order. Anything bigger than the last one goes in the +Inf bucket.
+    '''
+    def __init__(self, lock, bounds:tuple = default_latency_bounds) -> None:
+        self.__lock = lock
+        self.__bounds = tuple(bounds)
+        self.__counts = [0] * (len(self.__bounds) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+        self.__max = 0.0
+    def observe(self, value):
+        '''
+            Adds one observation.
+        '''
+        bucket = bisect_left(self.__bounds, value)
+        with self.__lock:
+            self.__counts[bucket] += 1
+            self.__sum += value
+            self.__count += 1
+            if value > self.__max:
+                self.__max = value
+    def observe_since(self, start:float):
+        '''
+            Adds the seconds since start (a time.perf_counter() value) as an observation.
+        '''
+        self.observe(time.perf_counter() - start)
+    def get(self):
+        '''
+            Returns the histogram as a dict, buckets are cumulative (the count of observations less than or equal to each bound).
+        '''
+        with self.__lock:
+            counts = list(self.__counts)
+            total = self.__sum
+            count = self.__count
+            largest = self.__max
+        cumulative = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return {
+            'count' : count,
+            'sum' : total,
+            'max' : largest,
+            'buckets' : dict(zip([str(bound) for bound in self.__bounds] + ['+Inf'], cumulative)),
+        }
+
+class metrics_registry():
+    '''
+        All the metrics for one sensor. Make the metrics once (normally in __init__) and keep them, updating one does not look
+        anything up.
+
+        ARGS:
+            sensor_name : added to every metric as the sensor label.
+    '''
+    def __init__(self, sensor_name:str) -> None:
+        self.__sensor_name = sensor_name
+        self.__lock = threading.Lock()
+        self.__metrics = {} # (name, labels text) -> (kind, help, labels, metric)
+    def __add(self, kind, name, help_text, labels, make):
+        labels = dict({'sensor' : self.__sensor_name}, **(labels if labels is not None else {}))
+        key = (name, label_text(labels))
+        if key not in self.__metrics:
+            self.__metrics[key] = (kind, help_text, labels, make())
+        elif self.__metrics[key][0] != kind:
+            raise RuntimeError(f"{name} is already a {self.__metrics[key][0]}.")
+        return self.__metrics[key][3]
+    def counter(self, name:str, help_text:str, labels:dict = None):
+        '''
+            Returns the counter with this name and labels (it is made the first time).
+        '''
+        return self.__add('counter', name, help_text, labels, lambda: metric_counter(self.__lock))
+    def histogram(self, name:str, help_text:str, labels:dict = None, bounds:tuple = default_latency_bounds):
+        '''
+            Returns the histogram with this name and labels (it is made the first time).
+        '''
+        return self.__add('histogram', name, help_text, labels, lambda: metric_histogram(self.__lock, bounds))
+    def gauge(self, name:str, help_text:str, function, labels:dict = None):
+        '''
+            Adds a gauge, function is called when the metrics are exported and returns the value. Use this for things that are
+            already kept somewhere else (like queue depths) so keeping them up to date costs nothing.
+        '''
+        return self.__add('gauge', name, help_text, labels, lambda: function)
+    def __values(self, extra_gauges):
+        values = []
+        for (name, labels_key), (kind, help_text, labels, metric) in list(self.__metrics.items()):
+            if kind == 'gauge':
+                values.append((kind, name, help_text, labels, labels_key, metric()))
+            else :
+                values.append((kind, name, help_text, labels, labels_key, metric.get()))
+        for name, help_text, labels, value in extra_gauges:
+            labels = dict({'sensor' : self.__sensor_name}, **labels)
+            values.append(('gauge', name, help_text, labels, label_text(labels), value))
+        return values
+    def snapshot(self, extra_gauges:list = None):
+        '''
+            Returns every metric as a dict that can be turned into json.
+
+            ARGS:
+                extra_gauges : (optional) list of (name, help, labels, value) to add as gauges, for values you only have at export time.
+
+            RETURNS:
+                {'sensor', 'time', 'counters', 'gauges', 'histograms'}, each one a dict of 'name{labels}' -> value.
+        '''
+        snapshot = {'sensor' : self.__sensor_name, 'time' : time.time(), 'counters' : {}, 'gauges' : {}, 'histograms' : {}}
+        for kind, name, _, _, labels_key, value in self.__values(extra_gauges if extra_gauges is not None else []):
+            snapshot[kind + 's'][name + labels_key] = value
+        return snapshot
+    def to_text(self, extra_gauges:list = None):
+        '''
+            Returns every metric in the prometheus text exposition format. extra_gauges is the same as for snapshot.
+        '''
+        lines = []
+        described = set()
+        values = sorted(self.__values(extra_gauges if extra_gauges is not None else []), key=lambda value: value[1]) # the format wants each name together
+        for kind, name, help_text, labels, labels_key, value in values:
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                for bound, count in value['buckets'].items():
+                    lines.append(f'{name}_bucket{label_text(dict(labels, le=bound))} {count}')
+                lines.append(f'{name}_sum{labels_key} {value["sum"]}')
+                lines.append(f'{name}_count{labels_key} {value["count"]}')
+            else :
+                lines.append(f'{name}{labels_key} {value}')
+        return '\n'.join(lines) + '\n'
@@ -7,11 +7,22 @@ import threading
 import copy
 import time
 import re
+import os
+import atexit
 from datetime import datetime
+from collections.abc import Mapping
 
 #Custom imports
 from threading_python_api.threadWrapper import threadWrapper # pylint: disable=e0401
 from sensor_interface_api.sensor_html_page_generator import sensor_html_page_generator # pylint: disable=e0401
+from sensor_interface_api.ccsds_packet_scanner import scan_ccsds_packets # pylint: disable=e0401
+from sensor_interface_api.byte_ring_buffer import byte_ring_buffer # pylint: disable=e0401
+from sensor_interface_api.tap_payload import freeze_payload, copy_payload # pylint: disable=e0401
+from sensor_interface_api.tap_queue import tap_queue, default_tap_queue_capacity # pylint: disable=e0401
+from sensor_interface_api.graph_series import graph_series # pylint: disable=e0401
+from sensor_interface_api.sensor_metrics import metrics_registry # pylint: disable=e0401
+from sensor_interface_api.table_spill import table_spill_file # pylint: disable=e0401
+from sensor_interface_api.shared_memory_tap import shared_tap_batch, write_shared_batch # pylint: disable=e0401
 import system_constants as sys_c # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom # pylint: disable=e0401
 
@@ -25,7 +36,7 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
          set_sensor_status : Returns where the sensor is running or not. NOTE: threadWrapper has its own set_status, used by the system, so thats why the name is longer. 
          get_sensor_status : should return Running, Error, Not running. 
          get_data_received : Returns the last sample the sensor returned.
-         get_taps : Returns a list of taps that the user has requested for this class. 
+         get_taps : Returns a tuple of taps that the user has requested for this class. 
          process_data : This is the function that is called when the data_received event is called. 
          make_data_tap : sends a request to another class telling it to send data to this class.
          send_tap : this function is what the serial listener calls to send the tab to this class.
@@ -39,7 +50,8 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
          publish_data : Notifies the system that data is published of the given data type. 
          add_graph_data : adds an x and y point
          get_data_report : returns the data report to the webpage
-         get_graph_names : returns the list of graphs for this sensor
+         get_data_report_since : returns only the graph points the webpage has not seen yet
+         get_graph_names : returns the tuple of graphs for this sensor
          get_last_published_data : returns the last thing published and the time it was published at.
          preprocess_data : this function may work for you if your data comes in in chucks, and needs to be put back together. See the function docer string. 
          set_thread_status : set the status for your processing threads. 
@@ -57,22 +69,25 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         ###################### Sensor information ################################
         self.__logger = loggerCustom(f"logs/sensor_parent/{name}.txt") # pylint: disable=W0238
         self.__coms = coms
-        self.__status_lock = threading.Lock()
+        # NOTE: the status, name, taps, graph names and last published data are never changed in place, a new value is made and
+        # swapped in instead. Swapping an attribute is atomic, so the getters (that the web server polls every second
+        # for every sensor) don't need a lock or a copy.
         self.__status = "Not Running"
-        self.__data_received = {}
+        self.__data_received = {} # tap name -> tap_queue
         self.__data_lock = threading.Lock()
+        self.__tap_space = threading.Condition(self.__data_lock) # publishers wait on this when a tap queue with the block policy is full
         self.__tap_requests = []
         self.__tap_requests_lock = threading.Lock()
         self.__tap_subscribers = []
+        self.__tap_transports = [] # how each subscriber wants its data, 'direct' or 'shared_memory'
         self.__tap_subscribers_lock = threading.Lock()
         self.__config = config
         # self.__config_lock = threading.Lock()
         self.__publish_data = []
         self.__publish_data_lock = threading.Lock()
-        self.__taps = []
+        self.__taps = ()
         self.__has_been_published  = True
         self.__has_been_published_lock = threading.Lock()
-        self.__name_lock = threading.Lock()
         self.__data_buffer_overwrite = False
         self.__data_buffer_overwrite_lock = threading.Lock()
         self.__data_overwrite_exception = data_overwrite_exception # pylint: disable=W0238
@@ -83,44 +98,98 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         else :
             raise RuntimeError(f'The name {name}, is not a valid sensor name because it does not match the standard file format. Please change the name.')
         # self.__logger = loggerCustom(f"logs/sensor_parent_{self.__name}.txt")
+        ############ metrics (see get_metrics) ############
+        self.__metrics = metrics_registry(self.__name)
+        self.__batches_received = self.__metrics.counter('sensor_tap_batches_received_total', 'Batches received on our taps.')
+        self.__items_received = self.__metrics.counter('sensor_tap_items_received_total', 'Items (packets, rows or columns) in the batches received on our taps.')
+        self.__batches_published = self.__metrics.counter('sensor_tap_batches_published_total', 'Batches sent to our subscribers, one per subscriber.')
+        self.__items_published = self.__metrics.counter('sensor_tap_items_published_total', 'Items in the batches sent to our subscribers.')
+        self.__tap_timeouts = self.__metrics.counter('sensor_tap_timeouts_total', 'Times a publisher gave up waiting for us to take its data.')
+        self.__bytes_received = self.__metrics.counter('sensor_bytes_received_total', 'Bytes of stream data handed to preprocess_ccsds_data.')
+        self.__packets_received = self.__metrics.counter('sensor_packets_received_total', 'Packets found by preprocess_ccsds_data.')
+        self.__bad_packet_batches = self.__metrics.counter('sensor_bad_packet_batches_total', 'Batches where preprocess_ccsds_data found a bad packet header.')
+        self.__saves = self.__metrics.counter('sensor_saves_total', 'Calls to save_data and save_byte_data.')
+        self.__process_data_seconds = self.__metrics.histogram('sensor_process_data_seconds', 'Time spent in process_data.')
+        self.__send_tap_seconds = self.__metrics.histogram('sensor_send_tap_seconds', 'Time spent in send_tap (on the publishers thread), waiting included.')
+        self.__save_seconds = self.__metrics.histogram('sensor_save_data_seconds', 'Time spent in save_data and save_byte_data.')
+        self.__publish_seconds = self.__metrics.histogram('sensor_publish_seconds', 'Time spent sending a publish to every subscriber.')
+        self.__tap_send_errors = self.__metrics.counter('sensor_tap_send_errors_total', 'Publishes where a subscribers send_tap raised.')
+        self.__backpressure_seconds = self.__metrics.histogram('sensor_tap_backpressure_seconds', 'Time publishers waited in send_tap for a tap queue to have room.')
+        self.__data_lock_wait = self.__metrics.histogram('sensor_lock_wait_seconds', 'Time spent waiting to acquire a lock.', {'lock' : 'data'})
+        self.__data_buffer_lock_wait = self.__metrics.histogram('sensor_lock_wait_seconds', 'Time spent waiting to acquire a lock.', {'lock' : 'data_buffer_overwrite'})
         self.__events = events_dict
         self.__active = False
         self.__active__lock = threading.Lock()
         self.__interval_pub = self.__config['interval_pub']
-        self.__taps_lock = threading.Lock()
+        # In zero copy mode published data is frozen once and every subscriber gets a reference to it, and the data we receive 
+        # on our taps is handed to process_data as is. Only turn this on if your process_data does not change the data it gets.
+        self.__zero_copy_taps = self.__config.get('zero_copy_taps', 'no') == 'yes'
+        # How long (seconds) a publisher will wait for room in one of our tap queues before giving up. By default it then logs
+        # it, counts it and adds the data anyway, tap_timeout_exception 'yes' raises an error (on the publishers thread) instead.
+        self.__tap_timeout = self.__config.get('tap_timeout', 10)
+        self.__tap_timeout_exception = self.__config.get('tap_timeout_exception', 'no') == 'yes'
+        # Every tap gets its own queue of batches, tap_queue_capacity is the max number of batches it holds and 
+        # tap_overflow_policy is what happens when it is full (block, drop_oldest, drop_newest or spill). With the default
+        # a slow subscriber holds up its publisher instead of using up the memory, 0 turns the limit off.
+        self.__tap_queue_capacity = self.__config.get('tap_queue_capacity', default_tap_queue_capacity)
+        self.__tap_overflow_policy = self.__config.get('tap_overflow_policy', 'block')
+        # How we ask publishers to send us data. 'direct' passes the python objects, 'shared_memory' has the publisher write 
+        # each batch into a shared memory segment that we map read only, so the publisher can be in another process.
+        self.__tap_transport = self.__config.get('tap_transport', 'direct')
         self.__last_published_data = {
             'time' : 'NA',
             'data' : 'NA'
         }
-        self.__last_published_data_lock = threading.Lock()
         self.__db_name = db_name
+        # Saves are collected per table and sent to the database together once save_batch_rows rows are waiting, or once the 
+        # first of them has waited save_batch_latency seconds. save_batch_rows of 1 (the default) sends every save right away.
+        self.__save_batch_rows = self.__config.get('save_batch_rows', 1)
+        self.__save_batch_latency = self.__config.get('save_batch_latency', 0.5)
+        self.__pending_saves = {} # (request, table) -> [columns, row count, number of save calls]
+        self.__pending_saves_lock = threading.Lock()
+        self.__save_timer = None
+        if self.__save_batch_rows > 1:
+            atexit.register(self.flush_saves) # don't lose rows that are still waiting when we shut down
+        # If the database queue (sys_c.database_queue_depth, set by the main script) gets deeper than spill_queue_depth our saves 
+        # go to a spill file per table in spill_folder instead, and a replay thread sends them once the database catches up. 
+        # spill_queue_depth of 0 (the default) never spills.
+        self.__spill_queue_depth = self.__config.get('spill_queue_depth', 0)
+        self.__spill_folder = os.path.join(self.__config.get('spill_folder', 'spill'), name)
+        self.__spill_replay_interval = self.__config.get('spill_replay_interval', 1)
+        self.__spill_files = {} # (request, table) -> table_spill_file
+        self.__spill_lock = threading.Lock()
+        self.__replaying_spills = False
         ##########################################################################
         ################ Set up the database tables according ####################
         if not table_structure is None:
             self.__coms.send_request(self.__db_name, ['create_table_external', table_structure])
         ##########################################################################
         ###################### set up the html graphs stuff ######################
-        self.__graphs = graphs
+        self.__graphs = tuple(graphs) if graphs is not None else None
         self.__max_data_points = max_data_points
+        # summary levels let get_data_report show a much longer history than max_data_points, see graph_series. They cost 
+        # something on every add_graph_data call, so they are off unless the sensor asks for them.
+        self.__graph_summary_levels = self.__config.get('graph_summary_levels', 0)
+        self.__graph_summary_factor = self.__config.get('graph_summary_factor', 10)
         self.__data_report = {}
         if not self.__graphs is None:
             for graph in self.__graphs:
-                self.__data_report[graph] = {
-                    'x' : [],
-                    'y' : [],
-                }
+                self.__data_report[graph] = graph_series(self.__max_data_points, self.__graph_summary_levels, self.__graph_summary_factor)
         self.__data_report_lock = threading.Lock()
-        self.__graphs_lock = threading.Lock()
         ##########################################################################
         ############ Set up the Events according to the config file ############
         if self.__config['tap_request'] is not None:
             for request in self.__config['tap_request']:
                 # Now we need to build the event dict
-                self.__events[f'data_received_for_{request}'] = self.process_data
+                self.__events[f'data_received_for_{request}'] = self.__timed_process_data
+                self.__data_received[request] = tap_queue(self.__tap_queue_capacity, self.__tap_overflow_policy) #make a spot in the data received for this tap info to be added to. 
         ##################### set up the threadWrapper stuff #####################
         self.__function_dict = { 
             'create_tap' : self.create_tap,
-            'ready_for_data': self.ready_for_data
+            'ready_for_data': self.ready_for_data,
+            'get_tap_stats' : self.get_tap_stats,
+            'flush_saves' : self.flush_saves,
+            'get_metrics' : self.get_metrics,
         }
         threadWrapper.__init__(self, self.__function_dict, self.__events)
         ##########################################################################
@@ -131,8 +200,18 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         # debug it if we do
         self.__html_lock = threading.Lock()
         ##########################################################################
-        ################## initialize byte array for incomplete packets ##########
-        self.__extra_packet_data = bytearray()
+        ################## initialize byte buffer for incomplete packets #########
+        self.__packet_buffer = byte_ring_buffer(self.__config.get('packet_buffer_size', 1 << 20))
+        ##########################################################################
+        ################ pick up saves spilled by the last run ###################
+        if self.__spill_queue_depth > 0 and os.path.isdir(self.__spill_folder):
+            for file_name in os.listdir(self.__spill_folder):
+                if file_name.endswith('.spill') or file_name.endswith('.spill.replaying'):
+                    table, request = file_name.removesuffix('.replaying').removesuffix('.spill').rsplit('.', 1)
+                    self.__get_spill_file(request, table)
+            if len(self.__spill_files) > 0:
+                self.__replaying_spills = True
+                self.__coms.send_request('task_handler', ['add_thread_request_func', self.replay_spills, f'spill replay for {self.__name}', self])
     def set_up_taps(self):
         '''
             Set up the taps for the sensor class. This needs to be called out side of the __init__ function
@@ -142,10 +221,9 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         if self.__config['tap_request'] is not None:
             for request in self.__config['tap_request']:
                 self.make_data_tap(request)
-                self.__data_received[request] = None #make a spot in the data received for this tap info to be added to. 
-            self.__taps = self.__config['tap_request']
+            self.__taps = tuple(self.__config['tap_request'])
         else :
-            self.__taps = ['None']
+            self.__taps = ('None',)
         if self.__config['publisher'] == 'yes':
             if self.__config['passive_active'] == 'active':
                 self.__active = True
@@ -165,29 +243,14 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         '''
             Returns the status of the sensor, it is up to the user to set this status, this function returns that status to the server. 
         '''
-        if self.__status_lock.acquire(timeout=1): # pylint: disable=R1732
-            temp = self.__status
-            self.__status_lock.release()
-        else : 
-            raise RuntimeError("Could not acquire status lock")
-        return temp
+        return self.__status
     def set_sensor_status(self, status):
         '''
             User calls this function to set a status, must be Running, Error, Not running.
         '''
-        if self.__status_lock.acquire(timeout=1): # pylint: disable=R1732
-            if status.lower() =='running':
-                self.__status = status
-            elif status.lower() == 'error':
-                self.__status = status
-            elif status.lower() == 'not running':
-                self.__status = status
-            else :
-                self.__status_lock.release()
-                raise RuntimeError(f"{status} is not a valid status.")
-            self.__status_lock.release()
-        else :
-            raise RuntimeError("Could not acquire status lock")
+        if status.lower() not in ('running', 'error', 'not running'):
+            raise RuntimeError(f"{status} is not a valid status.")
+        self.__status = status
     def set_thread_status(self, status):
         '''
             This function is for setting the threading status AKA your processing threads that get started. USE 'Running', 'Complete' or 'Error'.
@@ -195,7 +258,8 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         threadWrapper.set_status(self, status)
     def ready_for_data(self):
         '''
-            returns if the buffer is ready for data    
+            returns if the buffer is ready for data. NOTE: publishers in this repo do not call this anymore, the backpressure is the
+            tap queues (see send_tap). It is left here for anything outside the sensors that wants to check.
         '''
         if self.__data_buffer_overwrite:
             return False
@@ -207,40 +271,68 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
             thread. If you have large amounts of processing have this function create another thread and process the data on that. 
         '''
         raise NotImplementedError("process_data Not implemented, should process that last data received (data is stored in the __data_received variable).")
+    def __timed_process_data(self, event):
+        '''
+            This is what the data_received events actually call, it runs process_data and keeps track of how long it took.
+        '''
+        start = time.perf_counter()
+        try :
+            self.process_data(event)
+        finally :
+            self.__process_data_seconds.observe_since(start)
     def get_data_received(self, tap_name):
         '''
-            Returns the last data point collected from the given tap
+            Returns all the data collected from the given tap since the last call, every batch in the taps queue is merged into one. 
+            Returns None if nothing has come in.
 
             ARGS:
                 tap_name : the name of the tap you want to get data out of. 
         '''
+        lock_start = time.perf_counter()
         if self.__data_buffer_overwrite_lock.acquire(timeout=5): # pylint: disable=R1732
+            self.__data_buffer_lock_wait.observe_since(lock_start)
             self.__data_buffer_overwrite = False
             self.__data_buffer_overwrite_lock.release()
         else :
             raise RuntimeError("Could not acquire data buffer overwrite lock.")
+        lock_start = time.perf_counter()
         if self.__data_lock.acquire(timeout=5): # pylint: disable=R1732
-            data_copy = copy.deepcopy(self.__data_received[tap_name])
-            self.__data_received[tap_name] = None
+            self.__data_lock_wait.observe_since(lock_start)
+            batches = self.__data_received[tap_name].drain()
+            self.__tap_space.notify_all() # wake up any publishers waiting for room in the queue
             self.__data_lock.release()
         else : 
             raise RuntimeError("Could not acquire data lock")
-        return data_copy
+        # NOTE: the batches are already ours (they were copied in send_tap, or they are frozen in zero copy mode), so we don't need to copy them again here.
+        return self.__merge_tap_batches(batches)
     def make_data_tap(self, name_of_class_to_make_tap):
         '''
             This requests sends a request to the class you want and then that class creates a tap for you to listen too.
         '''
-        if self.__name_lock.acquire(timeout=1): # pylint: disable=R1732
-            temp_name_token = self.__name
-            self.__name_lock.release()
+        if self.__tap_transport == 'direct':
+            self.__coms.send_request(name_of_class_to_make_tap, ['create_tap', self.send_tap, self.__name])
         else :
-            raise RuntimeError("Could not acquire name lock")
-        self.__coms.send_request(name_of_class_to_make_tap, ['create_tap', self.send_tap, temp_name_token])
+            self.__coms.send_request(name_of_class_to_make_tap, ['create_tap', self.send_tap, self.__name, self.__tap_transport])
     def send_tap(self, data, sender):
         '''
             This is the function that is called by the class you asked to make a tap.
+
+            The data goes in the tap queue for sender. If that queue uses the block policy and is full this blocks the publisher 
+            (on the publishers thread) until process_data drains the queue, or until tap_timeout runs out. On a time out we 
+            log it and add the data to the queue anyway, unless tap_timeout_exception is set, then we raise an error.
+        '''
+        start = time.perf_counter()
+        try :
+            self.__receive_tap(data, sender)
+        finally :
+            self.__send_tap_seconds.observe_since(start)
+    def __receive_tap(self, data, sender):
+        '''
+            Does the work for send_tap.
         '''
+        lock_start = time.perf_counter()
         if self.__data_buffer_overwrite_lock.acquire(timeout=5): # pylint: disable=R1732
+            self.__data_buffer_lock_wait.observe_since(lock_start)
             if len(data) <= 0:
                 self.__data_buffer_overwrite = False
                 self.__data_buffer_overwrite_lock.release()
@@ -248,62 +340,112 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
             self.__data_buffer_overwrite_lock.release()
         else :
             raise RuntimeError("Could not acquire data buffer overwrite lock.")
-        
-        not_ready_bool = True
 
-        if self.__data_buffer_overwrite_lock.acquire(timeout=5): # pylint: disable=R1732
-            not_ready_bool = self.__data_buffer_overwrite
-            self.__data_buffer_overwrite_lock.release()
+        # In zero copy mode the publisher froze the data so we can hold onto it, otherwise we need our own copy. 
+        # Shared memory batches are ours once we have the handle, opening one unlinks its segment.
+        if isinstance(data, shared_tap_batch):
+            batch = data.open(copy=not self.__zero_copy_taps)
         else :
-            raise RuntimeError("Could not acquire data buffer overwrite lock.")
-        
-        while not_ready_bool:
-            if self.__data_buffer_overwrite_lock.acquire(timeout=5): # pylint: disable=R1732
-                not_ready_bool = self.__data_buffer_overwrite
-                self.__data_buffer_overwrite_lock.release()
-            else :
-                raise RuntimeError("Could not acquire data buffer overwrite lock.")
-            time.sleep(1)
+            batch = data if self.__zero_copy_taps else copy_payload(data)
+        self.__batches_received.inc()
+        self.__items_received.inc(len(batch))
 
+        lock_start = time.perf_counter()
         if self.__data_lock.acquire(timeout=1): # pylint: disable=R1732
-            # self.__data_received[sender] = copy.deepcopy(data)
-            if isinstance(data, dict):
-                if self.__data_received[sender] is None:
-                    self.__data_received[sender] = {}
-                if data.keys() == self.__data_received[sender].keys():
-                    for key in data.keys():
-                        self.__data_received[sender][key].extend(copy.deepcopy(data[key])) #NOTE: This could make things really slow, depending on the data rate.
-                    self.__logger.send_log(f"Howdy {self.__data_received[sender]}")
-                else:
-                    self.__logger.send_log("this is probabaly bad")
-                    self.__data_received[sender] = copy.deepcopy(data)
-            else:
-                if self.__data_received[sender] is None:
-                    self.__data_received[sender] = []
-                self.__data_received[sender].extend(copy.deepcopy(data))
-            self.__logger.send_log(f"{self.__data_received[sender]}")
+            self.__data_lock_wait.observe_since(lock_start)
+            if sender not in self.__data_received:
+                self.__data_received[sender] = tap_queue(self.__tap_queue_capacity, self.__tap_overflow_policy)
+            received = self.__data_received[sender]
+            if received.get_overflow_policy() == 'block' and received.is_full():
+                wait_start = time.perf_counter()
+                room = self.__tap_space.wait_for(lambda: not received.is_full(), timeout=self.__tap_timeout)
+                self.__backpressure_seconds.observe_since(wait_start)
+                if not room:
+                    self.__tap_timeouts.inc()
+                    if self.__tap_timeout_exception:
+                        self.__data_lock.release()
+                        raise RuntimeError(f"Timed out waiting for {self.__name} to make room for the data from {sender}.")
+                    self.__logger.send_log(f"Timed out waiting for room in the {sender} queue, adding the data anyway.")
+            received.put(batch) # NOTE: the queue depth is in get_metrics now, we used to log it here on every call
             threadWrapper.set_event(self, f'data_received_for_{sender}')
             if sys_c.read_from_file:
                 self.__coms.send_request(sys_c.file_listener_name, ['mark_started', sender])
             self.__data_lock.release()
         else :
             raise RuntimeError("Could not acquire data lock")          
-    def get_taps(self):
+    def __merge_tap_batches(self, batches):
+        '''
+            Merges the batches from a tap queue into one piece of data. Dicts get their columns added together, lists are added together.
+            A single batch is handed back as is, otherwise the batches are copied (shallow) into new lists so frozen batches are never changed.
+        '''
+        if len(batches) == 0:
+            return None
+        if len(batches) == 1:
+            return batches[0]
+        merged = self.__new_merged_batch(batches[0])
+        for batch in batches[1:]:
+            if isinstance(batch, Mapping) and isinstance(merged, Mapping) and batch.keys() == merged.keys():
+                for key in batch.keys():
+                    merged[key].extend(batch[key])
+            elif isinstance(batch, Mapping) or isinstance(merged, Mapping):
+                self.__logger.send_log("this is probabaly bad")
+                merged = self.__new_merged_batch(batch)
+            else :
+                merged.extend(batch)
+        return merged
+    def __new_merged_batch(self, batch):
         '''
-            This function returns the list of requested taps 
+            Makes a new list (or dict of lists) from a batch, that the other batches can be added to. 
         '''
-        if self.__taps_lock.acquire(timeout=1): # pylint: disable=R1732
-            temp = self.__taps
-            self.__taps_lock.release()
+        if isinstance(batch, Mapping):
+            return {key : list(batch[key]) for key in batch.keys()}
+        return list(batch)
+    def get_tap_stats(self):
+        '''
+            Returns the depth and counters (received, dropped, spilled) for each of our tap queues.
+        '''
+        if self.__data_lock.acquire(timeout=1): # pylint: disable=R1732
+            stats = {tap_name : received.get_stats() for tap_name, received in self.__data_received.items()}
+            self.__data_lock.release()
         else :
-            raise RuntimeError("Could not acquire taps lock")
-        return temp
+            raise RuntimeError("Could not acquire data lock")
+        return stats
+    def get_metrics_registry(self):
+        '''
+            Returns this sensors metrics_registry, so the sensor can add its own metrics (bad crc counts and such) next to ours.
+        '''
+        return self.__metrics
+    def get_metrics(self, export_format:str = 'json'):
+        '''
+            Returns the metrics for this sensor, counters (packets and bytes in and out, drops, ...), latency histograms for 
+            process_data, send_tap, save_data and publishing, lock wait times and tap queue depths.
+
+            ARGS:
+                export_format : 'json' for a dict (see metrics_registry.snapshot) or 'text' for the prometheus text format.
+        '''
+        tap_gauges = []
+        for tap_name, stats in self.get_tap_stats().items():
+            tap_gauges.append(('sensor_tap_queue_depth', 'Batches waiting in the tap queue.', {'tap' : tap_name}, stats['depth']))
+            tap_gauges.append(('sensor_tap_queue_max_depth', 'Most batches the tap queue has held.', {'tap' : tap_name}, stats['max_depth']))
+            tap_gauges.append(('sensor_tap_dropped', 'Batches the tap queue dropped because it was full.', {'tap' : tap_name}, stats['dropped']))
+            tap_gauges.append(('sensor_tap_spilled', 'Batches the tap queue spilled to disk because it was full.', {'tap' : tap_name}, stats['spilled']))
+        if export_format == 'json':
+            return self.__metrics.snapshot(tap_gauges)
+        if export_format == 'text':
+            return self.__metrics.to_text(tap_gauges)
+        raise RuntimeError(f"{export_format} is not a metrics format, use json or text.")
+    def get_taps(self):
+        '''
+            This function returns the list (tuple) of requested taps 
+        '''
+        return self.__taps
     def create_tap(self, args):
         '''
             This function creates a tap, a tap will send the data it receives from the requested class to the class that created the tap.
             ARGS:
                 args[0] : tab function to call.  
                 args[1] : name of subscriber.  
+                args[2] : (optional) how to send the data, 'direct' (default) or 'shared_memory'.
         '''
         if args[0] is not None:
             if self.__tap_requests_lock.acquire(timeout=1): # pylint: disable=R1732
@@ -313,6 +455,7 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
                 raise RuntimeError("Could not acquire tap requests lock")
             if self.__tap_subscribers_lock.acquire(timeout=1): # pylint: disable=R1732
                 self.__tap_subscribers.append(args[1])
+                self.__tap_transports.append(args[2] if len(args) > 2 else 'direct')
                 self.__tap_subscribers_lock.release()
             else : 
                 raise RuntimeError("Could not acquire config lock")
@@ -320,22 +463,12 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         '''
             This function returns the name of the sensor.
         '''
-        if self.__name_lock.acquire(timeout=1): # pylint: disable=R1732
-            temp = self.__name
-            self.__name_lock.release()
-        else :
-            raise RuntimeError("Could not acquire name lock")
-        return temp
+        return self.__name
     def start_publisher(self):
         '''
             If it is an active publisher then we will start it on its own thread.
         '''
-        if self.__name_lock.acquire(timeout=1): # pylint: disable=R1732
-            temp_name_token = self.__name
-            self.__name_lock.release()
-        else : 
-            raise RuntimeError("Could not acquire name lock")
-        self.__coms.send_request('task_handler', ['add_thread_request_func', self.publish, f'publisher for {temp_name_token}', self])
+        self.__coms.send_request('task_handler', ['add_thread_request_func', self.publish, f'publisher for {self.__name}', self])
     def publish(self): # pylint: disable=R0915
         '''
             Publishes the data to all the other threads that have requested taps.
@@ -351,15 +484,11 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
             while True:              
                 data_copy = self.send_data_to_tap()
 
-                if self.__last_published_data_lock.acquire(timeout=1): # pylint: disable=R1732
-                    self.__last_published_data['time'] = str(datetime.now())
-                    try :
-                        self.__last_published_data['data'] = ' , '.join(data_copy[-1])
-                    except : # pylint: disable=w0702
-                        self.__last_published_data['data'] = 'Unable to convert last data to string for reporting, this should not affect performance of the publishing.'
-                    self.__last_published_data_lock.release()
-                else :
-                    raise RuntimeError("Could not acquire published data lock")
+                try :
+                    last_data = ' , '.join(data_copy[-1])
+                except : # pylint: disable=w0702
+                    last_data = 'Unable to convert last data to string for reporting, this should not affect performance of the publishing.'
+                self.__last_published_data = {'time' : str(datetime.now()), 'data' : last_data}
                 if self.__has_been_published_lock.acquire(timeout=1): # pylint: disable=R1732
                     self.__has_been_published = True
                     self.__has_been_published_lock.release()
@@ -369,15 +498,11 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         else :
             data_copy = self.send_data_to_tap()
 
-            if self.__last_published_data_lock.acquire(timeout=1): # pylint: disable=R1732
-                self.__last_published_data['time'] = str(datetime.now())
-                try:
-                    self.__last_published_data['data'] = ' , '.join(map(str,data_copy[-1]))
-                except : # pylint: disable=w0702
-                    self.__last_published_data['data'] = 'Unable to convert last data to string for reporting, this should not affect performance of the publishing.'
-                self.__last_published_data_lock.release()
-            else : 
-                raise RuntimeError("Could not acquire last published data lock")
+            try:
+                last_data = ' , '.join(map(str,data_copy[-1]))
+            except : # pylint: disable=w0702
+                last_data = 'Unable to convert last data to string for reporting, this should not affect performance of the publishing.'
+            self.__last_published_data = {'time' : str(datetime.now()), 'data' : last_data}
         if self.__has_been_published_lock.acquire(timeout=1): # pylint: disable=R1732
             self.__has_been_published = True
             self.__has_been_published_lock.release()
@@ -396,32 +521,47 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
         config_copy_subscribers = []
 
         if self.__tap_subscribers_lock.acquire(timeout=1): # pylint: disable=R1732
-            config_copy_subscribers = copy.deepcopy(self.__tap_subscribers)
-
+            config_copy_subscribers = list(self.__tap_subscribers) # the names are strings so a shallow copy is all we need
+            transports_copy = list(self.__tap_transports)
             self.__tap_subscribers_lock.release()
         else : 
             raise RuntimeError('Could not acquire config lock')
 
-        i = 0
-        for subscriber in config_copy_subscribers: #loop on copies
-            temp  = copy.deepcopy(data_copy) #The reason I copy that data again is so that every subscriber gets its own copy of the data it can manipulate.
+        if self.__tap_requests_lock.acquire(timeout=1): # pylint: disable=R1732
+            tap_requests_copy = list(self.__tap_requests)
+            self.__tap_requests_lock.release()
+        else : 
+            raise RuntimeError('Could not acquire tap requests lock')
 
-            is_ready_req_id = self.__coms.send_request(subscriber, ['ready_for_data'])
-            is_ready = self.__coms.get_return(subscriber, is_ready_req_id)
-            while is_ready is not True:
-                time.sleep(0.01)
-                is_ready = self.__coms.get_return(subscriber, is_ready_req_id)
-            
-                if not is_ready:
-                    is_ready_req_id = self.__coms.send_request(subscriber, ['ready_for_data'])
-                    is_ready = self.__coms.get_return(subscriber, is_ready_req_id)
-            if is_ready:
-                if self.__tap_requests_lock.acquire(timeout=10): # pylint: disable=R1732
-                    self.__tap_requests[i](temp, self.get_sensor_name()) # call the get sensor name so that the data is mutex protected.
-                    i += 1
-                    self.__tap_requests_lock.release()
-                else : 
-                    raise RuntimeError('Could not acquire tap requests lock')
+        sensor_name = self.get_sensor_name() # call the get sensor name so that the data is mutex protected.
+        # NOTE: we don't ask the subscriber if it is ready first, its send_tap blocks us until it has room for the data.
+        # NOTE: each shared memory subscriber gets its own segment, it owns it (and unlinks it) once it has the handle.
+        start = time.perf_counter()
+        try :
+            for subscriber, transport, tap_request in zip(config_copy_subscribers, transports_copy, tap_requests_copy): #loop on copies
+                try :
+                    if transport == 'shared_memory' and len(data_copy) > 0:
+                        temp = write_shared_batch(data_copy)
+                        try :
+                            tap_request(temp, sensor_name)
+                        except BaseException:
+                            temp.discard() # it may never have gotten there, discard does nothing if it was opened
+                            raise
+                    else :
+                        if self.__zero_copy_taps:
+                            temp = data_copy # the data was frozen in set_publish_data, so every subscriber can share it
+                        else :
+                            temp  = copy.deepcopy(data_copy) #The reason I copy that data again is so that every subscriber gets its own copy of the data it can manipulate.
+                        tap_request(temp, sensor_name)
+                except Exception as error: # pylint: disable=W0718
+                    # one subscriber failing should not keep the data from the rest of them, or take down our thread
+                    self.__tap_send_errors.inc()
+                    self.__logger.send_log(f"Could not send data to {subscriber}: {error}")
+                    continue
+                self.__batches_published.inc()
+                self.__items_published.inc(len(data_copy))
+        finally :
+            self.__publish_seconds.observe_since(start)
         return data_copy      
     def set_publish_data(self, data):
         '''
@@ -429,9 +569,14 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
 
             NOTE: This will erase the old data to publish, if this is a problem you can check, the has_been_published function to see if the data has been published already. 
 
+            NOTE: In zero copy mode (zero_copy_taps : 'yes' in the config) the data is frozen (lists become tuples, dicts become read only) 
+            before it is published, so you should not hold onto the data and change it after calling this function.
+
             ARGS : 
                 data : list of list to publish to the system. Example [[1, 2, 3], [4, 5, 6]]
         '''
+        if self.__zero_copy_taps:
+            data = freeze_payload(data)
         if self.__publish_data_lock.acquire(timeout=1): # pylint: disable=R1732
             self.__publish_data = data
             self.__publish_data_lock.release()
@@ -462,57 +607,64 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
                 y : list of y data points
         '''
         if self.__data_report_lock.acquire(timeout=1):# pylint: disable=R1732
-            self.__data_report[graph]['x'] = self.__data_report[graph]['x'] + x
-            self.__data_report[graph]['y'] = self.__data_report[graph]['y'] + y
-
-            x_data_over = 0
-            y_data_over = 0
-
-            if len(self.__data_report[graph]['x']) > self.__max_data_points: 
-                x_data_over = len(self.__data_report[graph]['x']) - self.__max_data_points
-            for _ in range(x_data_over):
-                self.__data_report[graph]['x'].pop(0)
-
-            if len(self.__data_report[graph]['y']) > self.__max_data_points:
-                y_data_over = len(self.__data_report[graph]['y']) - self.__max_data_points
-            for _ in range(y_data_over):
-                self.__data_report[graph]['y'].pop(0)
-            self.__data_report_lock.release()
+            try :
+                # the series drops the oldest points on its own once it has max_data_points
+                self.__data_report[graph].add(x, y)
+            finally :
+                self.__data_report_lock.release()
         else : 
             raise RuntimeError("Could not acquire data report lock")
-    def get_data_report(self):
+    def get_data_report(self, points:int = None, window:tuple = None):
         '''
             Returns a copy of the data report to the requester. 
+
+            ARGS:
+                points : (optional) the most points you want per graph, if the graph has more than that in the window you get
+                    the min/max/mean summary of it instead (see graph_series.downsample).
+                window : (optional) (x_min, x_max) of the points you want, either one can be None.
         '''
         # pylint: disable=R1732
         if self.__data_report_lock.acquire(timeout=1):
-            copy_data_report = copy.deepcopy(self.__data_report)
+            if points is None and window is None:
+                copy_data_report = {graph : series.snapshot() for graph, series in self.__data_report.items()}
+            else :
+                x_min, x_max = window if window is not None else (None, None)
+                copy_data_report = {graph : series.downsample(points, x_min, x_max) for graph, series in self.__data_report.items()}
             self.__data_report_lock.release()
         else :
             raise RuntimeError("Could not acquire data report lock")
         return copy_data_report
+    def get_data_report_since(self, since:dict = None):
+        '''
+            Returns the graph points added since the last time the requester asked, so the webpage does not have to pull every
+            point of every graph each time it updates.
+
+            ARGS:
+                since : dict of graph name -> the 'next' index we returned for that graph last time. Graphs not in it
+                    (or since = None) get every point we have.
+
+            RETURNS:
+                dict of graph name -> {x, y, start, next}, see graph_series.snapshot_since.
+        '''
+        if since is None:
+            since = {}
+        if self.__data_report_lock.acquire(timeout=1): # pylint: disable=R1732
+            report = {graph : series.snapshot_since(since.get(graph, 0)) for graph, series in self.__data_report.items()}
+            self.__data_report_lock.release()
+        else :
+            raise RuntimeError("Could not acquire data report lock")
+        return report
     def get_graph_names(self):
         '''
-            Returns a copy of the graph names to the requester. 
+            Returns the graph names (a tuple, or None if this sensor has no graphs) to the requester. 
         '''
-        # pylint: disable=R1732
-        if self.__graphs_lock.acquire(timeout=1):
-            copy_graph_names = copy.deepcopy(self.__graphs)
-            self.__graphs_lock.release()
-        else : 
-            raise RuntimeError("Could not acquire graphs lock")
-        return copy_graph_names
+        return self.__graphs
     def get_last_published_data(self):
         '''
-            Returns a copy of the last data published to the requester. 
+            Returns the last data published ({'time', 'data'}) to the requester. NOTE: this is the same dict every caller gets
+            until the next publish (it is a plain dict so the web server can send it as json), don't change it.
         '''
-        # pylint: disable=R1732
-        if self.__last_published_data_lock.acquire(timeout=1):
-            copy_last_data_published = copy.deepcopy(self.__last_published_data)
-            self.__last_published_data_lock.release()
-        else : 
-            raise RuntimeError("Could not acquire last published data lock")
-        return copy_last_data_published
+        return self.__last_published_data
     def save_data(self, table, data):
         '''
             This function takes in a dict of data to save. NO byte data
@@ -522,9 +674,10 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
                 data : list of the data to store. NOTE: if you are saving into table with multiple values per row, then it should be a list of list, where each sub list is each value per row in order.
                     Example : table : arg1, arg2-> save_data(table = 'table', data = {'arg1' : ['hello', 'hello'], 'arg2' : ['world', 'world']}]) 
         '''
-        self.__coms.send_request(self.__db_name, ['save_data_group', table, data, self.__name])
-        if sys_c.read_from_file:
-            self.__coms.send_request(sys_c.file_listener_name, ['mark_ended', self.__name + 'not byte'])
+        start = time.perf_counter()
+        self.__queue_save('save_data_group', table, data)
+        self.__saves.inc()
+        self.__save_seconds.observe_since(start)
     def save_byte_data(self, table, data):
         '''
             This function takes in a dict of data to save, but can contain byte data
@@ -534,9 +687,159 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
                 data : list of the data to store. NOTE: if you are saving into table with multiple values per row, then it should be a list of list, where each sub list is each value per row in order.
                     Example : table : arg1, arg2, arg3 -> save_data(table = 'table', data = {'arg1' : ['hello', 'hello'], 'arg2' : ['world', 'world']}]) 
         '''
-        self.__coms.send_request(self.__db_name, ['save_byte_data', table, data, self.__name])
-        if sys_c.read_from_file:
-            self.__coms.send_request(sys_c.file_listener_name, ['mark_ended', self.__name + 'byte'])
+        start = time.perf_counter()
+        self.__queue_save('save_byte_data', table, data)
+        self.__saves.inc()
+        self.__save_seconds.observe_since(start)
+    def __queue_save(self, request, table, data):
+        '''
+            Adds a save to the rows waiting for its table, and sends them to the database if there are enough of them. 
+        '''
+        if self.__save_batch_rows <= 1:
+            self.__send_saves([((request, table), [data, 0, 1])])
+            return
+        rows = max((len(values) for values in data.values()), default=0)
+        ready = []
+        if self.__pending_saves_lock.acquire(timeout=1): # pylint: disable=R1732
+            key = (request, table)
+            pending = self.__pending_saves.get(key)
+            if pending is not None and pending[0].keys() != data.keys(): # the columns changed, so these rows can't go with the ones waiting
+                ready.append((key, self.__pending_saves.pop(key)))
+                pending = None
+            if pending is None:
+                pending = [{column : list(values) for column, values in data.items()}, 0, 0]
+                self.__pending_saves[key] = pending
+            else :
+                for column, values in data.items():
+                    pending[0][column].extend(values)
+            pending[1] += rows
+            pending[2] += 1
+            if pending[1] >= self.__save_batch_rows:
+                ready.append((key, self.__pending_saves.pop(key)))
+            elif self.__save_timer is None:
+                self.__save_timer = threading.Timer(self.__save_batch_latency, self.flush_saves)
+                self.__save_timer.daemon = True
+                self.__save_timer.start()
+            self.__pending_saves_lock.release()
+        else :
+            raise RuntimeError("Could not acquire pending saves lock")
+        self.__send_saves(ready)
+    def __send_saves(self, saves):
+        '''
+            Sends saves to the database, each one is ((request, table), [columns, row count, number of save calls]). 
+            In read from file mode every save call that went into a save is marked as ended with the file listener.
+        '''
+        for (request, table), (columns, _, calls) in saves:
+            if not self.__spill_save(request, table, columns):
+                self.__coms.send_request(self.__db_name, [request, table, columns, self.__name])
+            if sys_c.read_from_file:
+                for _ in range(calls):
+                    self.__coms.send_request(sys_c.file_listener_name, ['mark_ended', self.__name + ('byte' if request == 'save_byte_data' else 'not byte')])
+    def __database_backed_up(self):
+        '''
+            Returns True if we are spilling and the database queue is deeper than spill_queue_depth.
+        '''
+        if self.__spill_queue_depth <= 0:
+            return False
+        database_queue_depth = getattr(sys_c, 'database_queue_depth', None)
+        return database_queue_depth is not None and database_queue_depth() > self.__spill_queue_depth
+    def __get_spill_file(self, request, table):
+        '''
+            Returns the spill file for a table, NOTE: the spill lock has to be held when this is called.
+        '''
+        if (request, table) not in self.__spill_files:
+            self.__spill_files[(request, table)] = table_spill_file(os.path.join(self.__spill_folder, f'{table}.{request}.spill'))
+        return self.__spill_files[(request, table)]
+    def __spill_save(self, request, table, columns):
+        '''
+            Writes a save to the spill file for its table if the database is backed up, or if a replay is still going (so the 
+            save does not get to the database ahead of the ones spilled before it). Starts the replay thread if it is not running.
+
+            RETURNS:
+                True if the save was spilled, False if it should be sent to the database.
+        '''
+        if self.__spill_queue_depth <= 0:
+            return False
+        if self.__spill_lock.acquire(timeout=10): # pylint: disable=R1732
+            spill = self.__replaying_spills or self.__database_backed_up()
+            if spill:
+                self.__get_spill_file(request, table).append(columns)
+            start_replay = spill and not self.__replaying_spills
+            self.__replaying_spills = self.__replaying_spills or spill
+            self.__spill_lock.release()
+        else :
+            raise RuntimeError("Could not acquire spill lock")
+        if start_replay:
+            self.__coms.send_request('task_handler', ['add_thread_request_func', self.replay_spills, f'spill replay for {self.__name}', self])
+        return spill
+    def replay_spills(self):
+        '''
+            Sends the saves in our spill files to the database, oldest first, waiting whenever the database queue is too deep. 
+            It keeps going until every spill file is empty, saves spilled while it runs go to a new file that it picks up next.
+            Saves are read out of the file one at a time, and each one is only marked as sent once the next one is asked for.
+            A spill file that turns out to be corrupt is moved aside by table_spill and skipped. If anything else goes wrong 
+            (sending a save fails, a lock times out) the failure is logged and the replay stops, with saves going straight to the 
+            database again, what is left in the spill files is picked up by the next replay.
+        '''
+        try :
+            self.__replay_spill_files()
+        except Exception as error: # pylint: disable=W0718
+            self.__logger.send_log(f"Spill replay for {self.__name} stopped: {error}")
+            # otherwise every save from now on is spilled with nothing left to replay them
+            if self.__spill_lock.acquire(timeout=10): # pylint: disable=R1732
+                self.__replaying_spills = False
+                self.__spill_lock.release()
+            else :
+                self.__logger.send_log(f"Could not acquire spill lock to stop the spill replay for {self.__name}")
+            raise
+    def __replay_spill_files(self):
+        while True:
+            if self.__spill_lock.acquire(timeout=10): # pylint: disable=R1732
+                spill_files = list(self.__spill_files.items())
+                self.__spill_lock.release()
+            else :
+                raise RuntimeError("Could not acquire spill lock")
+            for (request, table), spill_file in spill_files:
+                if self.__spill_lock.acquire(timeout=10): # pylint: disable=R1732
+                    records = spill_file.take()
+                    self.__spill_lock.release()
+                else :
+                    raise RuntimeError("Could not acquire spill lock")
+                while True:
+                    try :
+                        columns = next(records)
+                    except StopIteration:
+                        break
+                    except RuntimeError as error: # the file is corrupt, table_spill has moved it out of the way
+                        self.__logger.send_log(f"Skipping spill file for {request} {table}: {error}")
+                        break
+                    while self.__database_backed_up():
+                        time.sleep(self.__spill_replay_interval)
+                    self.__coms.send_request(self.__db_name, [request, table, columns, self.__name])
+            if self.__spill_lock.acquire(timeout=10): # pylint: disable=R1732
+                done = not any(spill_file.has_data() for spill_file in self.__spill_files.values())
+                if done:
+                    self.__replaying_spills = False
+                self.__spill_lock.release()
+            else :
+                raise RuntimeError("Could not acquire spill lock")
+            if done:
+                return
+    def flush_saves(self):
+        '''
+            Sends every save that is waiting to the database now. This is called when save_batch_latency runs out, and when
+            the program exits, you can also call it (or send a flush_saves request) before shutting the sensors down.
+        '''
+        if self.__pending_saves_lock.acquire(timeout=1): # pylint: disable=R1732
+            ready = list(self.__pending_saves.items())
+            self.__pending_saves = {}
+            if self.__save_timer is not None:
+                self.__save_timer.cancel()
+                self.__save_timer = None
+            self.__pending_saves_lock.release()
+        else :
+            raise RuntimeError("Could not acquire pending saves lock")
+        self.__send_saves(ready)
     def preprocess_data(self, data, delimiter:bytearray, terminator:bytearray):
         '''
             This function will go through your data and find the delimiter you gave the function, and then put messages together.
@@ -568,42 +871,24 @@ class sensor_parent(threadWrapper, sensor_html_page_generator):
     def preprocess_ccsds_data(self, data):
         '''
             This function will go through the data and extract ccsds telemetry packets with valid APIDs, also detects packets with bad headers
-        '''
-        data = bytes().join(data) # make the list into one long sequence so it is possible to process the data.
-        data = self.__extra_packet_data + data # Append extra data from the previous batch
 
-        found_packets = []
-        bad_packet_detected = False
+            NOTE: the packets that are returned are read only memoryviews into this sensors packet buffer, they get written over once the 
+            buffer wraps around. If you need to keep a packet past your next call to this function, copy it out with bytes(packet).
+        '''
+        chunk_bytes = 0
+        for chunk in data: # copy the new data in behind any partial packet left over from the previous batch
+            self.__packet_buffer.write(chunk)
+            chunk_bytes += len(chunk)
+        self.__bytes_received.inc(chunk_bytes)
+        buffer, read_cursor, write_cursor = self.__packet_buffer.get_buffer()
 
-        packet_found = False
-        partial_end_packet = False
+        packet_spans, bad_packet_detected, carry_offset = scan_ccsds_packets(buffer, read_cursor, write_cursor)
+        found_packets = self.__packet_buffer.views(packet_spans)
+        self.__packet_buffer.consume(carry_offset) # keep any partial packet for the next batch
+        self.__packets_received.inc(len(found_packets))
+        if bad_packet_detected:
+            self.__bad_packet_batches.inc()
 
-        iter_bit = 0
-        while iter_bit < len(data):
-            if iter_bit + sys_c.sync_word_len + sys_c.ccsds_header_len < len(data):                                                             # Check if there is enough bytes for a packet header    
-                if int.from_bytes(data[iter_bit:iter_bit + sys_c.sync_word_len], 'big') == sys_c.sync_word:
-                    packet_length = ((data[iter_bit + sys_c.packet_len_addr1] << 8) | data[iter_bit + sys_c.packet_len_addr2]) + 1                  # Get packet length, the packet length value is the total bytes including crc minus one, ccsds standards ¯\_(ツ)_/¯
-                    if iter_bit + sys_c.sync_word_len + sys_c.ccsds_header_len + packet_length <= len(data):                                    # The whole packet is contained in this data section, append to found packets
-                        packet = data[iter_bit + sys_c.sync_word_len:iter_bit + sys_c.sync_word_len + sys_c.ccsds_header_len + packet_length + 1]
-                        found_packets.append(packet)
-                        packet_found = True
-                        iter_bit = iter_bit + sys_c.sync_word_len + sys_c.ccsds_header_len + packet_length
-                    else:                                                                           # the entire packet is not in the current section
-                        self.__extra_packet_data = data[iter_bit:]
-                        partial_end_packet = True
-                        break
-                else:                    
-                    if packet_found is True:                                                        # Bad packet found
-                        bad_packet_detected = True
-            else:                                                                                   # Not enough data for a header
-                self.__extra_packet_data = data[iter_bit:]
-                partial_end_packet = True
-                break
-            iter_bit = iter_bit + 1
-        if partial_end_packet is False:
-            self.__extra_packet_data = bytearray()
-
-            
         return found_packets, bad_packet_detected
     def int_to_bytes(self, integer_value):
         '''
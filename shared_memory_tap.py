@@ -0,0 +1,207 @@
+'''
+    This module lets a publisher hand its data to subscribers through a multiprocessing shared memory segment instead of as python
+    objects. The publisher writes the batch into a segment, and the subscriber gets a small handle that it uses to map the segment.
+    The handle can be pickled, so a subscriber does not have to live in the same process as the publisher. The subscriber owns the
+    segment once it has the handle, it unlinks it when it opens it (or calls discard if it never will).
+'''
+import pickle
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from sensor_interface_api.tap_payload import freeze_payload # pylint: disable=e0401
+
+alignment = 8 # every column starts on an 8 byte boundary so numpy can use it directly
+int64_min = -2 ** 63
+int64_max = 2 ** 63 - 1
+
+class tap_shared_memory(shared_memory.SharedMemory):
+    '''
+        SharedMemory that does not complain when it is garbage collected while views into it are still around. The memory stays
+        mapped until the last view is dropped.
+    '''
+    def __del__(self):
+        try :
+            self.close()
+        except BufferError: # a subscriber is still holding onto views of the data
+            pass
+
+class shared_tap_batch():
+    '''
+        Handle to a batch that was written to shared memory by write_shared_batch. This is what gets sent to the subscribers.
+
+        NOTE: the segment belongs to whoever has the handle, open unlinks it (the mapping stays good for as long as the data is held
+        onto) and a subscriber that drops a batch without opening it has to call discard, otherwise the segment is left behind
+        until the machine is restarted. A handle can only be opened once.
+
+        ARGS:
+            segment_name : name of the shared memory segment.
+            layout : list of (key, kind, offset, nbytes, extra) for each column, see write_shared_batch.
+            is_dict : True if the batch was a dict of columns, False if it was a single list.
+            length : len() of the original batch.
+    '''
+    def __init__(self, segment_name:str, layout:list, is_dict:bool, length:int) -> None:
+        self.segment_name = segment_name
+        self.layout = layout
+        self.is_dict = is_dict
+        self.length = length
+    def __len__(self):
+        return self.length
+    def open(self, copy:bool = False):
+        '''
+            Maps the segment, unlinks it, and returns the batch.
+
+            ARGS:
+                copy : False to get read only data, a read only mapping (or a tuple for a list batch) where number columns are
+                    read only numpy arrays, byte columns are tuples of read only memoryviews, and anything else is frozen.
+                    True to get the batch back the way the publisher had it (lists stay lists, numpy arrays stay arrays) in
+                    memory the caller owns, the segment is closed before this returns.
+        '''
+        segment = tap_shared_memory(name=self.segment_name)
+        segment.unlink() # we own it now, the mapping stays good until we close it
+        buffer = segment.buf.toreadonly()
+        columns = {}
+        column = None
+        for key, kind, offset, nbytes, extra in self.layout:
+            if kind == 'array':
+                dtype, count, source = extra
+                column = np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+                if copy:
+                    column = restore_column(column.copy() if source == 'ndarray' else column.tolist(), source)
+            elif kind == 'bytes':
+                count, source = extra
+                offsets = np.frombuffer(buffer, dtype=np.int64, count=count + 1, offset=offset + nbytes).tolist()
+                column = tuple(buffer[offset + start:offset + stop] for start, stop in zip(offsets[:-1], offsets[1:]))
+                if copy:
+                    column = restore_column([bytes(value) for value in column], source)
+            else :
+                column = pickle.loads(buffer[offset:offset + nbytes])
+                if not copy:
+                    column = freeze_payload(column)
+            columns[key] = column
+        if copy: # nothing points at the segment any more, so we don't have to wait for the garbage collector to let go of it
+            del column
+            buffer.release()
+            segment.close()
+            return columns if self.is_dict else columns[None]
+        if self.is_dict:
+            return freeze_payload(columns)
+        return columns[None]
+    def discard(self):
+        '''
+            Unlinks the segment without reading it, for a subscriber that is not going to open the batch. Does nothing if it was
+            already opened or discarded.
+        '''
+        try :
+            segment = tap_shared_memory(name=self.segment_name)
+        except FileNotFoundError:
+            return
+        segment.close()
+        segment.unlink()
+
+def column_source(values):
+    '''
+        Returns what kind of container a column is ('list', 'tuple' or 'ndarray'), so it can be given back the same way.
+    '''
+    if isinstance(values, np.ndarray):
+        return 'ndarray'
+    return 'tuple' if isinstance(values, tuple) else 'list'
+
+def restore_column(values, source:str):
+    '''
+        Puts a column read back out of shared memory (or a spill file) in the container it was in when it was packed.
+    '''
+    if source == 'tuple':
+        return tuple(values)
+    if source == 'ndarray' and not isinstance(values, np.ndarray):
+        return np.array(values)
+    return values
+
+def exact_array(values):
+    '''
+        Returns the column as a 1-D numpy array if that can be turned back into exactly the same values, None otherwise. Lists
+        have to be all bools, all ints that fit in an int64, or all floats, anything mixed (like [1, 2.5] or [1, 2**63]) would
+        come back as a different type.
+    '''
+    if isinstance(values, np.ndarray):
+        if values.ndim == 1 and values.dtype.kind in 'iufb':
+            return np.ascontiguousarray(values)
+        return None
+    types = set(map(type, values))
+    if types == {bool}:
+        return np.array(values, dtype=np.bool_)
+    if types == {float}:
+        return np.array(values, dtype=np.float64)
+    if types == {int} and int64_min <= min(values) and max(values) <= int64_max:
+        return np.array(values, dtype=np.int64)
+    return None
+
+def pack_column(values):
+    '''
+        Works out how a column will be stored in shared memory.
+
+        RETURNS:
+            kind : 'array' for int, float and bool columns that round trip exactly (see exact_array), 'bytes' for columns of
+                byte strings, 'pickle' for anything else.
+            payload : the data to write (a numpy array, a list of byte strings, or the pickled column).
+    '''
+    if len(values) > 0 and not isinstance(values, np.ndarray) and all(isinstance(value, (bytes, memoryview)) for value in values):
+        return 'bytes', values
+    if len(values) > 0:
+        array = exact_array(values)
+        if array is not None:
+            return 'array', array
+    return 'pickle', pickle.dumps(values)
+
+def aligned(size:int):
+    '''
+        Rounds size up to the next alignment boundary.
+    '''
+    return (size + alignment - 1) // alignment * alignment
+
+def write_shared_batch(data):
+    '''
+        Writes a batch (a dict of columns or a single list) into a new shared memory segment. The segment is handed off to
+        whoever gets the handle, each subscriber needs its own.
+
+        RETURNS:
+            handle : shared_tap_batch to send to the subscriber, if it never gets there call its discard.
+    '''
+    is_dict = hasattr(data, 'keys')
+    columns = {key : data[key] for key in data.keys()} if is_dict else {None : data}
+
+    packed = []
+    size = 0
+    for key, values in columns.items():
+        kind, payload = pack_column(values)
+        if kind == 'bytes':
+            nbytes = sum(len(value) for value in payload)
+            packed.append((key, kind, size, nbytes, payload))
+            size += aligned(nbytes) + 8 * (len(payload) + 1) # the bytes and then the offset of each one
+            continue
+        nbytes = payload.nbytes if kind == 'array' else len(payload)
+        packed.append((key, kind, size, nbytes, payload))
+        size += aligned(nbytes)
+
+    segment = tap_shared_memory(create=True, size=max(size, 1))
+    # The subscriber unlinks the segment, and that tells its resource tracker it is gone. Tell ours now, otherwise it would
+    # either complain at exit that we leaked it, or complain that it never heard of it when the subscriber is in this process.
+    resource_tracker.unregister(segment._name, 'shared_memory') # pylint: disable=W0212
+    layout = []
+    for key, kind, offset, nbytes, payload in packed:
+        if kind == 'bytes':
+            offsets = [0]
+            for value in payload:
+                segment.buf[offset + offsets[-1]:offset + offsets[-1] + len(value)] = value
+                offsets.append(offsets[-1] + len(value))
+            offset_bytes = np.array(offsets, dtype=np.int64).tobytes()
+            segment.buf[offset + aligned(nbytes):offset + aligned(nbytes) + len(offset_bytes)] = offset_bytes
+            layout.append((key, kind, offset, aligned(nbytes), (len(payload), column_source(columns[key]))))
+        elif kind == 'array':
+            segment.buf[offset:offset + nbytes] = payload.tobytes()
+            layout.append((key, kind, offset, nbytes, (payload.dtype.str, len(payload), column_source(columns[key]))))
+        else :
+            segment.buf[offset:offset + nbytes] = payload
+            layout.append((key, kind, offset, nbytes, None))
+    segment.close()
+    return shared_tap_batch(segment.name, layout, is_dict, len(data))
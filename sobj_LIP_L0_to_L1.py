@@ -2,9 +2,8 @@
     This module is for converting parsed LIP packets (L0 data) up to L1 data. 
 '''
 
-import math
-
 from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
+from sensor_interface_api.l1_calibration import l1_calibration, column_calibration, iq_derivation # pylint: disable=e0401
 import system_constants as sensor_config # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom as logger
 
@@ -34,6 +33,11 @@ class sobj_LIP_L0_to_L1(sensor_parent):
              ]
         }
 
+        # magnitude and phase from I and Q, the unwrapped phase and power in dB are optional and need their own columns in the table
+        self.__iq_products = iq_derivation('IiS', 'IQS', unwrapped_phase='Phase_unwrapped' if self.__config.get('unwrapped_phase', 'no') == 'yes' else None,
+                                           power_db='Power_dB' if self.__config.get('power_db', 'no') == 'yes' else None)
+        self.__table_structure['LIP_L1'].extend(self.__iq_products.get_table_rows())
+
         # NOTE: if you change the table_structure, you need to clear the database/dataTypes.dtobj and database/dataTypes_backup.dtobj DO NOT delete the file, just delete everything in side the file.
         sensor_parent.__init__(self, coms=self.__coms, config= self.__config, name=self.__name, db_name = sensor_config.database_name, table_structure=self.__table_structure)
         sensor_parent.set_sensor_status(self, 'Running')
@@ -48,7 +52,10 @@ class sobj_LIP_L0_to_L1(sensor_parent):
         self.__LIP_I_Offset = 0
         self.__LIP_Q_Gain = 1
         self.__LIP_Q_Offset = 0
-        self.__sign_bit = 1 << (19) # 20 bit numbers
+        self.__calibration = l1_calibration({
+            'IiS' : column_calibration(gain=self.__LIP_I_Gain, offset=self.__LIP_I_Offset), # IiS is not sign extended
+            'IQS' : column_calibration(bit_width=20, signed=True, gain=self.__LIP_Q_Gain, offset=self.__LIP_Q_Offset),
+        }, derivations=[self.__iq_products])
 
     def process_data(self, _):
         '''
@@ -75,56 +82,9 @@ class sobj_LIP_L0_to_L1(sensor_parent):
 
         # self.__logger.send_log(f"data: {type(data)}")
 
-        for key in data:
-            # self.__logger.send_log(f"key: {key}")
-            match key:
-                case 'IiS':
-                    buffer[key] = []
-                    for val in data[key]:
-                        # sign extension
-                        # converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                        converted = val
-                        # gain conversion
-                        converted = converted*self.__LIP_I_Gain + self.__LIP_I_Offset
-                        # # RAW values
-                        # converted = val
-                        buffer[key].append(converted)
-                case 'IQS':
-                    buffer[key] = []
-                    for val in data[key]:
-                        # sign extension
-                        converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                        # converted = val
-                        # gain conversion
-                        converted = converted*self.__LIP_Q_Gain + self.__LIP_Q_Offset
-                        # # RAW values
-                        # converted = val
-                        buffer[key].append(converted)
-                # case 'IQS_1':
-                #     buffer[key] = []
-                #     for val in data[key]:
-                #         # sign extension
-                #         converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                #         # gain conversion
-                #         converted = converted*self.__LIP_Q_Gain + self.__LIP_Q_Offset
-                #         # # RAW values
-                #         # converted = val
-                #         buffer[key].append(converted)
-
-                case 'time_STM_CLK':
-                    buffer[key] = data[key]
-                case 'time_RTC':
-                    buffer[key] = data[key]
-                case 'granule_index':
-                    buffer[key] = data[key]
-                case _ :
-                    buffer[key] = data[key]
-
+        buffer = self.__calibration.calibrate(data, buffer) # this fills in Mag and Phase too
         # self.__logger.send_log(f"buffer: {buffer}")
 
-        buffer['Mag'] = [math.sqrt(x[0]**2 + x[1]**2) for x in zip(buffer['IiS'], buffer['IQS'])]
-        buffer['Phase'] = [math.atan2(x[1], x[0]) for x in zip(buffer['IiS'], buffer['IQS'])]
-
 
         # buffer['Mag'] = [math.floor(x[0] / (2**10)) for x in zip(buffer['IQS'])]
         # buffer['Phase'] = [x[0] - (math.floor(x[0] / (2**10)) * 2**10) for x in zip(buffer['IQS'])]
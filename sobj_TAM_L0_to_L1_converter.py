@@ -3,6 +3,7 @@
 '''
 
 from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
+from sensor_interface_api.l1_calibration import l1_calibration, column_calibration # pylint: disable=e0401
 import system_constants as sensor_config # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom as logger
 
@@ -36,7 +37,11 @@ class sobj_TAM_L0_to_L1_converter(sensor_parent):
         # conversion constants
         self.__CycleCounts = 200
         self.__TAMGain = 0.3671*self.__CycleCounts + 1.5
-        self.__sign_bit = 1 << (23) # 24 bit numbers
+        self.__calibration = l1_calibration({
+            'MBX' : column_calibration(bit_width=24, signed=True, divisor=self.__TAMGain),
+            'MBY' : column_calibration(bit_width=24, signed=True, divisor=self.__TAMGain),
+            'MBZ' : column_calibration(bit_width=24, signed=True, divisor=self.__TAMGain),
+        })
 
     def process_data(self, _):
         '''
@@ -59,41 +64,7 @@ class sobj_TAM_L0_to_L1_converter(sensor_parent):
 
         # self.__logger.send_log(f"data: {data}")
 
-        for key in data:
-            match key:
-                case 'MBX':
-                    buffer[key] = []
-                    for val in data[key]:
-                        # sign extension
-                        converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                        # gain conversion
-                        converted = converted/self.__TAMGain
-                        buffer[key].append(converted)
-                case 'MBY':
-                    buffer[key] = []
-                    for val in data[key]:
-                        # sign extension
-                        converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                        # gain conversion
-                        converted = converted/self.__TAMGain
-                        buffer[key].append(converted)
-                case 'MBZ':
-                    buffer[key] = []
-                    for val in data[key]:
-                        # sign extension
-                        converted = (val & (self.__sign_bit-1)) - (val & self.__sign_bit)
-                        # gain conversion
-                        converted = converted/self.__TAMGain
-                        buffer[key].append(converted)
-
-                # case 'time_STM_CLK':
-                #     buffer[key] = data[key]
-                # case 'time_RTC':
-                #     buffer[key] = data[key]
-                # case 'granule_index':
-                #     buffer[key] = data[key]
-                case _ :
-                    buffer[key] = data[key]
+        buffer = self.__calibration.calibrate(data, buffer)
 
 
         # sensor_parent.save_data(self, table = 'TAM_L1', data = buffer)
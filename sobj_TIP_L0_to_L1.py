@@ -3,6 +3,7 @@
 '''
 
 from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
+from sensor_interface_api.l1_calibration import l1_calibration, column_calibration # pylint: disable=e0401
 import system_constants as sensor_config # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom as logger
 
@@ -38,6 +39,9 @@ class sobj_TIP_L0_to_L1(sensor_parent):
         self.__TIP_N = 24
         self.__TIP_freq_Gain = 1/1e6
         self.__TIP_freq_Offset = 0
+        self.__calibration = l1_calibration({
+            'TFQ' : column_calibration(divisor=self.__TIP_ts * (2**self.__TIP_N), gain=self.__TIP_freq_Gain, offset=self.__TIP_freq_Offset),
+        })
 
     def process_data(self, _):
         '''
@@ -59,25 +63,7 @@ class sobj_TIP_L0_to_L1(sensor_parent):
 
         # self.__logger.send_log(f"data: {str(data.keys())}")
 
-        for key in data:
-            match key:
-                case 'TFQ':
-                    buffer[key] = []
-                    for val in data[key]:                        
-                        # gain conversion
-                        freq = val/(self.__TIP_ts * (2**self.__TIP_N))
-                        # freq = val
-                        converted = freq*self.__TIP_freq_Gain + self.__TIP_freq_Offset
-                        buffer[key].append(converted)
-                # case 'time_STM_CLK':
-                #     buffer[key] = data[key]
-                # case 'time_RTC':
-                #     buffer[key] = data[key]
-                # case 'granule_index':
-                #     buffer[key] = data[key]
-                case _:
-                    buffer[key] = data[key]
-
+        buffer = self.__calibration.calibrate(data, buffer)
         # for key in buffer:
             # self.__logger.send_log(f"{key}: {str(buffer[key])}")
 
@@ -9,12 +9,15 @@ from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e
 import system_constants as sensor_config # pylint: disable=e0401
 from logging_system_display_python_api.DTOs.print_message_dto import print_message_dto # pylint: disable=e0401
 
+# collect_sensor makes one gps board sensor for each of these names
+sensor_names = ['gps_board', 'gps_board_aux', 'gps_board_ao_test']
+
 class sobj_gps_board(sensor_parent):
     '''
         This models handles incoming gps data and then makes it into a gps time packet.
     '''
-    def __init__(self, coms):
-        self.__name = 'gps_board'
+    def __init__(self, coms, name:str = 'gps_board'):
+        self.__name = name
         self.__config = sensor_config.sensors_config[self.__name]
         self.__serial_line_two_data = []
         self.__data_lock = threading.Lock()
@@ -2,12 +2,12 @@
     This module handles the incoming data from the gps board, process it and then makes a packet and publishes the gps time packet.
 '''
 import threading
-import copy
 from datetime import datetime
 
 from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
 import system_constants as sensor_config # pylint: disable=e0401
 from command_packets.functions import ccsds_crc16 # pylint: disable=e0401
+from sensor_interface_api.ccsds_crc import crc16_batch, crc16_matches # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom as logger
 
 class sobj_packet_detect(sensor_parent):
@@ -28,15 +28,18 @@ class sobj_packet_detect(sensor_parent):
         self.__unknown_apid_count = 0
 
         self.__telemetry_packet_types = sensor_config.telemetry_packet_types[self.__data_group]
-        self.__telemetry_packet_types_lock = threading.Lock() 
 
-
-        self.__apids = sensor_config.valid_apids[self.__data_group]
-        self.__apids_lock = threading.Lock()
+        # apid (as an int) -> (Mnemonic, possition in a list), sensor_importer builds this once and it never changes so we don't need a lock or a copy.
+        self.__apid_dispatch_table = sensor_config.apid_dispatch_tables[self.__data_group]
 
         self.__start_time = datetime.now()
 
         self.__logger = logger(f'logs/{self.__name}.txt') # pylint: disable=W0238
+
+        # only use the batched crc check if it gives the same answers as ccsds_crc16, otherwise fall back to checking one packet at a time
+        self.__batched_crc = crc16_matches(ccsds_crc16)
+        if not self.__batched_crc:
+            self.__logger.send_log('Batched crc16 does not match ccsds_crc16, checking packets one at a time.')
         # self.__logger_lock = threading.Lock()
 
 
@@ -56,57 +59,27 @@ class sobj_packet_detect(sensor_parent):
         # NOTE: if you change the table_structure, you need to clear the database/dataTypes.dtobj and database/dataTypes_backup.dtobj DO NOT delete the file, just delete everything in side the file.
         sensor_parent.__init__(self, coms=coms, config= self.__config, name=self.__name, max_data_points=00, db_name = sensor_config.database_name, table_structure=self.__table_structure)
         sensor_parent.set_sensor_status(self, 'Running')
-    def is_valid_apid(self, apid, apids):
-        '''
-            check apid agaist list of valid apids
-        '''
-        return apid in apids
-    def get_packet_info(self, apid):
-        '''
-            this function searches thorugh the list of telemetry packets then returns to corrisponding information 
-            for the given apid.
-        '''
-        temp = ()
-        if self.__telemetry_packet_types_lock.acquire(): # pylint: disable=R1732
-            for tup in self.__telemetry_packet_types:
-                if apid in tup:
-                    temp = tup
-                    break
-            self.__telemetry_packet_types_lock.release()
-        else :
-            raise RuntimeError('Could not acquire telemetry packets types lock')
-        return temp
+        metrics = sensor_parent.get_metrics_registry(self)
+        self.__bad_crc_metric = metrics.counter('sensor_bad_crc_total', 'Packets with a bad crc.')
+        self.__unknown_apid_metric = metrics.counter('sensor_unknown_apid_total', 'Packets with an apid we do not know.')
     def process_data(self, event):
         '''
             This function gets called when one of the tap request gets any data. 
 
             NOTE: This function always gets called no matter with tap gets data. 
         '''
-        telemetry_packets_copy = None
-        apids = None
-        if self.__telemetry_packet_types_lock.acquire(): # pylint: disable=R1732
-            telemetry_packets_copy = copy.deepcopy(self.__telemetry_packet_types)
-            self.__telemetry_packet_types_lock.release()
-        else :
-            raise RuntimeError("Could not acquire telementry packet types lock")
-        
-        if self.__apids_lock.acquire(): # pylint: disable=R1732
-            apids = copy.deepcopy(self.__apids)
-            self.__apids_lock.release()
-        else :
-            raise RuntimeError("Could not acquire apids lock")
-        
-        
         # self.__logger.send_log(str(event))
         event_name = event[18:]
         temp, _ = sensor_parent.preprocess_ccsds_data(self, sensor_parent.get_data_received(self, event_name)) #add the received data to the list of data we have received.
         
         with self.__data_lock:
-            self.__serial_line_two_data += temp
+            # NOTE: this is where zero copy ends for the packet detect. The packets are views into the sensor_parent packet buffer and the next
+            # batch can write over them before the counting thread gets to them, so every packet is copied to bytes here.
+            self.__serial_line_two_data += [bytes(packet) for packet in temp]
             data_ready_for_processing =  len(self.__serial_line_two_data) #if the last packet is a partial pack then we are not going to process it.
-            self.__coms.send_request('task_handler', ['add_thread_request_func', self.process_count_packets, f'processing data for {self.__name}', self, [copy.deepcopy(self.__serial_line_two_data[:data_ready_for_processing]), event, apids, telemetry_packets_copy]]) #start a thread to process data 
+            self.__coms.send_request('task_handler', ['add_thread_request_func', self.process_count_packets, f'processing data for {self.__name}', self, [self.__serial_line_two_data[:data_ready_for_processing], event, self.__apid_dispatch_table, self.__telemetry_packet_types]]) #start a thread to process data 
             self.__serial_line_two_data = self.__serial_line_two_data[data_ready_for_processing:]
-    def process_count_packets(self, temp_data_structure, _, apids, telemetry_packets_copy):
+    def process_count_packets(self, temp_data_structure, _, apid_dispatch_table, telemetry_packet_types):
         '''
             This function rips apart telemetry packets and counts how many of each type there is.  
         '''
@@ -114,25 +87,33 @@ class sobj_packet_detect(sensor_parent):
         # data to publish
         data = {tup[0]: [] for tup in self.__telemetry_packet_types} #pos zero is the packet Mnemonic
 
+        # check the crc of every packet in the batch at once
+        if self.__batched_crc:
+            crcs = crc16_batch(temp_data_structure)
+        else :
+            crcs = [ccsds_crc16(packet) for packet in temp_data_structure]
+
+        bad_crc_before = self.__bad_crc_count
+        unknown_apid_before = self.__unknown_apid_count
         # sort the packets basied on apid and mnemonic
-        for packet in temp_data_structure:
+        for packet, crc in zip(temp_data_structure, crcs):
             # self.__logger.send_log(f"Packet: {packet.hex()}")
-            #get apid
-            APID = int.from_bytes(packet[:2], 'big') & 0x07ff
-            apid_str = f"{APID:03X}"
-
-            #validation check
-            if not self.is_valid_apid(apid_str, apids):
+            #get apid, and look up the packet info for it (this is also the validation check)
+            packet_info = apid_dispatch_table.get(int.from_bytes(packet[:2], 'big') & 0x07ff)
+            if packet_info is None:
                 self.__unknown_apid_count += 1
             else : 
                 #sort packets into their corrisponding list
-                packet_data_tup = self.get_packet_info(apid_str)
-                if ccsds_crc16(packet) == 0x00:                                    # valid crc
-                    self.__packet_count[packet_data_tup[2]] += 1                             # increment the appropriate packet count
-                    data[packet_data_tup[0]].append(packet)   # add packet to list in data dictionary for publishing
+                mnemonic, position = packet_info
+                if crc == 0x00:                                                    # valid crc
+                    self.__packet_count[position] += 1                             # increment the appropriate packet count
+                    data[mnemonic].append(packet)   # add packet to list in data dictionary for publishing
                 else:                                                                   # invalid crc
                     self.__bad_crc_count += 1
                     # self.__logger.send_log(f"bad_crc found: {packet[-2:]}")
+        # once per batch, not per packet
+        self.__bad_crc_metric.inc(self.__bad_crc_count - bad_crc_before)
+        self.__unknown_apid_metric.inc(self.__unknown_apid_count - unknown_apid_before)
 
         current_time = datetime.now()
         elapsed_seconds = (current_time - self.__start_time).total_seconds()
@@ -145,7 +126,7 @@ class sobj_packet_detect(sensor_parent):
         }
         
         #put all the packet counts in the corret place
-        for packet in telemetry_packets_copy:
+        for packet in telemetry_packet_types:
             save_data[packet[0]] = [self.__packet_count[packet[2]]]
         #save counts
         sensor_parent.save_data(self, table=f'processed_data_for_{self.__name}_counts', data=save_data)
@@ -157,7 +138,7 @@ class sobj_packet_detect(sensor_parent):
             'bad_crc' : [0 if self.__bad_crc_count == 0.0 else elapsed_seconds/self.__bad_crc_count]
         }
         #put all the packet counts in the corret place
-        for packet in telemetry_packets_copy:
+        for packet in telemetry_packet_types:
             save_data[packet[0]] = [0 if self.__packet_count[packet[2]] == 0 else elapsed_seconds/self.__packet_count[packet[2]]]
         #save rate data
         sensor_parent.save_data(self, table=f'processed_data_for_{self.__name}_rates', data=save_data)
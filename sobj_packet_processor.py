@@ -1,13 +1,13 @@
 '''
     This module is for processing packets that are defined in the telemetry Dictionary 
 '''
-import copy
 from typing import Optional
-from bitarray import bitarray
-from datetime import datetime, timedelta, timezone
-import bisect
+from datetime import datetime, timedelta
 
 from sensor_interface_api.sensor_parent import sensor_parent # pylint: disable=e0401
+from sensor_interface_api.packet_unpacker import granule_unpacking_plan # pylint: disable=e0401
+from sensor_interface_api.packet_decoder import decode_packet_batch, utc_columns_from_snapshot, get_decode_pool, picklable_packets # pylint: disable=e0401
+from sensor_interface_api.time_correlation_index import time_correlation_index # pylint: disable=e0401
 import system_constants as sensor_config # pylint: disable=e0401
 from logging_system_display_python_api.logger import loggerCustom as logger
 
@@ -81,7 +81,17 @@ class sobj_packet_processor(sensor_parent):
         if converted is True :
             self.__table_structure[f"{self.__name}"] = self.__colms_list
 
-        self.__buffer = {}
+        # work out where every channel sits in the packet once, so process_data can unpack a whole batch at a time
+        self.__unpacking_plan = granule_unpacking_plan(
+            word_lengths=self.__unpacking_map,
+            signed=[self.__colms_list[i][2] == 'int' for i in range(len(self.__unpacking_map))],
+            granule_count=self.__packet_config['Granule count'],
+            start_bit=int((sensor_config.ccsds_header_len+1 + sensor_config.system_clock + sensor_config.real_time_clock) * 8),
+        )
+        for channel in self.__unpacking_plan.get_too_wide_channels(): #all of these need to be an unit 32 or smaller.
+            self.__logger.send_log(f'Unpacking packet {self.__name} has too large of a bin size at {self.__colms_list[channel][0]}, must be 32 bits or smaller but has size {self.__unpacking_map[channel]}, it will always be 0.')
+
+        self.__buffer = {} # the columns process_data fills in, decode_packet_batch builds a copy of this sized for each batch
 
         #!!! check this here - is it still looking at the right columns??
         for i in range(len(self.__colms_list)-2): # ignore last two position since they are system clock and rtc values
@@ -100,8 +110,22 @@ class sobj_packet_processor(sensor_parent):
         self.__buffer["packet_count"] = [bytearray(sensor_config.packet_count) for _ in range(self.__packet_config['Granule count'])]
         self.__buffer["granule_index"] = [j for j in range(self.__packet_config['Granule count'])]
 
+        # everything decode_packet_batch needs to know about this packet, worked out once
+        self.__columns = list(self.__buffer)
+        self.__channel_names = [self.__colms_list[i][0] for i in range(len(self.__unpacking_map))]
+        granule_rate_hz = self.__packet_config['G. Rate']
+        granule_period_ms: float = 1 / granule_rate_hz * 1000 if granule_rate_hz != 0 else 0.0
+        self.__granule_deltas_ms = [j * granule_period_ms for j in range(self.__packet_config['Granule count'])]
+        self.__clock_offsets = (sensor_config.ccsds_header_len, sensor_config.system_clock)
+
+        # decode_backend 'process' sends batches to a pool of worker processes (shared by all the processors) to decode, so more than one core gets used.
+        self.__decode_pool = None
+        if self.__config.get('decode_backend', 'thread') == 'process' and self.__name not in sensor_config.time_correlation:
+            self.__decode_pool = get_decode_pool(self.__config.get('decode_workers', None), self.__config.get('decode_start_method', 'spawn'))
+
         if self.__config['extention'] not in sensor_config.time_correlation_tables:
-            sensor_config.time_correlation_tables[self.__config['extention']] = []
+            # every processor with the same extention shares one table, the time correlation packet adds to it and everyone else reads it.
+            sensor_config.time_correlation_tables[self.__config['extention']] = time_correlation_index(window_s=self.__config.get('time_correlation_window_s', 0))
 
         # NOTE: if you change the table_structure, you need to clear the database/dataTypes.dtobj and database/dataTypes_backup.dtobj DO NOT delete the file, just delete everything in side the file.
         sensor_parent.__init__(self, coms=self.__coms, config= self.__config, name=self.__name, max_data_points=100, db_name = sensor_config.database_name, table_structure=self.__table_structure)
@@ -114,126 +138,71 @@ class sobj_packet_processor(sensor_parent):
 
             NOTE: This function always gets called no matter with tap gets data. 
         '''
-        self.__logger.send_log(f"Process data for {self.__name=} | {self.__config=}")
         data = sensor_parent.get_data_received(self, self.__config['tap_request'][0])[self.__packet_nmemonic]
-        buffer_dict_to_publish = {
-        }
-        for packet in data:
-            if len(packet) > 0:
-                # print(f"APID: {self.__apid}\n\tPacket {packet}")
-                packet_count = ((packet[2] << 8) | (packet[3])) & 0x3FFF
-                sys_clk_ms = (packet[sensor_config.ccsds_header_len+1] << 24) | (packet[sensor_config.ccsds_header_len+2] << 16) | (packet[sensor_config.ccsds_header_len+3] << 8) | (packet[sensor_config.ccsds_header_len+4])
-                real_time_clk_s = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock+1] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock+2] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock+3])
-                cur_position_bits = int((sensor_config.ccsds_header_len+1 + sensor_config.system_clock + sensor_config.real_time_clock) * 8)
-                packet_bits = bitarray()
-                packet_bits.frombytes(packet)
-
-                granule_rate_hz = self.__packet_config['G. Rate']
-                granule_period_ms: float = 1 / granule_rate_hz * 1000 if granule_rate_hz != 0 else 0.0
-
-                for j in range(self.__packet_config['Granule count']):
-                    granule_delta_ms: float = j * granule_period_ms
-                    granule_sys_clk_ms: int = sys_clk_ms + int(granule_delta_ms)
-                    granule_real_time_clk_s: int = real_time_clk_s + int(granule_delta_ms / 1000)
-
-                    self.__buffer['time_STM_CLK'][j] = granule_sys_clk_ms
-                    self.__buffer['time_RTC'][j] = granule_real_time_clk_s
+        packets = [packet for packet in data if len(packet) > 0]
+        granule_count = self.__packet_config['Granule count']
+        correlation_table = sensor_config.time_correlation_tables[self.__config['extention']]
 
+        if self.__name in sensor_config.time_correlation:
+            # this processor adds to the correlation table as it goes, so it always decodes here, and each packet is converted to utc after its entries are added.
+            batch, granule_sys_clks_ms, granule_real_time_clks_s = decode_packet_batch(self.__unpacking_plan, packets, self.__columns, self.__channel_names, self.__granule_deltas_ms, self.__clock_offsets)
+            for row, packet in enumerate(packets):
+                for j in range(granule_count):
+                    cell = row * granule_count + j
                     # Update PPS_UTC and, if necessary, PPSS and PPSR epochs
-                    if self.__name in sensor_config.time_correlation:
-                        # Updating PPS_UTC
-                        #get PPS packet for the correct board
-                        PPSS = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+1] << 24) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+2] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+3] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+4])
-                        PPSR = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+1] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+2] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+3])
+                    # Updating PPS_UTC
+                    #get PPS packet for the correct board
+                    PPSS = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+1] << 24) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+2] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+3] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+4])
+                    PPSR = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+1] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+2] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+sensor_config.PPSM_len+sensor_config.PPSS_len+3])
 
-                        gps_week = (packet[sensor_config.ccsds_header_len + sensor_config.system_clock + sensor_config.real_time_clock+ 1] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+2]) # Value is dubious
-                        gps_milli = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+1] << 24) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+2] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+3] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+4])
+                    gps_week = (packet[sensor_config.ccsds_header_len + sensor_config.system_clock + sensor_config.real_time_clock+ 1] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+2]) # Value is dubious
+                    gps_milli = (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+1] << 24) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+2] << 16) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+3] << 8) | (packet[sensor_config.ccsds_header_len+sensor_config.system_clock + sensor_config.real_time_clock+sensor_config.PPSW_len+4])
             
-                        if gps_week != 0 and gps_milli != 0:
-                            leap_seconds = 18
-
-                            newPPS_UTC = (datetime(1980, 1, 6, 0 , 0) + timedelta(weeks=gps_week) + timedelta(milliseconds=gps_milli) - timedelta(seconds=leap_seconds))
-                            PPSS_epoch = newPPS_UTC- timedelta(milliseconds=PPSS)
-                            PPSR_epoch = newPPS_UTC- timedelta(seconds=PPSR)
-
-                            # sensor_config.PPS_UTC = newPPS_UTC
-                            # sensor_config.PPSS_epoch = PPSS_epoch
-                            # sensor_config.PPSR_epoch = PPSR_epoch
-
-                            self.__buffer['PPS_UTC'][j] = newPPS_UTC.strftime('%Y-%m-%d %H:%M:%-S.%f')
-                            self.__buffer['PPSS_EPOCH'][j] = PPSS_epoch.strftime('%Y-%m-%d %H:%M:%-S.%f')
-                            self.__buffer['PPSR_EPOCH'][j] = PPSR_epoch.strftime('%Y-%m-%d %H:%M:%-S.%f')[:-3]
-
-                            time_correlation_table_entry = {
-                                'PPSR' : PPSR,
-                                'PPSS' : PPSS,
-                                'PPS_UTC' : newPPS_UTC,
-                                # 'PPSS_EPOCH' : PPSS_epoch,
-                                # 'PPSR_EPOCH' : PPSR_epoch,
-                            }
-
-                            bisect.insort(sensor_config.time_correlation_tables[self.__config['extention']], time_correlation_table_entry, key=lambda e: (e['PPSR'], e['PPSS']))
-                        else:
-                            self.__buffer['PPS_UTC'][j]    = None # Swenson recommended None / null so the field comes in empty into the database
-                            self.__buffer['PPSS_EPOCH'][j] = None # Swenson recommended None / null so the field comes in empty into the database
-                            self.__buffer['PPSR_EPOCH'][j] = None # Swenson recommended None / null so the field comes in empty into the database
-
-                            # sensor_config.PPS_UTC = None
-
-                    # Update UTC times        
-                    # self.__buffer['time_STM_CLK_UTC'][j] = self.to_UTC(granule_sys_clk_ms, is_RTC=False).strftime('%Y-%m-%d %H:%M:%-S.%f')
-                    # self.__buffer['time_RTC_UTC'][j] = self.to_UTC(granule_real_time_clk_s, is_RTC=True).strftime('%Y-%m-%d %H:%M:%-S.%f')[:-3]
-                    # granule_system_clk_utc, granule_real_time_clk_utc = self.utcs_from_clks(granule_sys_clk_ms, granule_real_time_clk_s)
-                    graunule_system_clk_utc, graunule_real_time_clk_utc = self.utcs_from_clks(granule_sys_clk_ms, granule_real_time_clk_s)
-                    self.__buffer['time_STM_CLK_UTC'][j] = graunule_system_clk_utc.strftime('%Y-%m-%d %H:%M:%-S.%f')
-                    self.__buffer['time_RTC_UTC'][j] = graunule_real_time_clk_utc.strftime('%Y-%m-%d %H:%M:%-S.%f')[:-3]
-                    self.__buffer['received_at'][j] = datetime.now(timezone.utc).timestamp()
-
-                    # self.__logger.send_log(f"Clocks updated to UTC at time {datetime.fromtimestamp(self.__buffer['received_at'][j])}")
-                    self.__buffer['packet_count'][j] = packet_count
-
-                    for i in range(len(self.__unpacking_map)): # pylint: disable=C0200
-                        # print(f"APID: {self.__apid}\tPacket length: {len(packet)}\tPacket length bits: {len(packet_bits)}\tcolmslist curr: {self.__colms_list[i]}\t cur_position: {cur_position_bits}\tcurpostiion+unpacking: {cur_position_bits+self.__unpacking_map[i]}")
-                        temp = packet_bits[cur_position_bits:cur_position_bits+self.__unpacking_map[i]]
-                        if len(temp) > 32: #all of these need to be an unit 32 or smaller. 
-                            self.__buffer[self.__colms_list[i][0]][j] = 0
-                            # self.__logger.send_log(f'Unpacking packet {self.__packet_nmemonic} got too large of bin size at {self.__colms_list[i][0]}, must be 32 bits or smaller but has size {self.__unpacking_map[i]}.')
-                        else :
-                            if self.__colms_list[i][2] == 'int' and temp[0] == 1:
-                                while len(temp) < 32:
-                                    temp.insert(0,1)
-                                self.__buffer[self.__colms_list[i][0]][j] = int.from_bytes(temp, signed = True)
-                            else:
-                                self.__buffer[self.__colms_list[i][0]][j] = self.bitarray_to_int(temp) | 0x00000000
-                        cur_position_bits += self.__unpacking_map[i]
-
-                # save to db and publish 
-                buf_copy = copy.deepcopy(self.__buffer)
-                sensor_parent.save_data(self, table=f"{self.__name}", data=buf_copy)
-
-                #lets save the data into a dictionary
-                all_keys_set = set(self.__buffer.keys()).union(buffer_dict_to_publish.keys())
-
-                for key in all_keys_set:
-                    buffer_dict_to_publish[key] = self.__buffer.get(key, []) + buffer_dict_to_publish.get(key, [])
-
-                # flush the buffer
-                for key in self.__buffer: # pylint: disable=C0206
-                    if not key == 'granule_index':
-                        for byte_storage in range(len(self.__buffer[key])):
-                            self.__buffer[key][byte_storage] = 0xFFFFFFFF
+                    if gps_week != 0 and gps_milli != 0:
+                        leap_seconds = 18
+
+                        newPPS_UTC = (datetime(1980, 1, 6, 0 , 0) + timedelta(weeks=gps_week) + timedelta(milliseconds=gps_milli) - timedelta(seconds=leap_seconds))
+                        PPSS_epoch = newPPS_UTC- timedelta(milliseconds=PPSS)
+                        PPSR_epoch = newPPS_UTC- timedelta(seconds=PPSR)
+
+                        # sensor_config.PPS_UTC = newPPS_UTC
+                        # sensor_config.PPSS_epoch = PPSS_epoch
+                        # sensor_config.PPSR_epoch = PPSR_epoch
+
+                        batch['PPS_UTC'][cell] = newPPS_UTC.strftime('%Y-%m-%d %H:%M:%-S.%f')
+                        batch['PPSS_EPOCH'][cell] = PPSS_epoch.strftime('%Y-%m-%d %H:%M:%-S.%f')
+                        batch['PPSR_EPOCH'][cell] = PPSR_epoch.strftime('%Y-%m-%d %H:%M:%-S.%f')[:-3]
+
+                        sensor_config.time_correlation_tables[self.__config['extention']].add(PPSR, PPSS, newPPS_UTC)
+                    else:
+                        batch['PPS_UTC'][cell]    = None # Swenson recommended None / null so the field comes in empty into the database
+                        batch['PPSS_EPOCH'][cell] = None # Swenson recommended None / null so the field comes in empty into the database
+                        batch['PPSR_EPOCH'][cell] = None # Swenson recommended None / null so the field comes in empty into the database
+
+                        # sensor_config.PPS_UTC = None
+
+                # Update UTC times
+                first_cell = row * granule_count
+                packet_system_clk_utcs, packet_real_time_clk_utcs = self.utc_columns_from_clks(granule_sys_clks_ms[row:row+1], granule_real_time_clks_s[row:row+1])
+                batch['time_STM_CLK_UTC'][first_cell:first_cell + granule_count] = packet_system_clk_utcs[0]
+                batch['time_RTC_UTC'][first_cell:first_cell + granule_count] = packet_real_time_clk_utcs[0]
+        elif self.__decode_pool is not None and len(packets) > 0: # a worker process does the decoding, all we do here is save and publish
+            # the packets have to be pickled to get to the worker, memoryviews (from a zero copy shared memory tap) can't be
+            batch, _, _ = self.__decode_pool.submit(decode_packet_batch, self.__unpacking_plan, picklable_packets(packets), self.__columns, self.__channel_names, self.__granule_deltas_ms, self.__clock_offsets, correlation_table.get_snapshot()).result()
+        else :
+            batch, _, _ = decode_packet_batch(self.__unpacking_plan, packets, self.__columns, self.__channel_names, self.__granule_deltas_ms, self.__clock_offsets, correlation_table.get_snapshot())
+
+        buffer_dict_to_publish = {}
+        if len(packets) > 0:
+            # save to db and publish, batch is built fresh every call so the db can have it without a copy
+            sensor_parent.save_data(self, table=f"{self.__name}", data=batch)
+
+            # the newest packet goes first when we publish, that is the order this has always been published in
+            packet_rows = [slice(row * granule_count, (row + 1) * granule_count) for row in reversed(range(len(packets)))]
+            buffer_dict_to_publish = {key : [value for rows in packet_rows for value in column[rows]] for key, column in batch.items()}
         sensor_parent.set_publish_data(self, data=buffer_dict_to_publish)
         sensor_parent.publish(self)
         
-    def bitarray_to_int(self, bit_array):
-        '''
-            converts bitarray into and int
-        '''
-        result = 0
-        for bit in bit_array:
-            result = (result << 1) | bit
-        return result
-
     # def to_UTC(self, gps_clock, is_RTC):
     #     '''
     #         converts given time into utc time
@@ -247,38 +216,16 @@ class sobj_packet_processor(sensor_parent):
     #         new_datetime = (sensor_config.PPSS_epoch) + timedelta(milliseconds=gps_clock)
     #         return new_datetime
         
-    def utcs_from_clks(self, system_clk_ms: int, real_time_clk_s: int) -> tuple[datetime, datetime]:
-        '''
-            Returns the absolute UTC datetime given the system and real-time clocks.
-            This is accomplished by first looking up the most recent time correlation entry before or at the time of these clock values (ordered by real-time and then system clock values).
-            The entry contains a synchronized UTC datetime, originally calculated from PPS message values.
-            Finally, an appropriate delta is added to yield the desired UTC datetime that corresponds to the given clock values.
+    def utc_columns_from_clks(self, system_clks_ms:list, real_time_clks_s:list) -> tuple[list, list]:
         '''
-        # https://docs.python.org/3/library/bisect.html#searching-sorted-lists
-        search_key = (real_time_clk_s, system_clk_ms)
-        i = bisect.bisect_right( \
-            sensor_config.time_correlation_tables[self.__config['extention']], \
-            search_key, \
-            key=lambda e: (e['PPSR'], e['PPSS']) \
-        ) - 1
-        if i not in range(len(sensor_config.time_correlation_tables[self.__config['extention']])):
-            return datetime.fromtimestamp(0), datetime.fromtimestamp(0)
-            # return None
-
-        time_correlation_table_entry = sensor_config.time_correlation_tables[self.__config['extention']][i]
-        baseUTCdatetime: datetime = time_correlation_table_entry['PPS_UTC']
-
-        system_clk_delta_ms = system_clk_ms - time_correlation_table_entry['PPSS']
-        real_time_clk_delta_s = real_time_clk_s - time_correlation_table_entry['PPSR']
+            Converts the clocks for a whole batch of granules at once and formats them for the database. Each granule's UTC comes from
+            the most recent time correlation entry before or at its clocks, plus the time since that entry.
 
-        system_clk_utc = baseUTCdatetime + timedelta(milliseconds=system_clk_delta_ms)
-        real_time_clk_utc = baseUTCdatetime + timedelta(seconds=real_time_clk_delta_s)
+            ARGS:
+                system_clks_ms : list of lists (one per packet) of the system clock for each granule.
+                real_time_clks_s : list of lists (one per packet) of the real time clock for each granule.
 
-        return system_clk_utc, real_time_clk_utc
-
-        # # If the system clock delta doesn't make sense or conflicts with the real-time clock delta, prefer the latter.
-        # if system_clk_delta_ms < 0 or system_clk_delta_ms > real_time_clk_s * 1000:
-        #     return baseUTCdatetime + timedelta(seconds=real_time_clk_delta_s)
-        
-        # # Otherwise, use the system clock delta for more accuracy
-        # return baseUTCdatetime + timedelta(milliseconds=system_clk_delta_ms)
+            RETURNS:
+                system_clk_utcs, real_time_clk_utcs : list of lists of formatted utc strings, in the same shape as the clocks.
+        '''
+        return utc_columns_from_snapshot(system_clks_ms, real_time_clks_s, sensor_config.time_correlation_tables[self.__config['extention']].get_snapshot())
@@ -0,0 +1,161 @@
+'''
+    This module is the file format sensor_parent spills database saves into when the database falls behind. Each table gets its own
+    append only file, and every save is one record in it with its columns stored one after the other (numbers as numpy arrays,
+    byte strings packed back to back with their offsets, anything else pickled). Reading the file back maps it instead of reading it in,
+    and hands the saves out one at a time so a replay never has more than one of them decoded.
+'''
+import os
+import mmap
+import time
+import pickle
+import struct
+
+import numpy as np
+
+from sensor_interface_api.shared_memory_tap import pack_column, column_source # pylint: disable=e0401
+
+record_header = struct.Struct('<4sQI') # magic, length of the rest of the record, number of columns
+column_header = struct.Struct('<H1sQQ') # name length, kind, row count, payload length
+done_offset = struct.Struct('<Q') # where the next save to send starts in a file being replayed
+record_magic = b'SPL1'
+
+def encode_record(columns:dict):
+    '''
+        Turns a dict of columns into one spill record (bytes). Columns come back exactly the way they went in, anything that is
+        not a list or a numpy array (tuples and such) is pickled.
+    '''
+    parts = []
+    for name, values in columns.items():
+        name_bytes = str(name).encode()
+        source = column_source(values)
+        kind, payload = pack_column(values) if source != 'tuple' else ('pickle', pickle.dumps(values))
+        if kind == 'array':
+            payload = payload.dtype.str.encode().ljust(8) + payload.tobytes() # keep the dtype so it comes back the same
+            kind_code = b'n' if source == 'ndarray' else b'a'
+        elif kind == 'bytes':
+            offsets = np.cumsum([0] + [len(value) for value in payload], dtype=np.int64)
+            payload = offsets.tobytes() + bytes().join(payload)
+            kind_code = b'b'
+        else :
+            kind_code = b'p'
+        parts.append(column_header.pack(len(name_bytes), kind_code, len(values), len(payload)) + name_bytes + payload)
+    body = bytes().join(parts)
+    return record_header.pack(record_magic, len(body), len(columns)) + body
+
+def decode_record(buffer, offset:int):
+    '''
+        Reads the record that starts at offset.
+
+        RETURNS:
+            columns : dict of column name -> column (a list, or a numpy array if it was one).
+            offset : where the next record starts.
+    '''
+    magic, length, column_count = record_header.unpack_from(buffer, offset)
+    if magic != record_magic:
+        raise RuntimeError(f"Spill file is corrupt at byte {offset}.")
+    position = offset + record_header.size
+    columns = {}
+    for _ in range(column_count):
+        name_length, kind, rows, payload_length = column_header.unpack_from(buffer, position)
+        position += column_header.size
+        name = bytes(buffer[position:position + name_length]).decode()
+        position += name_length
+        payload = buffer[position:position + payload_length]
+        if kind in (b'a', b'n'):
+            column = np.frombuffer(payload, dtype=np.dtype(bytes(payload[:8]).decode().strip()), count=rows, offset=8)
+            columns[name] = column.copy() if kind == b'n' else column.tolist()
+        elif kind == b'b':
+            offsets = np.frombuffer(payload, dtype=np.int64, count=rows + 1).tolist()
+            start = 8 * (rows + 1)
+            columns[name] = [bytes(payload[start + first:start + last]) for first, last in zip(offsets[:-1], offsets[1:])]
+        else :
+            columns[name] = pickle.loads(payload)
+        position += payload_length
+    return columns, offset + record_header.size + length
+
+class table_spill_file():
+    '''
+        Append only spill file for one table.
+
+        ARGS:
+            path : where the file goes, the folder is made if it is not there.
+    '''
+    def __init__(self, path:str) -> None:
+        self.__path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+    def get_path(self):
+        '''
+            Returns the path of the spill file.
+        '''
+        return self.__path
+    def append(self, columns:dict):
+        '''
+            Adds a save (dict of columns) to the end of the file. The record is written with one write so a reader never sees half of it.
+        '''
+        with open(self.__path, 'ab') as file:
+            file.write(encode_record(columns))
+    def has_data(self):
+        '''
+            Returns True if there are saves in the file (or left over from a replay that did not finish).
+        '''
+        return any(os.path.exists(path) and os.path.getsize(path) > 0 for path in (self.__path, self.__path + '.replaying'))
+    def take(self):
+        '''
+            Moves the file out of the way (so new saves go to a new file) and returns a generator of the saves that were in it, 
+            oldest first. If a replay was stopped part way through (the program was killed, or sending a save failed) that file
+            is picked up again first, starting at the first save that was not sent.
+
+            NOTE: a save is only marked as sent when the next one is asked for, and the file is removed once the last one has
+            been sent, so a save that was being sent when we stopped is sent again. If a record can not be decoded the file is
+            renamed to <path>.<time>.corrupt (so it is not retried forever) and the generator raises a RuntimeError.
+        '''
+        if not self.has_data():
+            return iter(())
+        taken_path = self.__path + '.replaying'
+        if not os.path.exists(taken_path):
+            os.replace(self.__path, taken_path)
+        elif os.path.getsize(taken_path) == 0:
+            self.__remove_taken(taken_path)
+            return self.take()
+        return self.__records(taken_path)
+    def __records(self, taken_path):
+        done_file = os.open(taken_path + '.done', os.O_RDWR | os.O_CREAT) # the offset of the first save that was not sent yet
+        corrupt_at = None
+        try :
+            saved = os.pread(done_file, done_offset.size, 0)
+            offset = done_offset.unpack(saved)[0] if len(saved) == done_offset.size else 0
+            with open(taken_path, 'rb') as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    while offset + record_header.size <= len(buffer):
+                        if offset + record_header.size + record_header.unpack_from(buffer, offset)[1] > len(buffer):
+                            break # the last record was only half written (we were killed while writing it)
+                        try :
+                            columns, next_offset = decode_record(buffer, offset)
+                        except Exception: # pylint: disable=W0718
+                            corrupt_at = offset # anything can come out of a bad record, so we just stop reading it
+                            break
+                        yield columns
+                        offset = next_offset
+                        os.pwrite(done_file, done_offset.pack(offset), 0) # the caller came back for more, so it was sent
+        finally :
+            os.close(done_file)
+        if corrupt_at is not None:
+            quarantine_path = self.__quarantine(taken_path)
+            raise RuntimeError(f"Spill file {self.__path} is corrupt at byte {corrupt_at}, moved it to {quarantine_path}.")
+        self.__remove_taken(taken_path)
+    def __quarantine(self, taken_path):
+        '''
+            Moves a corrupt file out of the way so it is not replayed again (the saves before the bad record were already sent). The
+            name does not end in .spill or .spill.replaying so it is not picked up at start up either.
+        '''
+        quarantine_path = f"{self.__path}.{time.strftime('%Y%m%d%H%M%S')}.corrupt"
+        os.replace(taken_path, quarantine_path)
+        if os.path.exists(taken_path + '.done'):
+            os.remove(taken_path + '.done')
+        return quarantine_path
+    def __remove_taken(self, taken_path):
+        os.remove(taken_path)
+        if os.path.exists(taken_path + '.done'):
+            os.remove(taken_path + '.done')
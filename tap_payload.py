@@ -0,0 +1,55 @@
+'''
+    This module has the helpers for passing tap data between sensors without copying it. A publisher freezes its payload once, and
+    then every subscriber can be handed a reference to the same object because nobody is able to change it.
+'''
+import copy
+from types import MappingProxyType
+
+def freeze_payload(data):
+    '''
+        Returns a read only version of the payload. Dicts become read only mappings, lists become tuples, bytearrays become bytes
+        and numpy arrays become read only views. Anything else is assumed to already be immutable and is passed through.
+    '''
+    if isinstance(data, MappingProxyType):
+        return data
+    if isinstance(data, dict):
+        return MappingProxyType({key : freeze_payload(value) for key, value in data.items()})
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze_payload(value) for value in data)
+    if isinstance(data, bytearray):
+        return bytes(data)
+    if isinstance(data, memoryview):
+        return data.toreadonly()
+    if hasattr(data, 'setflags') and hasattr(data, 'view'): # numpy array, we don't import numpy here so this module works without it
+        read_only = data.view()
+        read_only.setflags(write=False)
+        return read_only
+    return data
+
+def is_frozen_payload(data):
+    '''
+        Returns True if the payload was made by freeze_payload.
+    '''
+    return isinstance(data, (MappingProxyType, tuple))
+
+def thaw_payload(data):
+    '''
+        Returns a mutable copy of a frozen payload, read only mappings become dicts and tuples become lists.
+    '''
+    if isinstance(data, (MappingProxyType, dict)):
+        return {key : thaw_payload(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [thaw_payload(value) for value in data]
+    if hasattr(data, 'setflags') and hasattr(data, 'copy'): # numpy array
+        return data.copy()
+    if isinstance(data, memoryview): # a packet out of a shared memory tap
+        return data.tobytes()
+    return data
+
+def copy_payload(data):
+    '''
+        Returns a copy of the payload that the caller owns and can change. This is what sensors that are not in zero copy mode use.
+    '''
+    if is_frozen_payload(data):
+        return thaw_payload(data)
+    return copy.deepcopy(data)
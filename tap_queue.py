@@ -0,0 +1,118 @@
+'''
+    This module holds the data a sensor has received on one of its taps until process_data gets around to it. The queue has a
+    max size, and a policy for what to do when a publisher hands it more data than that.
+'''
+import pickle
+import tempfile
+from collections import deque
+
+from sensor_interface_api.tap_payload import is_frozen_payload, thaw_payload # pylint: disable=e0401
+
+overflow_policies = ['block', 'drop_oldest', 'drop_newest', 'spill']
+default_tap_queue_capacity = 100 # batches, 0 has to be asked for on purpose
+
+class tap_queue():
+    '''
+        A bounded queue of the batches received on one tap.
+
+        NOTE: this class does not lock anything on its own, sensor_parent guards it with its data lock.
+
+        ARGS:
+            capacity : max number of batches to hold in memory, 0 means there is no limit (so a subscriber that falls behind can
+                use up all the memory, only use it if you know the publisher can't outrun you).
+            overflow_policy : what to do when a batch comes in and the queue is full.
+                block : sensor_parent makes the publisher wait until there is room (see sensor_parent.send_tap).
+                drop_oldest : throw away the oldest batch to make room.
+                drop_newest : throw away the new batch.
+                spill : write the batch to a temp file on disk, it is read back the next time the queue is drained.
+    '''
+    def __init__(self, capacity:int = default_tap_queue_capacity, overflow_policy:str = 'block') -> None:
+        if overflow_policy not in overflow_policies:
+            raise RuntimeError(f"{overflow_policy} is not a valid tap overflow policy, it must be one of {overflow_policies}.")
+        self.__capacity = capacity
+        self.__overflow_policy = overflow_policy
+        self.__batches = deque()
+        self.__spill_file = None
+        self.__spilled_batches = 0
+        # counters so we can see what the queue has been up to
+        self.__received_count = 0
+        self.__dropped_count = 0
+        self.__spilled_count = 0
+        self.__max_depth = 0
+    def is_full(self):
+        '''
+            Returns True if there is no room in memory for another batch.
+        '''
+        return self.__capacity > 0 and len(self.__batches) >= self.__capacity
+    def get_overflow_policy(self):
+        '''
+            Returns the overflow policy for this queue.
+        '''
+        return self.__overflow_policy
+    def put(self, batch):
+        '''
+            Adds a batch to the queue, following the overflow policy if the queue is full. Returns False if the batch was dropped.
+
+            NOTE: for the block policy the caller is expected to have waited for room already, if it still calls put on a full queue
+            the batch is added anyway.
+        '''
+        self.__received_count += 1
+        if self.__spilled_batches > 0: # once we start spilling everything has to go to disk, otherwise the batches would get out of order.
+            self.__spill(batch)
+        elif self.is_full() and self.__overflow_policy != 'block':
+            if self.__overflow_policy == 'drop_oldest':
+                self.__batches.popleft()
+                self.__batches.append(batch)
+                self.__dropped_count += 1
+            elif self.__overflow_policy == 'drop_newest':
+                self.__dropped_count += 1
+                return False
+            else :
+                self.__spill(batch)
+        else :
+            self.__batches.append(batch)
+        self.__max_depth = max(self.__max_depth, self.get_depth())
+        return True
+    def __spill(self, batch):
+        '''
+            Writes a batch to the spill file.
+        '''
+        if self.__spill_file is None:
+            self.__spill_file = tempfile.TemporaryFile() # pylint: disable=R1732
+        if is_frozen_payload(batch): # read only mappings can't be pickled
+            batch = thaw_payload(batch)
+        pickle.dump(batch, self.__spill_file)
+        self.__spilled_batches += 1
+        self.__spilled_count += 1
+    def drain(self):
+        '''
+            Removes every batch from the queue (including any that were spilled to disk) and returns them oldest first.
+        '''
+        batches = list(self.__batches)
+        self.__batches.clear()
+        if self.__spilled_batches > 0:
+            self.__spill_file.seek(0)
+            for _ in range(self.__spilled_batches):
+                batches.append(pickle.load(self.__spill_file))
+            self.__spill_file.seek(0)
+            self.__spill_file.truncate()
+            self.__spilled_batches = 0
+        return batches
+    def get_depth(self):
+        '''
+            Returns the number of batches waiting in the queue, in memory and on disk.
+        '''
+        return len(self.__batches) + self.__spilled_batches
+    def get_stats(self):
+        '''
+            Returns a dict with the queue depth and counters.
+        '''
+        return {
+            'depth' : self.get_depth(),
+            'max_depth' : self.__max_depth,
+            'capacity' : self.__capacity,
+            'overflow_policy' : self.__overflow_policy,
+            'received' : self.__received_count,
+            'dropped' : self.__dropped_count,
+            'spilled' : self.__spilled_count,
+        }
@@ -0,0 +1,50 @@
+'''
+    Unit test for ccsds_crc
+'''
+# pylint: disable=C0116
+
+# Python imports
+import random
+import pytest
+
+# Custom imports
+from sensor_interface_api.ccsds_crc import crc16, crc16_batch, crc16_spans, crc16_matches, min_vectorized_packets
+from command_packets.functions import ccsds_crc16 # pylint: disable=e0401
+
+def random_packets(rng, count, length):
+    return [bytes(rng.getrandbits(8) for _ in range(length)) for _ in range(count)]
+
+@pytest.mark.ccsds_crc_tests
+def test_matches_ccsds_crc16():
+    assert crc16_matches(ccsds_crc16)
+    rng = random.Random(11)
+    # both sides of the point where packets of the same length go through numpy
+    for count in (1, min_vectorized_packets - 1, min_vectorized_packets, min_vectorized_packets + 1, 3 * min_vectorized_packets):
+        packets = random_packets(rng, count, 37)
+        assert crc16_batch(packets) == [ccsds_crc16(packet) for packet in packets]
+
+    # a mix of lengths, some groups big enough for numpy and some not, and empty packets
+    packets = random_packets(rng, min_vectorized_packets, 20) + random_packets(rng, 5, 9) + [b''] * 3 + random_packets(rng, min_vectorized_packets + 2, 64)
+    rng.shuffle(packets)
+    assert crc16_batch(packets) == [ccsds_crc16(packet) for packet in packets]
+    assert crc16(packets[0]) == ccsds_crc16(packets[0])
+
+@pytest.mark.ccsds_crc_tests
+def test_spans_and_good_packets():
+    rng = random.Random(12)
+    packets = []
+    for packet in random_packets(rng, 2 * min_vectorized_packets, 30):
+        crc = ccsds_crc16(packet)
+        packets.append(packet + bytes([crc >> 8, crc & 0xFF])) # a packet that ends with its own crc checks out to 0
+    packets[5] = packets[5][:-1] + bytes([packets[5][-1] ^ 1])
+
+    # spans into one buffer, with junk between the packets
+    buffer = bytearray()
+    spans = []
+    for packet in packets:
+        buffer += b'\xaa' * rng.randint(0, 3)
+        spans.append((len(buffer), len(buffer) + len(packet)))
+        buffer += packet
+    crcs = crc16_spans(bytes(buffer), spans)
+    assert crcs == [ccsds_crc16(packet) for packet in packets]
+    assert [index for index, crc in enumerate(crcs) if crc != 0] == [5]
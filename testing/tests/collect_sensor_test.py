@@ -7,6 +7,7 @@
 # Python imports
 import pytest
 import os
+import importlib
 import yaml
 from io import StringIO
 from unittest import mock
@@ -15,6 +16,7 @@ from unittest import mock
 import system_constants as sensor_config
 from logging_system_display_python_api.messageHandler import messageHandler
 from sensor_interface_api.collect_sensor import sensor_importer
+from sensor_interface_api.l1_converter import load_converter_specs
 from threading_python_api.taskHandler import taskHandler
 
 @pytest.mark.collect_sensor_tests
@@ -28,6 +30,17 @@ def test_success_importing_yaml():
     assert sensor_config.valid_apids[file_path] == ['040']
     assert sensor_config.telemetry_packet_types[file_path] == [('STTA', '040', 0)]
     assert sensor_config.telemetry_packet_num[file_path] == 1
+    assert sensor_config.apid_dispatch_tables[file_path] == {0x040 : ('STTA', 0)}
+
+@pytest.mark.collect_sensor_tests
+def test_load_converter_specs():
+    specs = {spec['name'] : spec for spec in load_converter_specs()}
+
+    assert 'stt_L0_to_L1_converter' in specs
+    assert 'stta_L0_to_L1_converter' in specs
+    for spec in specs.values():
+        assert spec['table'].endswith('_L1')
+        assert all('name' in column and 'type' in column for column in spec['columns'])
 
 
 # Test for throwing an error on a bad yaml file
@@ -121,8 +134,13 @@ def test_instantiate_sensor_objects_get_sensors():
     sobj_directory = os.path.dirname("sensor_interface_api/collect_sensor.py")
     temp_list = os.listdir(sobj_directory)
     for file in temp_list:
-        if 'sobj' in file and 'detect' not in file and 'processor' not in file:
-            desired_sensors.append(file.removeprefix('sobj_').removesuffix('.py'))
+        if 'sobj' in file and 'detect' not in file and 'processor' not in file and file.endswith('.py'):
+            module = importlib.import_module('sensor_interface_api.' + file.removesuffix('.py'))
+            desired_sensors.extend(getattr(module, 'sensor_names', [file.removeprefix('sobj_').removesuffix('.py')]))
+
+    # the l1 converters come from their specs
+    for spec in load_converter_specs():
+        desired_sensors.append(spec['name'])
 
     # assert that all sensors that should have been created were created (no missing sensors)
     desired_sensors.append('evil')
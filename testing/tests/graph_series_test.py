@@ -0,0 +1,94 @@
+'''
+    Unit test for graph_series
+'''
+# pylint: disable=C0116
+
+# Python imports
+import math
+import pytest
+
+# Custom imports
+from sensor_interface_api.graph_series import graph_series
+
+@pytest.mark.graph_series_tests
+def test_ring_buffer_and_since():
+    series = graph_series(5)
+    series.add([0, 1, 2], [10, 11, 12])
+    series.add([3, 4, 5, 6], [13, 14, 15, 16])
+
+    assert len(series) == 5
+    assert series.snapshot() == {'x': [2, 3, 4, 5, 6], 'y': [12, 13, 14, 15, 16]}
+    assert series.snapshot_since(5) == {'x': [5, 6], 'y': [15, 16], 'start': 5, 'next': 7}
+    # points 0 and 1 fell out, so the client is told to start over from 2
+    assert series.snapshot_since(0)['start'] == 2
+
+@pytest.mark.graph_series_tests
+def test_downsample_window():
+    series = graph_series(10, summary_levels=2, summary_factor=4)
+    series.add(list(range(50)), [float(x) for x in range(50)])
+
+    # the newest raw points cover this window
+    report = series.downsample(points=10, x_min=45, x_max=47)
+    assert report['x'] == [45, 46, 47]
+    assert report['count'] == [1, 1, 1]
+    assert report['y'] == report['y_min'] == report['y_max'] == [45.0, 46.0, 47.0]
+
+    # older than the raw points has to come from the buckets of 4, every bucket that overlaps the window is returned
+    report = series.downsample(points=10, x_min=10, x_max=21)
+    assert report['x'] == [8, 12, 16, 20]
+    assert report['y_min'] == [8.0, 12.0, 16.0, 20.0]
+    assert report['y_max'] == [11.0, 15.0, 19.0, 23.0]
+    assert report['count'] == [4, 4, 4, 4]
+
+@pytest.mark.graph_series_tests
+def test_downsample_points_and_partial_bucket():
+    series = graph_series(10, summary_levels=2, summary_factor=4)
+    series.add(list(range(50)), [float(x) for x in range(50)])
+
+    # 3 buckets of 16 and the one still being filled, which only has 2 points in it
+    report = series.downsample(points=5)
+    assert report['x'] == [0, 16, 32, 48]
+    assert report['count'] == [16, 16, 16, 2]
+    assert report['y'][-1] == 48.5
+    assert report['y_max'][-1] == 49.0
+
+    # asking for fewer points than the coarsest level has merges neighbouring buckets, it never returns more than asked for
+    for points in range(1, 5):
+        report = series.downsample(points=points)
+        assert len(report['x']) <= points
+        assert sum(report['count']) == 50
+        assert report['y_min'][0] == 0.0
+        assert report['y_max'][-1] == 49.0
+    assert series.downsample(points=1)['y'] == [24.5]
+
+    with pytest.raises(RuntimeError) as excinfo:
+        series.downsample(points=0)
+    assert "points has to be at least 1" in str(excinfo.value)
+
+@pytest.mark.graph_series_tests
+def test_downsample_without_summaries():
+    series = graph_series(100)
+    series.add(list(range(10)), [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+    assert series.downsample()['count'] == [1] * 10
+    # the raw points are merged down to fit
+    report = series.downsample(points=3)
+    assert report['x'] == [0, 4, 8]
+    assert report['count'] == [4, 4, 2]
+    assert report['y'] == [2.5, 6.5, 9.5]
+
+@pytest.mark.graph_series_tests
+def test_y_values_that_are_not_numbers():
+    series = graph_series(4, summary_levels=1, summary_factor=2)
+    series.add([0, 1, 2, 3], [1, None, 'a', float('nan')])
+    series.add([4, 5], [5, 7])
+
+    # every point is kept in the raw points
+    snapshot = series.snapshot()
+    assert snapshot['x'] == [2, 3, 4, 5]
+    assert snapshot['y'][0] == 'a'
+    assert math.isnan(snapshot['y'][1])
+    # but only the numbers make it into the summaries
+    report = series.downsample(points=2, x_min=0)
+    assert report['count'] == [2, 1]
+    assert report['y'] == [3.0, 7]
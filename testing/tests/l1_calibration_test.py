@@ -0,0 +1,107 @@
+'''
+    Unit test for l1_calibration
+'''
+# pylint: disable=C0116
+
+# Python imports
+import math
+import numpy as np
+import pytest
+
+# Custom imports
+from sensor_interface_api.l1_calibration import column_calibration, column_transform, l1_calibration, iq_derivation
+
+def old_sign_extend(value, bit_width):
+    '''
+        The sign extension the converters did one value at a time.
+    '''
+    sign_bit = 1 << (bit_width - 1)
+    return (value & (sign_bit - 1)) - (value & sign_bit)
+
+@pytest.mark.l1_calibration_tests
+@pytest.mark.parametrize('bit_width', [20, 24])
+def test_sign_extension(bit_width):
+    raw = [0, 1, (1 << (bit_width - 1)) - 1, 1 << (bit_width - 1), (1 << bit_width) - 1, 0x123456 & ((1 << bit_width) - 1)]
+    converted = column_calibration(bit_width=bit_width, signed=True).apply(raw).tolist()
+    assert converted == [old_sign_extend(value, bit_width) for value in raw]
+    assert converted[3] == -(1 << (bit_width - 1))
+    assert converted[4] == -1
+    # the transform step does the same thing
+    assert column_transform([['sign_extend', bit_width]]).apply(raw).tolist() == converted
+
+@pytest.mark.l1_calibration_tests
+def test_gain_offset_and_divisor():
+    raw = [0x80000, 5, 0xFFFFF]
+    # ints stay ints like the python loops
+    converted = column_calibration(bit_width=20, signed=True, gain=2, offset=3).apply(raw).tolist()
+    assert converted == [old_sign_extend(value, 20) * 2 + 3 for value in raw]
+    assert all(isinstance(value, int) for value in converted)
+    converted = column_calibration(bit_width=24, signed=True, divisor=1.5).apply([0xFFFFFF, 3]).tolist()
+    assert converted == [-1 / 1.5, 3 / 1.5]
+    converted = column_calibration(divisor=8, gain=0.5, offset=-1.25).apply([16, 0]).tolist()
+    assert converted == [16 / 8 * 0.5 - 1.25, -1.25]
+    with pytest.raises(RuntimeError):
+        column_calibration(signed=True)
+
+@pytest.mark.l1_calibration_tests
+def test_transform_steps():
+    raw = [0xF0, 0x10, 7]
+    assert column_transform([['shift_right', 4]]).apply(raw).tolist() == [0xF, 0x1, 0]
+    assert column_transform([['multiply', 3]]).apply(raw).tolist() == [0x2D0, 0x30, 21]
+    assert column_transform([['divide', 4]]).apply(raw).tolist() == [60.0, 4.0, 1.75]
+    assert column_transform([['add', -7]]).apply(raw).tolist() == [0xE9, 9, 0]
+    # the steps go in order, (raw * LSB) / gain is not always the same as raw * (LSB / gain)
+    lsb, gain = 6.25e-05, 4.99
+    raw = list(range(0, 1 << 16, 97))
+    assert column_transform([['multiply', lsb], ['divide', gain]]).apply(raw).tolist() == [(value * lsb) / gain for value in raw]
+    assert column_transform([]).apply([1, 2]).tolist() == [1, 2]
+    for step in (['bad', 1], ['add'], ['add', 1, 2]):
+        with pytest.raises(RuntimeError):
+            column_transform([step])
+
+@pytest.mark.l1_calibration_tests
+def test_calibrate_passes_other_columns_through():
+    calibration = l1_calibration({'a' : column_calibration(gain=2)})
+    buffer = calibration.calibrate({'a' : [1, 2], 'b' : ['x', 'y']}, {})
+    assert buffer == {'a' : [2, 4], 'b' : ['x', 'y']}
+
+@pytest.mark.l1_calibration_tests
+def test_magnitude_and_phase():
+    i_values = [3.0, -1.0, 0.0, -2.0, 5.0]
+    q_values = [4.0, 0.0, -2.0, -2.0]
+    derived = iq_derivation('I', 'Q').derive({'I' : np.array(i_values), 'Q' : np.array(q_values)})
+    assert list(derived) == ['Mag', 'Phase']
+    # the same as the python loops, which stopped at the shorter column
+    assert derived['Mag'].tolist() == [math.sqrt(i ** 2 + q ** 2) for i, q in zip(i_values, q_values)]
+    assert derived['Phase'].tolist() == [math.atan2(q, i) for i, q in zip(i_values, q_values)]
+    # no Q column, so there is nothing to work out
+    derived = iq_derivation('I', 'Q').derive({'I' : np.array(i_values)})
+    assert {name : values.tolist() for name, values in derived.items()} == {'Mag' : [], 'Phase' : []}
+
+@pytest.mark.l1_calibration_tests
+def test_unwrapped_phase_carries_across_batches():
+    phase = np.linspace(0, 6 * np.pi, 40) # goes round three times
+    i_values, q_values = np.cos(phase), np.sin(phase)
+    whole = iq_derivation('I', 'Q', unwrapped_phase='Phase_unwrapped').derive({'I' : i_values, 'Q' : q_values})['Phase_unwrapped']
+    assert np.allclose(whole, phase)
+
+    # the same granules split into batches (one of them empty) come out the same
+    derivation = iq_derivation('I', 'Q', unwrapped_phase='Phase_unwrapped')
+    batches = []
+    for start, stop in ((0, 7), (7, 7), (7, 8), (8, 25), (25, 40)):
+        batches.append(derivation.derive({'I' : i_values[start:stop], 'Q' : q_values[start:stop]})['Phase_unwrapped'])
+    assert np.allclose(np.concatenate(batches), whole)
+
+@pytest.mark.l1_calibration_tests
+def test_power_db():
+    derivation = iq_derivation('I', 'Q', power_db='Power_dB')
+    assert derivation.get_columns() == ['Mag', 'Phase', 'Power_dB']
+    assert derivation.get_table_rows() == [['Power_dB', 0, 'float', 'nullable']]
+    power = derivation.derive({'I' : np.array([3.0, 1e-3]), 'Q' : np.array([4.0, 0.0])})['Power_dB'].tolist()
+    assert power == [10 * math.log10(25.0), 10 * math.log10(1e-6)]
+
+    # no power at all has no log, it goes in the database as null
+    calibration = l1_calibration({'I' : column_calibration(), 'Q' : column_calibration()}, [derivation])
+    buffer = calibration.calibrate({'I' : [0, 3, 0], 'Q' : [0, 4, 1]}, {})
+    assert buffer['Power_dB'] == [None, 10 * math.log10(25), 0.0]
+    assert buffer['Mag'] == [0.0, 5.0, 1.0]
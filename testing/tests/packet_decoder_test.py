@@ -0,0 +1,48 @@
+'''
+    Unit test for packet_decoder
+'''
+# pylint: disable=C0116
+
+# Python imports
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+
+# Custom imports
+from sensor_interface_api.packet_decoder import decode_packet_batch, picklable_packets
+from sensor_interface_api.packet_unpacker import granule_unpacking_plan
+from sensor_interface_api.shared_memory_tap import write_shared_batch
+
+header_len, system_clock_len, real_time_clock_len = 6, 4, 3
+
+def make_packet(count, values):
+    header = bytes([0x08, 0x40, 0xc0 | (count >> 8), count & 0xff, 0x00, 0x10])
+    clocks = bytes([0]) + (1000 * count).to_bytes(system_clock_len, 'big') + count.to_bytes(real_time_clock_len, 'big')
+    return header + clocks + bytes(values)
+
+def decode(packets):
+    plan = granule_unpacking_plan([8, 8], [False, True], 2, (header_len + 1 + system_clock_len + real_time_clock_len) * 8)
+    columns = ['a', 'b', 'time_STM_CLK', 'time_RTC', 'received_at', 'packet_count', 'granule_index']
+    return decode_packet_batch(plan, packets, columns, ['a', 'b'], [0, 500], (header_len, system_clock_len))
+
+@pytest.mark.packet_decoder_tests
+def test_zero_copy_shared_memory_packets_in_a_worker_process():
+    packets = [make_packet(count, [count, 0xff, 2, 3]) for count in range(1, 4)]
+    # a zero copy subscriber on a shared memory tap gets its packets as memoryviews
+    views = write_shared_batch({'packets' : packets}).open()['packets']
+    assert all(isinstance(packet, memoryview) for packet in views)
+    with pytest.raises(TypeError):
+        pickle.dumps(list(views))
+
+    sendable = picklable_packets(views)
+    assert sendable == packets
+    assert picklable_packets(packets)[0] is packets[0] # bytes are not copied again
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        batch, system_clks, real_time_clks = pool.submit(decode, sendable).result()
+    expected, expected_system_clks, expected_real_time_clks = decode(views)
+    del batch['received_at'], expected['received_at']
+    assert batch == expected
+    assert (system_clks, real_time_clks) == (expected_system_clks, expected_real_time_clks)
+    assert batch['a'] == [1, 2, 2, 2, 3, 2] and batch['b'] == [-1, 3, -1, 3, -1, 3]
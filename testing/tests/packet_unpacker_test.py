@@ -0,0 +1,72 @@
+'''
+    Unit test for packet_unpacker
+'''
+# pylint: disable=C0116
+
+# Python imports
+import random
+import pytest
+
+# Custom imports
+from sensor_interface_api.packet_unpacker import granule_unpacking_plan
+
+def old_unpack(packet, word_lengths, signed, granule_count, start_bit):
+    '''
+        The per bit loop sobj_packet_processor used before granule_unpacking_plan (with a string of bits in place of the bitarray).
+    '''
+    packet_bits = ''.join(f'{byte:08b}' for byte in packet)
+    position = start_bit
+    granules = []
+    for _ in range(granule_count):
+        values = []
+        for word_length, is_signed in zip(word_lengths, signed):
+            temp = packet_bits[position:position + word_length]
+            if len(temp) > 32:
+                values.append(0)
+            elif is_signed and len(temp) > 0 and temp[0] == '1':
+                values.append(int(temp, 2) - (1 << len(temp)))
+            else :
+                values.append(int(temp, 2) if len(temp) > 0 else 0)
+            position += word_length
+        granules.append(values)
+    return granules
+
+@pytest.mark.packet_unpacker_tests
+def test_matches_the_old_loop():
+    rng = random.Random(7)
+    for _ in range(50):
+        channels = rng.randint(1, 6)
+        word_lengths = [rng.choice([1, 3, 7, 8, 12, 17, 24, 31, 32, 33, 40]) for _ in range(channels)]
+        signed = [rng.random() < 0.5 for _ in range(channels)]
+        granule_count = rng.randint(1, 4)
+        start_bit = rng.randint(0, 23) # odd offsets as well as byte aligned ones
+        total_bits = start_bit + granule_count * sum(word_lengths)
+        packets = [bytes(rng.getrandbits(8) for _ in range((total_bits + 7) // 8)) for _ in range(5)]
+        plan = granule_unpacking_plan(word_lengths, signed, granule_count, start_bit)
+        unpacked = plan.unpack(packets).tolist()
+        for packet, values in zip(packets, unpacked):
+            assert values == old_unpack(packet, word_lengths, signed, granule_count, start_bit)
+
+@pytest.mark.packet_unpacker_tests
+def test_signed_fields_and_short_packets():
+    plan = granule_unpacking_plan([4, 32, 20, 24], [True, True, True, False], 1, 3)
+    packet = bytes([0b00011111, 0xff, 0xff, 0xff, 0xf0, 0x00, 0x08, 0xff, 0xff, 0xff, 0x80])
+    assert plan.unpack([packet]).tolist() == [old_unpack(packet, [4, 32, 20, 24], [True, True, True, False], 1, 3)]
+    assert plan.unpack([packet]).tolist()[0][0][:2] == [-1, -8]
+
+    # packets of different sizes, fields that are cut off are made from the bits that are there
+    packets = [packet, packet[:6], packet[:1], b'']
+    for short, values in zip(packets, plan.unpack(packets).tolist()):
+        assert values == old_unpack(short, [4, 32, 20, 24], [True, True, True, False], 1, 3)
+
+@pytest.mark.packet_unpacker_tests
+def test_fields_wider_than_32_bits():
+    word_lengths, signed = [8, 33, 40, 7], [False, True, False, True]
+    plan = granule_unpacking_plan(word_lengths, signed, 2, 5)
+    assert plan.get_too_wide_channels() == [1, 2]
+    rng = random.Random(8)
+    packets = [bytes(rng.getrandbits(8) for _ in range(25)) for _ in range(4)] + [bytes(range(200, 210))]
+    for packet, values in zip(packets, plan.unpack(packets).tolist()):
+        # they come out as 0, and the channels after them are still in the right spot
+        assert values == old_unpack(packet, word_lengths, signed, 2, 5)
+        assert [granule[1:3] for granule in values] == [[0, 0], [0, 0]]
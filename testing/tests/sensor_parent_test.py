@@ -6,6 +6,8 @@
 # pylint: disable=E1101
 
 #Python imports
+import threading
+import time
 import pytest
 import yaml
 from unittest.mock import MagicMock, call
@@ -59,14 +61,6 @@ def test_init():
         # valid names accepted
         assert test_sensor.get_sensor_name() == 'good_sensor'
 
-        # test get_name failure to acquire lock
-        test_sensor._sensor_parent__name_lock.acquire()
-        if test_sensor._sensor_parent__name_lock.locked():
-            with pytest.raises(RuntimeError) as excinfo:
-                test_sensor.get_sensor_name()
-                assert "Could not acquire name lock" in str(excinfo.value)
-        test_sensor._sensor_parent__name_lock.release()
-
         # invalid names rejected
         with pytest.raises(RuntimeError) as excinfo:
             sensor_parent(coms=None, config={'tap_request': None, 'publisher': None, 'interval_pub': None}, name='bad\0')
@@ -80,20 +74,11 @@ def test_init():
         assert 'init_test_table' in dataBase.get_tables_html()
 
         ##################### Html graphs set up correctly #######################
-        assert test_sensor.get_graph_names() == ['one', 'two', 'three']
+        assert test_sensor.get_graph_names() == ('one', 'two', 'three')
         assert 'one' in test_sensor.get_data_report()
         assert 'two' in test_sensor.get_data_report()
         assert 'three' in test_sensor.get_data_report()
         assert not test_sensor._sensor_parent__data_report_lock.locked()
-        assert not test_sensor._sensor_parent__graphs_lock.locked()
-
-        # get_graph_names failure to acquire lock
-        test_sensor._sensor_parent__graphs_lock.acquire()
-        if test_sensor._sensor_parent__graphs_lock.locked():
-            with pytest.raises(RuntimeError) as excinfo:
-                test_sensor.get_graph_names()
-            assert "Could not acquire graphs lock" in str(excinfo.value)
-        test_sensor._sensor_parent__graphs_lock.release()
 
         ##################### Html graphs set up correctly########################
         # events set up correctly
@@ -133,18 +118,10 @@ def test_get_set_taps():
     test_sensor.set_up_taps()
     
     test_sensor.make_data_tap.assert_called_with('a')
-    assert test_sensor.get_taps() == ['a']
+    assert test_sensor.get_taps() == ('a',)
     assert test_sensor._sensor_parent__active
     test_sensor.start_publisher.assert_called()
 
-    #for getter, test if it fails to acquire lock
-    test_sensor._sensor_parent__taps_lock.acquire()
-    if test_sensor._sensor_parent__taps_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            test_sensor.get_taps()
-        assert "Could not acquire taps lock" in str(excinfo.value)
-    test_sensor._sensor_parent__taps_lock.release()
-
     #test for multiple taps, passive_active == 'passive'
     test_sensor = sensor_parent(coms=None, config={'tap_request': ['a', 'b', 'c'], 'publisher': 'yes', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='tap_test_2')
     test_sensor.make_data_tap = MagicMock()
@@ -152,7 +129,7 @@ def test_get_set_taps():
     test_sensor.set_up_taps()
     
     test_sensor.make_data_tap.assert_called_with('c')
-    assert test_sensor.get_taps() == ['a', 'b', 'c']
+    assert test_sensor.get_taps() == ('a', 'b', 'c')
     assert not test_sensor._sensor_parent__active
     test_sensor.start_publisher.assert_not_called()
 
@@ -162,7 +139,7 @@ def test_get_set_taps():
     test_sensor.start_publisher = MagicMock()
     test_sensor.set_up_taps()
 
-    assert test_sensor.get_taps() == ['None']
+    assert test_sensor.get_taps() == ('None',)
     assert not test_sensor._sensor_parent__active
     test_sensor.start_publisher.assert_not_called()
     
@@ -180,45 +157,18 @@ def test_get_set_sensor_status():
 
     # test for all valid inputs
     assert test_sensor.get_sensor_status() == 'Not Running'
-    assert not test_sensor._sensor_parent__status_lock.locked()
 
     possible_status = ['Running', 'Error', 'Not Running']
     for status in possible_status:
         test_sensor.set_sensor_status(status)
-        assert not test_sensor._sensor_parent__status_lock.locked()
-
         assert test_sensor.get_sensor_status() == status
-        assert not test_sensor._sensor_parent__status_lock.locked()
 
     # test for invalid input
     with pytest.raises(RuntimeError) as excinfo:
         test_sensor.set_sensor_status('bad')
     
     assert "bad is not a valid status" in str(excinfo.value)
-    assert not test_sensor._sensor_parent__status_lock.locked()
     assert test_sensor.get_sensor_status() == 'Not Running'
-    assert not test_sensor._sensor_parent__status_lock.locked()
-
-    # test for set_sensor_status failing to get lock
-    test_sensor._sensor_parent__status_lock.acquire()
-    if test_sensor._sensor_parent__status_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            test_sensor.set_sensor_status('Running')
-        
-        test_sensor._sensor_parent__status_lock.release()
-        assert 'Could not acquire status lock' in str(excinfo.value)
-        assert not test_sensor._sensor_parent__status_lock.locked()
-        assert test_sensor.get_sensor_status() == 'Not Running'
-
-    # test for get_sensor_status failing to get lock
-    test_sensor._sensor_parent__status_lock.acquire()
-    if test_sensor._sensor_parent__status_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            test_sensor.get_sensor_status()
-        
-        test_sensor._sensor_parent__status_lock.release()
-        assert 'Could not acquire status lock' in str(excinfo.value)
-        assert not test_sensor._sensor_parent__status_lock.locked()
 
 @pytest.mark.sensor_parent_tests
 def test_set_thread_status():
@@ -253,7 +203,7 @@ def test_get_data():
     coms.set_thread_handler(threadHandler=task_handler)
     receiver = sensor_parent(coms=coms, config={'tap_request': ['sender'], 'publisher': None, 'interval_pub': None}, name='receiver')
     receiver.set_up_taps()
-    assert receiver.get_taps() == ['sender']
+    assert receiver.get_taps() == ('sender',)
 
     # ensure data_buffer_overwrite is false (ready for data)
     data_ready = False
@@ -309,19 +259,6 @@ def test_make_data_tap():
         while task_handler.check_request('source', 1) is False:
             pass
         assert 'tapper' in source._sensor_parent__tap_subscribers
-
-        # test for failure to acquire name_lock
-        tapper._sensor_parent__name_lock.acquire()
-        # mock send_request to make sure it isn't called
-        coms.send_request = MagicMock()
-        if tapper._sensor_parent__name_lock.locked():
-            with pytest.raises(RuntimeError) as excinfo:
-                tapper.make_data_tap('source')
-
-            tapper._sensor_parent__name_lock.release()
-            assert 'Could not acquire name lock' in str(excinfo.value)
-            assert not tapper._sensor_parent__name_lock.locked()
-        assert call('source', ['create_tap', tapper.send_tap, 'source']) not in coms.send_request.call_args
     finally:
         task_handler.kill_tasks()
 
@@ -350,11 +287,12 @@ def test_send_tap_not_read_from_file(capsys):
         data = [1, 2, 3]
         test_sensor.send_tap(data=data, sender='sender')
         captured = capsys.readouterr()
-        assert test_sensor._sensor_parent__data_received['sender'] == data
+        assert test_sensor._sensor_parent__data_received['sender'].get_depth() == 1
         assert captured.out == "process_data called\n"
         
         test_sensor.send_tap(data=[], sender = 'sender')
-        assert test_sensor._sensor_parent__data_received['sender'] == data
+        assert test_sensor._sensor_parent__data_received['sender'].get_depth() == 1
+        assert test_sensor.get_data_received('sender') == data
 
         #testing all instances of data_buffer_overwrite_lock
         test_sensor._sensor_parent__data_buffer_overwrite_lock.acquire()
@@ -405,7 +343,7 @@ def test_send_tap_read_from_file(capsys):
         data = [1, 2, 3]
         test_sensor.send_tap(data=data, sender='sender')
         captured = capsys.readouterr()
-        assert test_sensor._sensor_parent__data_received['sender'] == data
+        assert test_sensor.get_data_received('sender') == data
         assert "process_data called" in captured.out
         
         #assuming the mark_started request is the first one made to the file listener
@@ -416,6 +354,175 @@ def test_send_tap_read_from_file(capsys):
     finally:
         task_handler.kill_tasks()
 
+@pytest.mark.sensor_parent_tests
+def test_zero_copy_taps():
+    sensor_config.read_from_file = False
+    sender = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'yes', 'passive_active': 'passive', 'interval_pub': 'NA', 'zero_copy_taps': 'yes'}, name='zero_copy_sender')
+    zero_copy_receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'zero_copy_taps': 'yes'}, name='zero_copy_receiver')
+    copy_receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='copy_receiver')
+
+    # published data gets frozen
+    sender.set_publish_data({'a': [1, 2], 'b': [b'x', bytearray(b'y')]})
+    published = sender._sensor_parent__publish_data
+    assert published['a'] == (1, 2)
+    assert published['b'] == (b'x', b'y')
+    with pytest.raises(TypeError):
+        published['a'] = [3]
+
+    # zero copy receivers get a reference to the frozen data
+    zero_copy_receiver.send_tap(published, 'sender')
+    assert zero_copy_receiver.get_data_received('sender') is published
+
+    # a second batch before the first is read gets merged into new lists
+    zero_copy_receiver.send_tap(published, 'sender')
+    zero_copy_receiver.send_tap(published, 'sender')
+    assert zero_copy_receiver.get_data_received('sender') == {'a': [1, 2, 1, 2], 'b': [b'x', b'y', b'x', b'y']}
+    assert published['a'] == (1, 2)
+
+    # receivers in copy mode get their own data they can change
+    copy_receiver.send_tap(published, 'sender')
+    data = copy_receiver.get_data_received('sender')
+    assert data == {'a': [1, 2], 'b': [b'x', b'y']}
+    data['a'].append(3)
+    assert published['a'] == (1, 2)
+
+@pytest.mark.sensor_parent_tests
+def test_send_tap_waits_for_buffer():
+    sensor_config.read_from_file = False
+    test_sensor = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'tap_timeout': 2, 'tap_queue_capacity': 1}, name='backpressure_receiver')
+
+    # the publisher should block while the tap queue is full, until it is drained
+    test_sensor.send_tap([1, 2], 'sender')
+    publisher = threading.Thread(target=test_sensor.send_tap, args=([3], 'sender'))
+    publisher.start()
+    time.sleep(0.2)
+    assert publisher.is_alive()
+    assert test_sensor.get_data_received('sender') == [1, 2] # draining the queue lets the publisher go
+    publisher.join(timeout=1)
+    assert not publisher.is_alive()
+    assert test_sensor.get_data_received('sender') == [3]
+
+    # empty data never waits
+    test_sensor.send_tap([4], 'sender')
+    test_sensor.send_tap([], 'sender')
+    assert test_sensor.get_data_received('sender') == [4]
+
+@pytest.mark.sensor_parent_tests
+def test_tap_queue_overflow_policies():
+    sensor_config.read_from_file = False
+    def make_receiver(policy):
+        return sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'tap_queue_capacity': 2, 'tap_overflow_policy': policy, 'tap_timeout': 0.1}, name=f'{policy}_receiver')
+
+    # batches that come in before process_data runs are merged together
+    receiver = make_receiver('drop_oldest')
+    receiver.send_tap({'a': [1]}, 'sender')
+    receiver.send_tap({'a': [2]}, 'sender')
+    assert receiver.get_tap_stats()['sender']['depth'] == 2
+    assert receiver.get_data_received('sender') == {'a': [1, 2]}
+    assert receiver.get_data_received('sender') is None
+
+    # drop oldest
+    for i in range(4):
+        receiver.send_tap([i], 'sender')
+    assert receiver.get_data_received('sender') == [2, 3]
+    assert receiver.get_tap_stats()['sender']['dropped'] == 2
+
+    # drop newest
+    receiver = make_receiver('drop_newest')
+    for i in range(4):
+        receiver.send_tap([i], 'sender')
+    assert receiver.get_data_received('sender') == [0, 1]
+    assert receiver.get_tap_stats()['sender']['dropped'] == 2
+
+    # spill keeps everything, in order
+    receiver = make_receiver('spill')
+    for i in range(4):
+        receiver.send_tap({'a': [i]}, 'sender')
+    stats = receiver.get_tap_stats()['sender']
+    assert stats['depth'] == 4
+    assert stats['spilled'] == 2
+    assert receiver.get_data_received('sender') == {'a': [0, 1, 2, 3]}
+    assert receiver.get_tap_stats()['sender']['depth'] == 0
+
+    # block times out when nobody drains the queue, that is logged and counted and the data goes in anyway
+    receiver = make_receiver('block')
+    for i in range(3):
+        receiver.send_tap([i], 'sender')
+    assert receiver.get_data_received('sender') == [0, 1, 2]
+    assert receiver.get_metrics()['counters']['sensor_tap_timeouts_total{sensor="block_receiver"}'] == 1
+
+    # unless the sensor asks for an error
+    receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'tap_queue_capacity': 2, 'tap_timeout': 0.1, 'tap_timeout_exception': 'yes'}, name='strict_receiver')
+    receiver.send_tap([0], 'sender')
+    receiver.send_tap([1], 'sender')
+    with pytest.raises(RuntimeError) as excinfo:
+        receiver.send_tap([2], 'sender')
+    assert 'Timed out waiting for strict_receiver to make room' in str(excinfo.value)
+    assert receiver.get_data_received('sender') == [0, 1]
+
+    # bad policy
+    with pytest.raises(RuntimeError) as excinfo:
+        make_receiver('bad')
+    assert 'bad is not a valid tap overflow policy' in str(excinfo.value)
+
+    # the queues are bounded unless the sensor asks for 0
+    receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='default_receiver')
+    receiver.send_tap([0], 'sender')
+    assert receiver.get_tap_stats()['sender']['capacity'] == 100
+    assert receiver.get_tap_stats()['sender']['overflow_policy'] == 'block'
+    receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'tap_queue_capacity': 0}, name='unbounded_receiver')
+    receiver.send_tap([0], 'sender')
+    assert receiver.get_tap_stats()['sender']['capacity'] == 0
+
+@pytest.mark.sensor_parent_tests
+def test_shared_memory_taps():
+    sensor_config.read_from_file = False
+    sender = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'yes', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='shared_memory_sender')
+    shared_receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'zero_copy_taps': 'yes', 'tap_transport': 'shared_memory'}, name='shared_receiver')
+    copy_receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'tap_transport': 'shared_memory'}, name='shared_copy_receiver')
+    direct_receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='direct_receiver')
+
+    sender.create_tap([shared_receiver.send_tap, 'shared_receiver', 'shared_memory'])
+    sender.create_tap([copy_receiver.send_tap, 'shared_copy_receiver', 'shared_memory'])
+    sender.create_tap([direct_receiver.send_tap, 'direct_receiver'])
+    assert sender._sensor_parent__tap_transports == ['shared_memory', 'shared_memory', 'direct']
+
+    sender.set_publish_data({'count': [1, 2, 3], 'packets': [b'\x01\x02', b'', b'abc'], 'time': ['a', 'b', 'c']})
+    sender.send_data_to_tap()
+
+    # zero copy receivers get read only views of the shared memory
+    data = shared_receiver.get_data_received('shared_memory_sender')
+    assert list(data['count']) == [1, 2, 3]
+    assert [bytes(packet) for packet in data['packets']] == [b'\x01\x02', b'', b'abc']
+    assert data['time'] == ('a', 'b', 'c')
+    with pytest.raises(ValueError):
+        data['count'][0] = 5
+
+    # copy receivers get their own data as lists, the same as direct receivers do
+    data = copy_receiver.get_data_received('shared_memory_sender')
+    assert data == {'count': [1, 2, 3], 'packets': [b'\x01\x02', b'', b'abc'], 'time': ['a', 'b', 'c']}
+    assert isinstance(data['count'], list)
+    data['count'][0] = 5
+    assert direct_receiver.get_data_received('shared_memory_sender') == {'count': [1, 2, 3], 'packets': [b'\x01\x02', b'', b'abc'], 'time': ['a', 'b', 'c']}
+
+@pytest.mark.sensor_parent_tests
+def test_failing_subscriber_does_not_stop_the_others():
+    sensor_config.read_from_file = False
+    sender = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'yes', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='failing_tap_sender')
+    receiver = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='good_receiver')
+    def broken_tap(data, sender_name):
+        raise RuntimeError(f"{sender_name} sent {data} to a broken tap")
+    sender.create_tap([broken_tap, 'broken_receiver'])
+    sender.create_tap([broken_tap, 'broken_shared_receiver', 'shared_memory'])
+    sender.create_tap([receiver.send_tap, 'good_receiver'])
+
+    sender.set_publish_data([1, 2])
+    assert sender.send_data_to_tap() == [1, 2]
+    assert receiver.get_data_received('failing_tap_sender') == [1, 2]
+    metrics = sender.get_metrics()['counters']
+    assert metrics['sensor_tap_send_errors_total{sensor="failing_tap_sender"}'] == 2
+    assert metrics['sensor_tap_batches_published_total{sensor="failing_tap_sender"}'] == 1
+
 @pytest.mark.sensor_parent_tests
 def test_create_tap():
     test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='Peter')
@@ -450,15 +557,6 @@ def test_start_publisher():
 
     assert 'publisher for publisher_test' in task_handler._taskHandler__threads
 
-    # test for failure to acquire lock
-    test_sensor._sensor_parent__name_lock.acquire()
-    if test_sensor._sensor_parent__name_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            test_sensor.start_publisher()
-        
-        assert "Could not acquire name lock" in str(excinfo.value)
-    test_sensor._sensor_parent__name_lock.release()
-
     task_handler.kill_tasks()
 
 @pytest.mark.sensor_parent_tests
@@ -519,14 +617,6 @@ def test_publish():
         assert "Could not acquire active lock" in str(excinfo.value)
     active_test_sensor._sensor_parent__active__lock.release()
 
-    active_test_sensor._sensor_parent__last_published_data_lock.acquire()
-    if active_test_sensor._sensor_parent__last_published_data_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            active_test_sensor.publish()
-        
-        assert "Could not acquire published data lock" in str(excinfo.value)
-    active_test_sensor._sensor_parent__last_published_data_lock.release()
-
     active_test_sensor._sensor_parent__has_been_published_lock.acquire()
     if active_test_sensor._sensor_parent__has_been_published_lock.locked():
         with pytest.raises(RuntimeError) as excinfo:
@@ -548,14 +638,6 @@ def test_publish():
     assert passive_test_sensor.get_last_published_data()['data'] == "Unable to convert last data to string for reporting, this should not affect performance of the publishing."
 
     # failure to acquire locks
-    passive_test_sensor._sensor_parent__last_published_data_lock.acquire()
-    if passive_test_sensor._sensor_parent__last_published_data_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            passive_test_sensor.publish()
-        
-        assert "Could not acquire last published data lock" in str(excinfo.value)
-    passive_test_sensor._sensor_parent__last_published_data_lock.release()
-
     passive_test_sensor._sensor_parent__has_been_published_lock.acquire()
     if passive_test_sensor._sensor_parent__has_been_published_lock.locked():
         with pytest.raises(RuntimeError) as excinfo:
@@ -588,7 +670,7 @@ def test_send_data_to_tap():
         sender.set_publish_data(data)
         sender.send_data_to_tap()
         
-        assert receiver._sensor_parent__data_received['sender'] == data
+        assert receiver.get_data_received('sender') == data
     finally:
         task_handler.kill_tasks()
 
@@ -710,6 +792,111 @@ def test_get_set_graph_data():
         assert "Could not acquire data report lock" in str(excinfo.value)
     test_sensor._sensor_parent__data_report_lock.release()
 
+@pytest.mark.sensor_parent_tests
+def test_get_data_report_since():
+    test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='Tim', graphs=['plot', 'over'])
+
+    # a new client gets everything
+    test_sensor.add_graph_data('plot', [0, 1], [5, 6])
+    data_report = test_sensor.get_data_report_since()
+    assert data_report['plot'] == {'x': [0, 1], 'y': [5, 6], 'start': 0, 'next': 2}
+    assert data_report['over'] == {'x': [], 'y': [], 'start': 0, 'next': 0}
+
+    # then only the new points
+    test_sensor.add_graph_data('plot', [2], [7])
+    data_report = test_sensor.get_data_report_since({'plot': 2, 'over': 0})
+    assert data_report['plot'] == {'x': [2], 'y': [7], 'start': 2, 'next': 3}
+    assert test_sensor.get_data_report_since({'plot': 3})['plot'] == {'x': [], 'y': [], 'start': 3, 'next': 3}
+
+    # the client fell behind and some points are gone
+    test_sensor.add_graph_data('plot', list(range(3, 20)), list(range(3, 20)))
+    data_report = test_sensor.get_data_report_since({'plot': 3})
+    assert data_report['plot']['start'] == 10
+    assert data_report['plot']['x'] == list(range(10, 20))
+    assert data_report['plot']['next'] == 20
+
+    # the client has indexes from before we were restarted
+    assert test_sensor.get_data_report_since({'over': 50})['over']['start'] == 0
+
+    # get_data_report_since failure to acquire locks
+    test_sensor._sensor_parent__data_report_lock.acquire()
+    if test_sensor._sensor_parent__data_report_lock.locked():
+        with pytest.raises(RuntimeError) as excinfo:
+            test_sensor.get_data_report_since()
+        assert "Could not acquire data report lock" in str(excinfo.value)
+    test_sensor._sensor_parent__data_report_lock.release()
+
+@pytest.mark.sensor_parent_tests
+def test_get_data_report_downsampled():
+    test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'graph_summary_levels': 2, 'graph_summary_factor': 10}, name='Tim', graphs=['plot'])
+
+    # 10 raw points, and 10 buckets of 10 and 100 points
+    test_sensor.add_graph_data('plot', list(range(1005)), [x % 10 for x in range(1005)])
+
+    # the raw points are still there for the newest part of the graph
+    data_report = test_sensor.get_data_report(points=20, window=(995, None))
+    raw_y = [5, 6, 7, 8, 9, 0, 1, 2, 3, 4]
+    assert data_report['plot'] == {'x': list(range(995, 1005)), 'y': raw_y, 'y_min': raw_y, 'y_max': raw_y, 'count': [1] * 10}
+
+    # older than that comes from the buckets of 10 points (the last one is not full yet)
+    data_report = test_sensor.get_data_report(points=20, window=(910, None))
+    assert data_report['plot']['count'] == [10] * 9 + [5]
+    assert data_report['plot']['x'] == [910, 920, 930, 940, 950, 960, 970, 980, 990, 1000]
+    assert data_report['plot']['y_min'] == [0] * 10
+    assert data_report['plot']['y_max'] == [9] * 9 + [4]
+    assert data_report['plot']['y'] == [4.5] * 9 + [2.0]
+
+    # the whole history only fits in the buckets of 100 points
+    data_report = test_sensor.get_data_report(points=20)
+    assert data_report['plot']['count'] == [100] * 10 + [5]
+    assert data_report['plot']['x'] == list(range(0, 1001, 100))
+    assert data_report['plot']['y'][0] == 4.5
+
+    # no points or window is the same report as always
+    assert test_sensor.get_data_report()['plot'] == {'x': list(range(995, 1005)), 'y': raw_y}
+
+    # y values that are not numbers are kept, they just stay out of the summaries, and they don't leave the lock held
+    test_sensor.add_graph_data('plot', [1005, 1006], [None, 'a'])
+    assert not test_sensor._sensor_parent__data_report_lock.locked()
+    assert test_sensor.get_data_report()['plot']['y'][-2:] == [None, 'a']
+    assert sum(test_sensor.get_data_report(points=20)['plot']['count']) == 1005
+
+    # the summaries are off unless the config asks for them
+    assert test_sensor._sensor_parent__graph_summary_levels == 2
+    assert sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='Tom', graphs=['plot'])._sensor_parent__graph_summary_levels == 0
+
+@pytest.mark.sensor_parent_tests
+def test_get_metrics():
+    test_sensor = sensor_parent(coms=None, config={'tap_request': ['sender'], 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='metrics_test')
+    test_sensor.process_data = MagicMock()
+
+    test_sensor.send_tap(['a', 'b', 'c'], 'sender')
+    test_sensor.get_data_received('sender')
+    test_sensor.send_tap(['d'], 'sender')
+    test_sensor._sensor_parent__timed_process_data('data_received_for_sender')
+    test_sensor.get_metrics_registry().counter('sensor_bad_crc_total', 'Packets with a bad crc.').inc(2)
+
+    metrics = test_sensor.get_metrics()
+    assert metrics['sensor'] == 'metrics_test'
+    assert metrics['counters']['sensor_tap_batches_received_total{sensor="metrics_test"}'] == 2
+    assert metrics['counters']['sensor_tap_items_received_total{sensor="metrics_test"}'] == 4
+    assert metrics['counters']['sensor_bad_crc_total{sensor="metrics_test"}'] == 2
+    assert metrics['gauges']['sensor_tap_queue_depth{sensor="metrics_test",tap="sender"}'] == 1
+    assert metrics['histograms']['sensor_send_tap_seconds{sensor="metrics_test"}']['count'] == 2
+    assert metrics['histograms']['sensor_process_data_seconds{sensor="metrics_test"}']['count'] == 1
+    assert metrics['histograms']['sensor_lock_wait_seconds{sensor="metrics_test",lock="data"}']['count'] == 3
+    test_sensor.process_data.assert_called_once_with('data_received_for_sender')
+
+    text = test_sensor.get_metrics('text')
+    assert '# TYPE sensor_send_tap_seconds histogram' in text
+    assert 'sensor_send_tap_seconds_bucket{sensor="metrics_test",le="+Inf"} 2' in text
+    assert 'sensor_tap_batches_received_total{sensor="metrics_test"} 2' in text
+    assert text.count('# TYPE sensor_lock_wait_seconds histogram') == 1
+
+    with pytest.raises(RuntimeError) as excinfo:
+        test_sensor.get_metrics('xml')
+    assert "xml is not a metrics format" in str(excinfo.value)
+
 @pytest.mark.sensor_parent_tests
 def test_get_last_published_data():
     data = ['abc', 'def', 'ghi']
@@ -718,16 +905,14 @@ def test_get_last_published_data():
 
     test_sensor.set_publish_data(data)
     test_sensor.publish()
-    assert test_sensor.get_last_published_data()['data'] == 'g , h , i'
+    last_published = test_sensor.get_last_published_data()
+    assert last_published['data'] == 'g , h , i'
 
-    # failure to acquire lock
-    test_sensor._sensor_parent__last_published_data_lock.acquire()
-    if test_sensor._sensor_parent__last_published_data_lock.locked():
-        with pytest.raises(RuntimeError) as excinfo:
-            test_sensor.get_last_published_data()
-        
-        assert "Could not acquire last published data lock" in str(excinfo.value)
-    test_sensor._sensor_parent__last_published_data_lock.release()
+    # publishing again swaps in a new snapshot, the one we are holding does not change
+    test_sensor.set_publish_data(['jkl'])
+    test_sensor.publish()
+    assert test_sensor.get_last_published_data()['data'] == 'j , k , l'
+    assert last_published['data'] == 'g , h , i'
 
 @pytest.mark.sensor_parent_tests
 def test_save_data_read_from_file():
@@ -900,6 +1085,112 @@ def test_save_byte_data_not_read_from_file():
         dataBase._DataBaseHandler__close_sql_connections()
         task_handler.kill_tasks()
 
+@pytest.mark.sensor_parent_tests
+def test_save_batching():
+    sensor_config.read_from_file = True
+    sensor_config.file_listener_name = 'file_listener'
+    coms = MagicMock()
+    test_sensor = sensor_parent(coms=coms, config={'tap_request': None, 'publisher': 'no', 'interval_pub': 'NA', 'save_batch_rows': 4, 'save_batch_latency': 0.2}, name='save_batch_test', db_name='db')
+
+    # the rows wait until there are enough of them
+    test_sensor.save_data(table='table', data={'first': [1, 2], 'second': ['a', 'b']})
+    test_sensor.save_data(table='table', data={'first': [3], 'second': ['c']})
+    coms.send_request.assert_not_called()
+    test_sensor.save_data(table='table', data={'first': [4], 'second': ['d']})
+    assert coms.send_request.call_args_list == [call('db', ['save_data_group', 'table', {'first': [1, 2, 3, 4], 'second': ['a', 'b', 'c', 'd']}, 'save_batch_test'])] + [call('file_listener', ['mark_ended', 'save_batch_testnot byte'])] * 3
+
+    # or until save_batch_latency runs out
+    coms.send_request.reset_mock()
+    test_sensor.save_byte_data(table='byte_table', data={'first': [[11]]})
+    time.sleep(0.5)
+    assert coms.send_request.call_args_list == [call('db', ['save_byte_data', 'byte_table', {'first': [[11]]}, 'save_batch_test']), call('file_listener', ['mark_ended', 'save_batch_testbyte'])]
+
+    # flush_saves sends everything right away
+    coms.send_request.reset_mock()
+    sensor_config.read_from_file = False
+    test_sensor.save_data(table='table', data={'first': [5], 'second': ['e']})
+    test_sensor.flush_saves()
+    assert coms.send_request.call_args_list == [call('db', ['save_data_group', 'table', {'first': [5], 'second': ['e']}, 'save_batch_test'])]
+
+@pytest.mark.sensor_parent_tests
+def test_spill_saves(tmp_path):
+    sensor_config.read_from_file = False
+    queue_depth = [100]
+    sensor_config.database_queue_depth = lambda: queue_depth[0]
+    coms = MagicMock()
+    test_sensor = sensor_parent(coms=coms, config={'tap_request': None, 'publisher': 'no', 'interval_pub': 'NA', 'spill_queue_depth': 10, 'spill_folder': str(tmp_path), 'spill_replay_interval': 0.01}, name='spill_test', db_name='db')
+
+    try:
+        # the database is behind, so the saves are spilled and a replay thread is asked for
+        test_sensor.save_data(table='table', data={'first': [1, 2], 'second': ['a', 'b']})
+        test_sensor.save_byte_data(table='byte_table', data={'first': [b'\x0b']})
+        test_sensor.save_data(table='table', data={'first': [3], 'second': ['c']})
+        assert coms.send_request.call_args_list == [call('task_handler', ['add_thread_request_func', test_sensor.replay_spills, 'spill replay for spill_test', test_sensor])]
+        assert (tmp_path / 'spill_test' / 'table.save_data_group.spill').exists()
+
+        # the database caught up, but until the replay is done new saves still go behind the spilled ones
+        coms.send_request.reset_mock()
+        queue_depth[0] = 0
+        test_sensor.save_data(table='table', data={'first': [2 ** 63], 'second': ['z']})
+        assert coms.send_request.call_args_list == []
+
+        # the replay sends them in order
+        test_sensor.replay_spills()
+        assert coms.send_request.call_args_list == [
+            call('db', ['save_data_group', 'table', {'first': [1, 2], 'second': ['a', 'b']}, 'spill_test']),
+            call('db', ['save_data_group', 'table', {'first': [3], 'second': ['c']}, 'spill_test']),
+            call('db', ['save_data_group', 'table', {'first': [2 ** 63], 'second': ['z']}, 'spill_test']),
+            call('db', ['save_byte_data', 'byte_table', {'first': [b'\x0b']}, 'spill_test']),
+        ]
+        assert not (tmp_path / 'spill_test' / 'table.save_data_group.spill').exists()
+
+        # and new saves go straight to the database
+        coms.send_request.reset_mock()
+        test_sensor.save_data(table='table', data={'first': [4], 'second': ['d']})
+        assert coms.send_request.call_args_list == [call('db', ['save_data_group', 'table', {'first': [4], 'second': ['d']}, 'spill_test'])]
+    finally:
+        del sensor_config.database_queue_depth
+
+@pytest.mark.sensor_parent_tests
+def test_spill_replay_failures(tmp_path):
+    sensor_config.read_from_file = False
+    queue_depth = [100]
+    sensor_config.database_queue_depth = lambda: queue_depth[0]
+    coms = MagicMock()
+    test_sensor = sensor_parent(coms=coms, config={'tap_request': None, 'publisher': 'no', 'interval_pub': 'NA', 'spill_queue_depth': 10, 'spill_folder': str(tmp_path), 'spill_replay_interval': 0.01}, name='spill_fail', db_name='db')
+
+    try:
+        # a corrupt spill file is moved aside and the other tables still get replayed
+        test_sensor.save_data(table='table', data={'first': [1]})
+        test_sensor.save_byte_data(table='byte_table', data={'first': [b'\x0b']})
+        with open(tmp_path / 'spill_fail' / 'table.save_data_group.spill', 'r+b') as file:
+            file.write(b'JUNK')
+        coms.send_request.reset_mock()
+        queue_depth[0] = 0
+        test_sensor.replay_spills()
+        assert coms.send_request.call_args_list == [call('db', ['save_byte_data', 'byte_table', {'first': [b'\x0b']}, 'spill_fail'])]
+        assert [path.name.endswith('.corrupt') for path in (tmp_path / 'spill_fail').iterdir()] == [True]
+
+        # if sending fails the replay stops, but saves are not spilled forever after
+        queue_depth[0] = 100
+        test_sensor.save_data(table='table', data={'first': [2]})
+        queue_depth[0] = 0
+        coms.send_request.reset_mock()
+        coms.send_request.side_effect = RuntimeError('database is gone')
+        with pytest.raises(RuntimeError, match='database is gone'):
+            test_sensor.replay_spills()
+        coms.send_request.side_effect = None
+        coms.send_request.reset_mock()
+        test_sensor.save_data(table='table', data={'first': [3]})
+        assert coms.send_request.call_args_list == [call('db', ['save_data_group', 'table', {'first': [3]}, 'spill_fail'])]
+
+        # the save that failed is still in the spill file for the next replay
+        coms.send_request.reset_mock()
+        test_sensor.replay_spills()
+        assert coms.send_request.call_args_list == [call('db', ['save_data_group', 'table', {'first': [2]}, 'spill_fail'])]
+    finally:
+        del sensor_config.database_queue_depth
+
 @pytest.mark.sensor_parent_tests
 def test_preprocess_data():
     #NOTE: as the preprocess function is currently written, it works, but partial_start is never false; when it should be, the blank bytes object is treated as the partial start packet
@@ -990,6 +1281,51 @@ def test_preprocess_ccsds_data_bad_packet():
         assert bytes(packets[0]) in data[0]
         assert bad_packets is True
 
+@pytest.mark.sensor_parent_tests
+def test_preprocess_ccsds_data_split_packet():
+    sensor_config.sync_word_len = 4
+    sensor_config.ccsds_header_len = 5
+    sensor_config.sync_word = 0x352ef853
+    sensor_config.packet_len_addr1 = 8
+    sensor_config.packet_len_addr2 = 9
+
+    test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='Jimmy')
+
+    with open('sensor_interface_api/testing/sensor_test/good_test_packet.bin', 'rb+') as file:
+        full_data = file.read()
+
+    # feed the packet in a few bytes at a time, the scanner should carry the partial packet over until it is complete
+    found_packets = []
+    for i in range(0, len(full_data), 7):
+        packets, bad_packets = test_sensor.preprocess_ccsds_data(data=[full_data[i:i+7]])
+        found_packets.extend(bytes(packet) for packet in packets)
+        assert bad_packets is False
+
+    assert len(found_packets) == 1
+    assert found_packets[0] in full_data
+
+@pytest.mark.sensor_parent_tests
+def test_preprocess_ccsds_data_packet_buffer():
+    sensor_config.sync_word_len = 4
+    sensor_config.ccsds_header_len = 5
+    sensor_config.sync_word = 0x352ef853
+    sensor_config.packet_len_addr1 = 8
+    sensor_config.packet_len_addr2 = 9
+
+    # start with a buffer that is way too small so it has to wrap and grow
+    test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA', 'packet_buffer_size': 16}, name='Jerry')
+
+    with open('sensor_interface_api/testing/sensor_test/good_test_packet.bin', 'rb+') as file:
+        full_data = file.read()
+
+    for _ in range(3):
+        packets, bad_packets = test_sensor.preprocess_ccsds_data(data=[full_data[:100], full_data[100:]])
+        assert len(packets) == 1
+        assert isinstance(packets[0], memoryview)
+        assert packets[0].readonly
+        assert bytes(packets[0]) in full_data
+        assert bad_packets is False
+
 @pytest.mark.sensor_parent_tests
 def test_int_to_bytes():
     test_sensor = sensor_parent(coms=None, config={'tap_request': None, 'publisher': 'no', 'passive_active': 'passive', 'interval_pub': 'NA'}, name='Phillip')
@@ -0,0 +1,67 @@
+'''
+    Unit test for shared_memory_tap
+'''
+# pylint: disable=C0116
+
+# Python imports
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+
+# Custom imports
+from sensor_interface_api.shared_memory_tap import write_shared_batch, pack_column
+
+@pytest.mark.shared_memory_tap_tests
+def test_pack_column_only_uses_arrays_when_exact():
+    assert pack_column([1, 2, 3])[0] == 'array'
+    assert pack_column([1.5, 2.0])[0] == 'array'
+    assert pack_column([True, False])[0] == 'array'
+    assert pack_column(np.array([1, 2], dtype=np.uint16))[1].dtype == np.uint16
+    # these would all come back as something else out of an array
+    assert pack_column([1, 2 ** 63])[0] == 'pickle'
+    assert pack_column([1, 2.5])[0] == 'pickle'
+    assert pack_column([True, 2])[0] == 'pickle'
+    assert pack_column([bytearray(b'a')])[0] == 'pickle'
+    assert pack_column([b'a', b'bc'])[0] == 'bytes'
+
+@pytest.mark.shared_memory_tap_tests
+def test_copy_round_trip():
+    data = {
+        'big' : [1, 2 ** 63],
+        'mixed' : [1, 2.5],
+        'ints' : [-1, 0, 2 ** 63 - 1],
+        'floats' : [0.1, 2.0],
+        'flags' : [True, False],
+        'packets' : [b'\x01', b''],
+        'tuple' : (1, 2),
+        'names' : ['a', None],
+        'array' : np.array([1, 2], dtype=np.int16),
+    }
+    opened = write_shared_batch(data).open(copy=True)
+    for key, values in data.items():
+        if key == 'array':
+            assert opened[key].dtype == np.int16 and opened[key].tolist() == [1, 2]
+            continue
+        assert opened[key] == values
+        assert type(opened[key]) is type(values)
+        assert [type(value) for value in opened[key]] == [type(value) for value in values]
+    assert write_shared_batch([3, 4]).open(copy=True) == [3, 4]
+
+@pytest.mark.shared_memory_tap_tests
+def test_zero_copy_open_and_segment_lifetime():
+    handle = write_shared_batch({'count' : [1, 2, 3], 'packets' : [b'ab', b'c']})
+    # the handle is all the publisher keeps, the segment belongs to whoever opens it
+    data = handle.open()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=handle.segment_name)
+    # the mapping is still good after the unlink
+    assert data['count'].tolist() == [1, 2, 3]
+    assert [bytes(packet) for packet in data['packets']] == [b'ab', b'c']
+    with pytest.raises(ValueError):
+        data['count'][0] = 5
+
+    handle = write_shared_batch([1, 2])
+    handle.discard()
+    with pytest.raises(FileNotFoundError):
+        handle.open()
+    handle.discard() # already gone, does nothing
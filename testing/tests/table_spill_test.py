@@ -0,0 +1,74 @@
+'''
+    Unit test for table_spill
+'''
+# pylint: disable=C0116
+
+# Python imports
+import numpy as np
+import pytest
+
+# Custom imports
+from sensor_interface_api.table_spill import table_spill_file, encode_record, decode_record
+
+@pytest.mark.table_spill_tests
+def test_records_come_back_exactly():
+    columns = {
+        'big' : [1, 2 ** 63],
+        'mixed' : [1, 2.5],
+        'ints' : [1, 2],
+        'floats' : [0.5],
+        'packets' : [b'\x01', b''],
+        'names' : ['a', None],
+        'tuple' : (1, 2),
+        'array' : np.array([3, 4], dtype=np.uint16),
+    }
+    record = encode_record(columns)
+    decoded, offset = decode_record(record, 0)
+    assert offset == len(record)
+    array = decoded.pop('array')
+    assert array.dtype == np.uint16 and array.tolist() == [3, 4]
+    columns.pop('array')
+    assert decoded == columns
+    for name, values in columns.items():
+        assert type(decoded[name]) is type(values)
+        assert [type(value) for value in decoded[name]] == [type(value) for value in values]
+
+@pytest.mark.table_spill_tests
+def test_take_only_drops_saves_that_were_sent(tmp_path):
+    spill = table_spill_file(str(tmp_path / 'table.spill'))
+    for count in range(3):
+        spill.append({'count' : [count]})
+
+    records = spill.take()
+    assert next(records) == {'count' : [0]}
+    assert next(records) == {'count' : [1]}
+    # new saves go to a new file while the old one is being replayed
+    spill.append({'count' : [3]})
+    records.close() # sending the second save failed
+
+    # the second save was never marked as sent, so it comes back first
+    assert list(spill.take()) == [{'count' : [1]}, {'count' : [2]}]
+    assert list(spill.take()) == [{'count' : [3]}]
+    assert not spill.has_data()
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.table_spill_tests
+def test_corrupt_file_is_moved_aside(tmp_path):
+    spill = table_spill_file(str(tmp_path / 'table.spill'))
+    spill.append({'count' : [0]})
+    good_length = (tmp_path / 'table.spill').stat().st_size
+    spill.append({'count' : [1]})
+    with open(tmp_path / 'table.spill', 'r+b') as file:
+        file.seek(good_length)
+        file.write(b'JUNK') # break the magic of the second record
+
+    records = spill.take()
+    assert next(records) == {'count' : [0]}
+    with pytest.raises(RuntimeError, match='corrupt'):
+        next(records)
+
+    # the file is not replayed again, and is kept (under a name start up ignores) so it can be looked at
+    assert not spill.has_data()
+    assert list(spill.take()) == []
+    files = [path.name for path in tmp_path.iterdir()]
+    assert len(files) == 1 and files[0].startswith('table.spill.') and files[0].endswith('.corrupt')
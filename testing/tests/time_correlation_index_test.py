@@ -0,0 +1,88 @@
+'''
+    Unit test for time_correlation_index
+'''
+# pylint: disable=C0116
+
+# Python imports
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+# Custom imports
+from sensor_interface_api.time_correlation_index import time_correlation_index
+
+base = datetime(2024, 1, 1)
+
+def utcs(index):
+    return [utc.item() for utc in index.get_snapshot()[3]]
+
+@pytest.mark.time_correlation_index_tests
+def test_out_of_order_and_duplicates():
+    index = time_correlation_index(capacity=2)
+    index.add(10, 100, base + timedelta(seconds=10))
+    index.add(12, 100, base + timedelta(seconds=12))
+    index.add(11, 100, base + timedelta(seconds=11)) # out of order, goes in the middle (and the arrays have to grow)
+    assert index.get_snapshot()[1].tolist() == [10, 11, 12]
+
+    # the same entry again is skipped, the table and the snapshot are left alone
+    snapshot = index.get_snapshot()
+    index.add(11, 100, base + timedelta(seconds=11))
+    assert index.get_snapshot() is snapshot
+
+    # the same clocks with a different utc replace the old entry
+    index.add(11, 100, base + timedelta(seconds=20))
+    assert len(index) == 3
+    assert utcs(index) == [base + timedelta(seconds=10), base + timedelta(seconds=20), base + timedelta(seconds=12)]
+    # and the same PPSR with another PPSS is a different entry
+    index.add(11, 50, base + timedelta(seconds=30))
+    assert index.get_snapshot()[2].tolist() == [100, 50, 100, 100]
+
+@pytest.mark.time_correlation_index_tests
+def test_window_eviction():
+    index = time_correlation_index(window_s=5, capacity=4)
+    for ppsr in range(10):
+        index.add(ppsr, 0, base + timedelta(seconds=ppsr))
+    # everything more than 5 seconds older than the newest entry is gone
+    assert index.get_snapshot()[1].tolist() == [4, 5, 6, 7, 8, 9]
+    # an entry that shows up late but is still in the window is kept
+    index.add(5, 500, base + timedelta(seconds=5, milliseconds=500))
+    assert index.get_snapshot()[1].tolist() == [4, 5, 5, 6, 7, 8, 9]
+    # a new entry far ahead drops everything before its window
+    index.add(100, 0, base + timedelta(seconds=100))
+    assert index.get_snapshot()[1].tolist() == [100]
+    _, _, found = index.lookup([0], [50])
+    assert found.tolist() == [False]
+
+@pytest.mark.time_correlation_index_tests
+def test_snapshots_do_not_change_while_writing():
+    index = time_correlation_index(window_s=50, capacity=8)
+    index.add(0, 0, base)
+    stop = threading.Event()
+    bad = []
+    def reader():
+        while not stop.is_set():
+            keys, ppsr, ppss, pps_utc = index.get_snapshot()
+            before = (keys.copy(), ppsr.copy(), ppss.copy(), pps_utc.copy())
+            if len(keys) > 1 and not np.all(keys[1:] > keys[:-1]):
+                bad.append('not sorted')
+            for array, copy in zip((keys, ppsr, ppss, pps_utc), before):
+                if not np.array_equal(array, copy):
+                    bad.append('changed')
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    try :
+        # appends, growing, inserts, replaces and evictions
+        for ppsr in range(1, 400):
+            index.add(ppsr, 0, base + timedelta(seconds=ppsr))
+            if ppsr % 7 == 0:
+                index.add(ppsr - 3, 1, base + timedelta(seconds=ppsr - 3))
+            if ppsr % 11 == 0:
+                index.add(ppsr - 1, 0, base + timedelta(seconds=ppsr))
+    finally :
+        stop.set()
+        for thread in readers:
+            thread.join()
+    assert bad == []
+    assert index.get_snapshot()[1][0] == 399 - 50
@@ -0,0 +1,86 @@
+'''
+    Unit test for utc_conversion
+'''
+# pylint: disable=C0116
+
+# Python imports
+import bisect
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+# Custom imports
+from sensor_interface_api.utc_conversion import correlation_key, utcs_from_clks_batch, format_utc_column, utc_string_format
+
+entries = [ # (PPSR, PPSS, PPS_UTC), sorted by (PPSR, PPSS)
+    (100, 5000, datetime(2024, 1, 1, 0, 0, 0)),
+    (101, 6000, datetime(2024, 1, 1, 0, 0, 1)),
+    (101, 6500, datetime(2024, 1, 1, 0, 0, 1, 500000)),
+    (105, 0xFFFFFFF0, datetime(2024, 1, 1, 0, 0, 5)),
+]
+
+def make_table():
+    ppsr = np.array([entry[0] for entry in entries], dtype=np.int64)
+    ppss = np.array([entry[1] for entry in entries], dtype=np.int64)
+    return correlation_key(ppsr, ppss), ppsr, ppss, np.array([entry[2] for entry in entries], dtype='datetime64[us]')
+
+def old_utcs_from_clks(system_clk_ms, real_time_clk_s):
+    '''
+        The bisect per granule that sobj_packet_processor used to do.
+    '''
+    i = bisect.bisect_right(entries, (real_time_clk_s, system_clk_ms), key=lambda entry: (entry[0], entry[1])) - 1
+    if i < 0:
+        return None
+    ppsr, ppss, pps_utc = entries[i]
+    return pps_utc + timedelta(milliseconds=system_clk_ms - ppss), pps_utc + timedelta(seconds=real_time_clk_s - ppsr)
+
+@pytest.mark.utc_conversion_tests
+def test_matches_the_old_lookup():
+    clocks = [
+        (5000, 100), # exactly the first entry
+        (6500, 101), # exactly an entry that shares its PPSR with another one
+        (6499, 101), # just before it, so the one before that is used
+        (7000, 101), # between entries
+        (4999, 100), # before the first entry
+        (0, 99),
+        (0xFFFFFFFF, 104), # the biggest system clock in the last second before the last entry
+        (0xFFFFFFF0, 105), # exactly the last entry
+        (0x100000010, 105), # past 32 bits, the key is clipped but the delta is not
+        (0x1FFFFFFFF, 200),
+    ]
+    system_clk_ms = np.array([clock[0] for clock in clocks], dtype=np.int64)
+    real_time_clk_s = np.array([clock[1] for clock in clocks], dtype=np.int64)
+    system_clk_utc, real_time_clk_utc, found = utcs_from_clks_batch(system_clk_ms, real_time_clk_s, *make_table())
+    for index, (system_clk, real_time_clk) in enumerate(clocks):
+        expected = old_utcs_from_clks(system_clk, real_time_clk)
+        assert found[index] == (expected is not None)
+        if expected is not None:
+            assert system_clk_utc[index].item() == expected[0]
+            assert real_time_clk_utc[index].item() == expected[1]
+    assert system_clk_utc[8].item() == datetime(2024, 1, 1, 0, 0, 5) + timedelta(milliseconds=0x20)
+
+@pytest.mark.utc_conversion_tests
+def test_shapes_and_empty_table():
+    table = make_table()
+    system_clk_utc, _, found = utcs_from_clks_batch([[5000, 5001], [6000, 6001]], [[100, 100], [101, 101]], *table)
+    assert system_clk_utc.shape == found.shape == (2, 2)
+    empty = tuple(array[:0] for array in table)
+    _, _, found = utcs_from_clks_batch([5000], [100], *empty)
+    assert found.tolist() == [False]
+
+@pytest.mark.utc_conversion_tests
+def test_format_matches_strftime():
+    times = [
+        datetime(2024, 1, 1, 0, 0, 0),
+        datetime(2024, 1, 1, 0, 0, 5, 123456),
+        datetime(2024, 3, 9, 23, 59, 10, 7),
+        datetime(2024, 12, 31, 12, 30, 59, 999999),
+    ]
+    utcs = np.array(times, dtype='datetime64[us]').reshape(2, 2)
+    found = np.ones((2, 2), dtype=bool)
+    assert format_utc_column(utcs, found, 'NA') == [[time.strftime(utc_string_format) for time in pair] for pair in (times[:2], times[2:])]
+    # the rtc column drops the last 3 digits, and anything not found gets the fallback
+    found[1, 1] = False
+    formatted = format_utc_column(utcs, found, 'NA', trim=3)
+    assert formatted[0] == [times[0].strftime(utc_string_format)[:-3], '2024-01-01 00:00:5.123']
+    assert formatted[1] == ['2024-03-09 23:59:10.000', 'NA']
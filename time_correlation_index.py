@@ -0,0 +1,129 @@
+'''
+    This module holds the time correlation entries (PPS clock values and the UTC time they line up with) that the packet processors
+    use to turn their clock values into UTC.
+'''
+import threading
+
+import numpy as np
+
+from sensor_interface_api.utc_conversion import correlation_key, utcs_from_clks_batch # pylint: disable=e0401
+
+class time_correlation_index():
+    '''
+        Sorted time correlation table, kept as parallel numpy arrays (key, PPSR, PPSS, PPS_UTC) ordered by (PPSR, PPSS).
+
+        Entries normally show up in order, so adding one is just writing it at the end of the arrays. Entries that show up out of
+        order are inserted in the right spot, and an entry with the same clock values as one already in the table replaces it
+        (a lookup would have found the newest one anyway).
+
+        NOTE: one processor thread writes to the table while several read it. Readers never lock, they grab the current snapshot,
+        which is a set of views that the writer never changes. Appending only writes past the end of every snapshot, and anything
+        else (inserting, replacing, growing) builds new arrays.
+
+        ARGS:
+            window_s : entries whose PPSR is more than this many seconds older than the newest entry are dropped, 0 keeps everything.
+            capacity : starting number of entries the arrays have room for.
+    '''
+    def __init__(self, window_s:int = 0, capacity:int = 1024) -> None:
+        self.__window_s = window_s
+        self.__lock = threading.Lock()
+        self.__keys = np.zeros(capacity, dtype=np.int64)
+        self.__ppsr = np.zeros(capacity, dtype=np.int64)
+        self.__ppss = np.zeros(capacity, dtype=np.int64)
+        self.__pps_utc = np.zeros(capacity, dtype='datetime64[us]')
+        self.__start = 0
+        self.__end = 0
+        self.__snapshot = self.__make_snapshot()
+    def add(self, ppsr:int, ppss:int, pps_utc):
+        '''
+            Adds a time correlation entry to the table.
+
+            ARGS:
+                ppsr : real time clock value (s) at the PPS.
+                ppss : system clock value (ms) at the PPS.
+                pps_utc : datetime the PPS happened at.
+        '''
+        key = int(correlation_key(ppsr, ppss))
+        pps_utc = np.datetime64(pps_utc, 'us')
+        if self.__lock.acquire(timeout=10): # pylint: disable=R1732
+            self.__insert(key, ppsr, ppss, pps_utc)
+            self.__lock.release()
+        else :
+            raise RuntimeError("Could not acquire time correlation lock")
+    def __insert(self, key, ppsr, ppss, pps_utc):
+        '''
+            Puts an entry in the right spot in the table and publishes a new snapshot. The caller has to hold the lock.
+        '''
+        keys = self.__keys[self.__start:self.__end]
+        if len(keys) == 0 or key > keys[-1]:
+            self.__append(key, ppsr, ppss, pps_utc)
+        else :
+            position = int(np.searchsorted(keys, key, side='right'))
+            if position > 0 and keys[position - 1] == key:
+                if self.__pps_utc[self.__start + position - 1] == pps_utc: # already have this one (every granule in a PPS packet has the same entry)
+                    return
+                self.__rebuild(position - 1, position, key, ppsr, ppss, pps_utc) # replace the old entry
+            else :
+                self.__rebuild(position, position, key, ppsr, ppss, pps_utc)
+        self.__evict()
+        self.__snapshot = self.__make_snapshot()
+    def __append(self, key, ppsr, ppss, pps_utc):
+        '''
+            Writes an entry at the end of the table, making new (bigger) arrays if the current ones are full.
+        '''
+        if self.__end == len(self.__keys):
+            self.__rebuild(self.__end - self.__start, self.__end - self.__start, key, ppsr, ppss, pps_utc)
+            return
+        self.__keys[self.__end] = key
+        self.__ppsr[self.__end] = ppsr
+        self.__ppss[self.__end] = ppss
+        self.__pps_utc[self.__end] = pps_utc
+        self.__end += 1
+    def __rebuild(self, position, replace_end, key, ppsr, ppss, pps_utc):
+        '''
+            Copies the table into new arrays, with the new entry put in place of the entries from position to replace_end (positions
+            are relative to the start of the table).
+        '''
+        live = self.__end - self.__start
+        new_len = live - (replace_end - position) + 1
+        capacity = max(2 * new_len, len(self.__keys))
+        new_arrays = []
+        for old_array, value in ((self.__keys, key), (self.__ppsr, ppsr), (self.__ppss, ppss), (self.__pps_utc, pps_utc)):
+            old_live = old_array[self.__start:self.__end]
+            new_array = np.zeros(capacity, dtype=old_array.dtype)
+            new_array[:position] = old_live[:position]
+            new_array[position] = value
+            new_array[position + 1:new_len] = old_live[replace_end:]
+            new_arrays.append(new_array)
+        self.__keys, self.__ppsr, self.__ppss, self.__pps_utc = new_arrays
+        self.__start = 0
+        self.__end = new_len
+    def __evict(self):
+        '''
+            Drops the entries that are older than the window.
+        '''
+        if self.__window_s <= 0 or self.__end == self.__start:
+            return
+        cutoff = self.__ppsr[self.__end - 1] - self.__window_s
+        self.__start += int(np.searchsorted(self.__ppsr[self.__start:self.__end], cutoff, side='left'))
+    def __make_snapshot(self):
+        '''
+            Returns views of the live part of the arrays.
+        '''
+        live = slice(self.__start, self.__end)
+        return self.__keys[live], self.__ppsr[live], self.__ppss[live], self.__pps_utc[live]
+    def get_snapshot(self):
+        '''
+            Returns the table as (keys, ppsr, ppss, pps_utc) arrays. These will not change, even if entries are added later.
+        '''
+        return self.__snapshot
+    def lookup(self, system_clk_ms, real_time_clk_s):
+        '''
+            Converts arrays of system and real time clock values to UTC using the newest entry at or before each one.
+
+            RETURNS:
+                see utc_conversion.utcs_from_clks_batch
+        '''
+        return utcs_from_clks_batch(system_clk_ms, real_time_clk_s, *self.__snapshot)
+    def __len__(self):
+        return len(self.__snapshot[0])
@@ -0,0 +1,62 @@
+'''
+    This module converts the system and real time clock values for a whole batch of granules to UTC at once with numpy, rather than
+    doing a bisect and building timedeltas for every granule.
+'''
+import numpy as np
+
+utc_string_format = '%Y-%m-%d %H:%M:%-S.%f' # the format the rest of the system expects, note the seconds are not zero padded
+max_system_clk = 0xFFFFFFFF # the system clock is 32 bits and the real time clock is 24 bits, so a (rtc, system clk) pair fits in one int64
+
+def correlation_key(real_time_clk_s, system_clk_ms):
+    '''
+        Packs (real time clock, system clock) pairs into one int64 per pair that sorts the same way the tuples do.
+        System clock values past 32 bits are clamped, they are still bigger than any PPSS value so they still sort the same.
+    '''
+    real_time_clk_s = np.asarray(real_time_clk_s, dtype=np.int64)
+    system_clk_ms = np.clip(np.asarray(system_clk_ms, dtype=np.int64), 0, max_system_clk)
+    return (real_time_clk_s << np.int64(32)) | system_clk_ms
+
+def utcs_from_clks_batch(system_clk_ms, real_time_clk_s, keys, ppsr, ppss, pps_utc):
+    '''
+        Converts clock values to UTC the way the packet processors always have: for every clock pair it finds the most recent
+        correlation entry at or before it (one searchsorted for the whole batch), and adds the clock deltas to that entry's UTC time.
+
+        ARGS:
+            system_clk_ms : array of system clock values.
+            real_time_clk_s : array of real time clock values, the same shape as system_clk_ms.
+            keys, ppsr, ppss, pps_utc : the correlation table as sorted arrays, see time_correlation_index.get_snapshot.
+
+        RETURNS:
+            system_clk_utc : datetime64[us] array.
+            real_time_clk_utc : datetime64[us] array.
+            found : bool array, False where there was no correlation entry to use (the utc values there are meaningless).
+    '''
+    system_clk_ms = np.asarray(system_clk_ms, dtype=np.int64)
+    real_time_clk_s = np.asarray(real_time_clk_s, dtype=np.int64)
+    anchor = np.searchsorted(keys, correlation_key(real_time_clk_s, system_clk_ms), side='right') - 1
+    found = anchor >= 0
+    if len(keys) == 0: # nothing to index into, every value is not found
+        empty = np.zeros(system_clk_ms.shape, dtype='datetime64[us]')
+        return empty, empty.copy(), found
+    anchor = np.maximum(anchor, 0)
+
+    system_clk_utc = pps_utc[anchor] + ((system_clk_ms - ppss[anchor]) * 1000).astype('timedelta64[us]')
+    real_time_clk_utc = pps_utc[anchor] + ((real_time_clk_s - ppsr[anchor]) * 1000000).astype('timedelta64[us]')
+    return system_clk_utc, real_time_clk_utc, found
+
+def format_utc_column(utcs, found, fallback:str, trim:int = 0):
+    '''
+        Formats a datetime64[us] array the same way strftime(utc_string_format) would, returning nested lists of strings in the same
+        shape as the array.
+
+        ARGS:
+            utcs : datetime64[us] array.
+            found : bool array, where this is False the fallback string is used instead.
+            fallback : string to use where there was no utc value.
+            trim : number of digits to cut off the end (the rtc values only keep milliseconds).
+    '''
+    iso_strings = np.datetime_as_string(utcs, unit='us').ravel().tolist()
+    found_list = np.asarray(found).ravel().tolist()
+    end = 26 - trim # 'YYYY-MM-DDTHH:MM:SS.ffffff' is 26 characters
+    formatted = [f"{iso[:10]} {iso[11:17]}{iso[17:19].lstrip('0') or '0'}{iso[19:end]}" if is_found else fallback for iso, is_found in zip(iso_strings, found_list)]
+    return np.array(formatted, dtype=object).reshape(np.shape(utcs)).tolist()